@@ -2,9 +2,11 @@
 Echo Cleaner - Application Entry Point
 """
 
+import argparse
 import sys
+import humanize
 from PySide6.QtWidgets import QApplication, QMessageBox
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QCoreApplication
 from PySide6.QtGui import QIcon
 from ui.main_window import MainWindow
 from ui.custom_dialog import CustomDialog, ConfirmDialog
@@ -20,6 +22,17 @@ from modules import (
 )
 
 
+def register_cleaners(service):
+    """Register all cleaning modules with a service"""
+    service.register_cleaner(SystemCacheCleaner())
+    service.register_cleaner(TrashCleaner())
+    service.register_cleaner(LogCleaner())
+    service.register_cleaner(PackageManagerCleaner())
+    service.register_cleaner(DockerCleaner())
+    service.register_cleaner(DevDependenciesCleaner())
+    service.register_cleaner(KubernetesCleaner())
+
+
 class EchoClearApp:
     """Main application controller"""
     
@@ -28,22 +41,39 @@ class EchoClearApp:
         self.service = CleaningService()
         self.setup_cleaners()
         self.connect_signals()
+        self.service.resume_background_deletions()
+        self.service.enforce_quarantine_retention()
+        self.refresh_quarantine_view()
     
     def setup_cleaners(self):
         """Register all cleaning modules"""
-        self.service.register_cleaner(SystemCacheCleaner())
-        self.service.register_cleaner(TrashCleaner())
-        self.service.register_cleaner(LogCleaner())
-        self.service.register_cleaner(PackageManagerCleaner())
-        self.service.register_cleaner(DockerCleaner())
-        self.service.register_cleaner(DevDependenciesCleaner())
-        self.service.register_cleaner(KubernetesCleaner())
+        register_cleaners(self.service)
     
     def connect_signals(self):
         """Connect UI signals to service slots"""
         # UI to Service
         self.window.scan_requested.connect(self.on_scan_requested)
         self.window.clean_requested.connect(self.on_clean_requested)
+        self.window.cancel_requested.connect(self.service.cancel_clean)
+        self.window.gentle_mode_toggled.connect(self.service.set_gentle_io)
+        self.window.set_gentle_mode(self.service.settings.get('gentle_io', False))
+        self.window.quarantine_mode_toggled.connect(self.service.set_quarantine_mode)
+        self.window.set_quarantine_mode(self.service.settings.get('quarantine', False))
+        self.window.privileged_scan_toggled.connect(self.service.set_privileged_scan)
+        self.window.set_privileged_scan(self.service.settings.get('privileged_scan', False))
+        self.window.docker_keep_per_repo_changed.connect(self.service.set_docker_keep_per_repo)
+        self.window.docker_protected_images_changed.connect(self.service.set_docker_protected_images)
+        self.window.set_docker_image_policy(
+            self.service.settings.get('docker_keep_per_repo', 3),
+            self.service.settings.get('docker_protected_images') or []
+        )
+        self.window.docker_build_cache_max_age_changed.connect(self.service.set_build_cache_max_age)
+        self.window.docker_build_cache_keep_changed.connect(self.service.set_build_cache_keep_bytes)
+        self.window.set_build_cache_policy(
+            self.service.settings.get('docker_build_cache_max_age_hours', 72),
+            self.service.settings.get('docker_build_cache_keep_bytes', 0)
+        )
+        self.window.restore_requested.connect(self.on_restore_requested)
         
         # Service to UI
         self.service.scan_started.connect(self.on_scan_started)
@@ -100,28 +130,59 @@ class EchoClearApp:
         }
         
         for category in categories:
-            cat_name = category.get('name')
-            items = category.get('items', [])
-            
             # Store cleaner reference for later
             category['cleaner_ref'] = category.get('cleaner')
+        
+        # After a clean only the touched categories are refreshed; others keep their views
+        incremental = results.get('incremental', False)
+        rescanned = [name.lower() for name in results.get('rescanned', [])]
+        
+        for ui_name, backend_name in category_name_map.items():
+            if incremental and not any(
+                    backend_name.lower() in name or name in backend_name.lower() for name in rescanned):
+                continue
             
-            # Find matching UI category
-            for ui_name, backend_name in category_name_map.items():
-                if backend_name.lower() in cat_name.lower() or cat_name.lower() in backend_name.lower():
-                    self.window.update_category_view(ui_name, items)
-                    break
+            # Find matching backend category (absent when nothing is left to clean)
+            matched = next(
+                (category for category in categories
+                 if backend_name.lower() in category.get('name', '').lower()
+                 or category.get('name', '').lower() in backend_name.lower()),
+                None
+            )
+            items = matched.get('items', []) if matched else []
+            if incremental:
+                # Keep the user's selections: only the changed items are patched
+                self.window.patch_category_view(ui_name, items)
+            else:
+                self.window.update_category_view(ui_name, items)
+        
+        if incremental:
+            # Post-clean refresh: no need to announce the scan again
+            self.window.show_clean_button(visible=total_size > 0)
+            return
         
         # Show clean button if there's something to clean
         if total_size > 0:
             self.window.show_clean_button(visible=True)
+            
+            hot_items = sum(
+                1 for cat in categories for item in cat.get('items', []) if item.get('hot')
+            )
+            if hot_items:
+                selection_note = (
+                    f"<b>{hot_items}</b> hot caches that refilled quickly after the last clean "
+                    "were left unselected 🔥. Cleaning them would only slow down your next builds."
+                )
+            else:
+                selection_note = "All items are selected by default for your convenience."
+            
             self.show_custom_dialog(
                 "Scan Complete! 🔍",
                 f"Found <b>{size_formatted}</b> of reclaimable space across <b>{len(categories)} categories</b>.<br><br>"
                 "<b>Next steps:</b><br>"
                 "• Review and select items in each category<br>"
                 "• Click 'Clean Selected Items' when ready<br><br>"
-                "<span style='color: #86868b;'>All items are selected by default for your convenience.</span>",
+                f"<span style='color: #86868b;'>{selection_note}</span>",
                 icon_type="search"
             )
         else:
@@ -149,8 +210,6 @@ class EchoClearApp:
         
         # Build categories with selected items only
         categories_to_clean = []
-        total_size = 0
-        total_items = 0
         
         # Map UI category names to backend category objects
         category_map = {}
@@ -168,8 +227,6 @@ class EchoClearApp:
             
             if matched_category and selected_items:
                 category_size = sum(item.get('size', 0) for item in selected_items)
-                total_size += category_size
-                total_items += len(selected_items)
                 
                 categories_to_clean.append({
                     'name': matched_category.get('name'),
@@ -182,22 +239,70 @@ class EchoClearApp:
             self.show_warning_message("No Items Selected", "Please select at least one item to clean.")
             return
         
+        # Resolve overlapping paths, group by resource and order operations
+        plan = self.service.compile_plan(categories_to_clean)
+        
         # Confirm cleaning
-        size_formatted = self.service.format_size(total_size)
+        size_formatted = self.service.format_size(plan.total_size)
+        duration = self.service.estimate_duration(plan)
+        duration_formatted = humanize.naturaldelta(max(duration, 1))
+        
+        # Warn when hot caches are selected: cleaning them usually makes the next build slower
+        hot_items = sum(1 for op in plan.operations if op.item.get('hot'))
+        hot_warning = (
+            f"🔥 <b>{hot_items}</b> selected items are hot caches that refill quickly.\n\n"
+            if hot_items else ""
+        )
+        overlap_note = (
+            f"<i>{len(plan.skipped)} items already covered by another selection will be skipped.</i>\n\n"
+            if plan.skipped else ""
+        )
+        
+        if self.service.settings.get('quarantine'):
+            action = "This will move to quarantine"
+            # Native commands, the daemon and the privileged helper delete without quarantining
+            unrestorable = sorted({
+                op.category for op in plan.operations
+                if not plan.get_cleaner(op.cleaner).restorable(op.item)
+            })
+            if unrestorable:
+                closing = ("🛡️ Files and folders can be restored from the Quarantine page; "
+                           f"cleanups in <b>{', '.join(unrestorable)}</b> cannot. Continue?")
+            else:
+                closing = "🛡️ Everything can be restored from the Quarantine page. Continue?"
+        else:
+            action = "This will permanently delete"
+            closing = "⚠️ This action cannot be undone. Are you sure?"
         
         dialog = ConfirmDialog(
             self.window,
             "Confirm Cleaning",
-            f"This will permanently delete:\n\n"
-            f"• <b>{total_items}</b> selected items\n"
+            f"{action}:\n\n"
+            f"• <b>{plan.item_count}</b> selected items\n"
             f"• <b>{size_formatted}</b> of disk space\n"
-            f"• Across <b>{len(categories_to_clean)}</b> categories\n\n"
-            "⚠️ This action cannot be undone. Are you sure?",
+            f"• Across <b>{len(plan.category_names)}</b> categories\n"
+            f"• Estimated time: <b>{duration_formatted}</b>\n\n"
+            f"{overlap_note}"
+            f"{hot_warning}"
+            f"{closing}",
             icon_type="warning"
         )
         
         if dialog.exec() == ConfirmDialog.Accepted:
-            self.service.start_clean(categories_to_clean)
+            self.service.start_clean(plan)
+    
+    def refresh_quarantine_view(self):
+        """Show the current quarantine contents"""
+        self.window.update_quarantine_view(self.service.get_quarantine_entries())
+    
+    def on_restore_requested(self, entry_id):
+        """Restore a quarantined item"""
+        success, message = self.service.restore_quarantined(entry_id)
+        self.refresh_quarantine_view()
+        if success:
+            self.show_custom_dialog("Item Restored", f"Restored to:\n<b>{message}</b>", icon_type="success")
+        else:
+            self.show_warning_message("Restore Failed", message)
     
     def on_clean_started(self):
         """Handle clean start"""
@@ -205,6 +310,7 @@ class EchoClearApp:
         self.window.show_progress(visible=True)
         self.window.set_progress(0, "Starting cleaning...")
         self.window.show_clean_button(visible=False)
+        self.window.show_cancel_button(visible=True)
     
     def on_clean_progress(self, percentage, message):
         """Handle clean progress"""
@@ -216,10 +322,20 @@ class EchoClearApp:
         total_cleaned = results.get('total_cleaned', 0)
         items_removed = results.get('items_removed', 0)
         failed_items = results.get('failed_items', [])
+        skipped_items = results.get('skipped_items', [])
+        cancelled = results.get('cancelled', False)
         size_formatted = self.service.format_size(total_cleaned)
         
+        self.window.show_cancel_button(visible=False)
+        
         # Build message based on results
-        if total_cleaned > 0 and not failed_items:
+        if cancelled and total_cleaned == 0:
+            message = (
+                "<b>Cleaning was cancelled</b> before any item was removed.\n\n"
+                "<i>Refreshing system state...</i>"
+            )
+            icon = "info"
+        elif total_cleaned > 0 and not failed_items:
             # Full success
             message = (
                 f"<b>Successfully cleaned:</b>\n\n"
@@ -255,20 +371,55 @@ class EchoClearApp:
             )
             icon = "warning"
         
+        freed_by_device = {
+            mount: freed for mount, freed in results.get('freed_by_device', {}).items() if freed > 0
+        }
+        self.refresh_quarantine_view()
+        quarantined_bytes = results.get('quarantined_bytes', 0)
+        if quarantined_bytes:
+            message += (
+                f"\n\n🛡️ <b>{self.service.format_size(quarantined_bytes)}</b> moved to quarantine "
+                "and can be restored from the Quarantine page."
+            )
+        
+        pending_bytes = results.get('pending_background_bytes', 0)
+        if freed_by_device or pending_bytes:
+            lines = [
+                f"• {mount}: {self.service.format_size(freed)}"
+                for mount, freed in sorted(freed_by_device.items())
+            ]
+            if pending_bytes:
+                lines.append(
+                    f"• {self.service.format_size(pending_bytes)} still being deleted in the background"
+                )
+            message += (
+                f"\n\n<b>Measured on disk</b> (estimated {size_formatted}):\n" + "\n".join(lines)
+            )
+        
+        if skipped_items:
+            message += (
+                f"\n\n<span style='color: #86868b;'>{len(skipped_items)} items changed since the scan "
+                "and were skipped.</span>"
+            )
+        
+        if cancelled and total_cleaned > 0:
+            message = "<b>Cleaning was cancelled.</b> Items not reached yet were left untouched.\n\n" + message
+        
         self.show_custom_dialog(
-            "Cleaning Complete! ✨",
+            "Cleaning Cancelled" if cancelled else "Cleaning Complete! ✨",
             message,
             icon_type=icon
         )
         
-        # Automatically trigger a new scan to show updated state
+        # Refresh only the cleaners and paths this clean touched
         # This ensures the dashboard reflects what's still available to clean
-        self.service.start_scan()
+        self.service.start_scan(touched_paths=results.get('touched_paths', {}))
     
     def on_clean_failed(self, error_message):
         """Handle clean failure"""
         self.window.enable_buttons(scan_enabled=True)
         self.window.show_progress(visible=False)
+        self.window.show_cancel_button(visible=False)
         self.show_error_message("Cleaning Failed", f"An error occurred during cleaning:\n{error_message}")
     
     def show_custom_dialog(self, title, message, icon_type="info"):
@@ -293,10 +444,84 @@ class EchoClearApp:
     def run(self):
         """Show the main window"""
         self.window.show()
+        self.offer_interrupted_clean()
+    
+    def offer_interrupted_clean(self):
+        """Offer to finish a clean that was interrupted by a crash or a kill"""
+        interrupted = self.service.find_interrupted_clean()
+        if not interrupted:
+            return
+        
+        journal_path, plan = interrupted
+        dialog = ConfirmDialog(
+            self.window,
+            "Resume Interrupted Clean",
+            "A previous cleaning run did not finish.\n\n"
+            f"• <b>{plan.item_count}</b> items left\n"
+            f"• <b>{self.service.format_size(plan.total_size)}</b> of disk space\n\n"
+            "Items that changed since will be skipped. Resume cleaning now?",
+            icon_type="warning"
+        )
+        
+        if dialog.exec() == ConfirmDialog.Accepted:
+            self.service.resume_interrupted_clean(journal_path, plan)
+        else:
+            self.service.discard_interrupted_clean(journal_path)
+
+
+def run_plan_file(path, dry_run=False, gentle=False):
+    """Execute (or dry-run) a serialized clean plan without the GUI"""
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)  # Delivers the worker's signals
+    service = CleaningService()
+    register_cleaners(service)
+    if gentle:
+        service.settings['gentle_io'] = True  # For this run only
+    plan = service.load_plan(path)
+    
+    if dry_run:
+        for line in plan.dry_run():
+            print(line)
+        print(f"Total: {plan.item_count} items, {service.format_size(plan.total_size)}, "
+              f"estimated {humanize.naturaldelta(max(service.estimate_duration(plan), 1))}")
+        return 0
+    
+    results = {}
+    service.clean_progress.connect(lambda percentage, message: print(f"[{percentage:3d}%] {message}"))
+    service.clean_completed.connect(results.update)
+    service.clean_failed.connect(lambda error: results.update({'error': error}))
+    
+    service.start_clean(plan)
+    if service.clean_worker is None:
+        # Refused before starting (e.g. an empty plan); the reason was reported synchronously
+        print(f"Cleaning failed: {results.get('error', 'nothing to clean')}")
+        return 1
+    service.clean_worker.wait()
+    app.processEvents()
+    
+    if 'error' in results:
+        print(f"Cleaning failed: {results['error']}")
+        return 1
+    
+    print(f"Freed {service.format_size(results.get('total_cleaned', 0))}, "
+          f"{results.get('items_removed', 0)} items removed")
+    for mount, freed in sorted(results.get('freed_by_device', {}).items()):
+        print(f"  measured on {mount}: {service.format_size(freed)}")
+    return 1 if results.get('failed_items') else 0
 
 
 def main():
     """Main application function"""
+    parser = argparse.ArgumentParser(description="Echo Cleaner - Intelligent System Cleaner")
+    parser.add_argument('--plan', metavar='FILE', help="Execute a serialized clean plan without the GUI")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="With --plan, only report what would be deleted and which commands would run")
+    parser.add_argument('--gentle', action='store_true',
+                        help="With --plan, throttle deletions to protect other services on the same disks")
+    args, _ = parser.parse_known_args()  # Leave Qt's own arguments alone
+    
+    if args.plan:
+        sys.exit(run_plan_file(args.plan, dry_run=args.dry_run, gentle=args.gentle))
+    
     # Enable high DPI scaling
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
@@ -2,7 +2,7 @@
 Cleaning Modules - System Access Layer
 """
 
-from .base_cleaner import BaseCleaner
+from .base_cleaner import BaseCleaner, CleanCancelled
 from .system_cache_cleaner import SystemCacheCleaner
 from .trash_cleaner import TrashCleaner
 from .log_cleaner import LogCleaner
@@ -13,6 +13,7 @@ from .kubernetes_cleaner import KubernetesCleaner
 
 __all__ = [
     'BaseCleaner',
+    'CleanCancelled',
     'SystemCacheCleaner',
     'TrashCleaner',
     'LogCleaner',
@@ -3,10 +3,20 @@ Base Cleaner - Abstract base class for all cleaning modules
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Set, Tuple
 import os
-import shutil
 import subprocess
+import threading
+import time
+from .command_runner import TIMED_OUT, get_command_runner, get_tool_registry
+from .deletion_engine import DeletionEngine
+from .health import command_key, get_health_monitor, learns_timeout
+from .privileged_helper import get_privileged_helper
+from .privileged_scan import SizeRequest, get_privileged_size_cache
+
+
+class CleanCancelled(Exception):
+    """Raised at an item boundary when the user cancelled cleaning"""
 
 
 class BaseCleaner(ABC):
@@ -15,9 +25,27 @@ class BaseCleaner(ABC):
     Follows the Single Responsibility Principle.
     """
     
+    # Timeout of mutating and batch commands, whose duration isn't learned
+    UNLEARNED_TIMEOUT = 600.0
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
+        # Progress hooks set by the cleaning service while clean() runs
+        self.item_started_callback: Optional[Callable[[Dict], None]] = None
+        self.item_finished_callback: Optional[Callable[[Dict, int, bool], None]] = None
+        # Called with (bytes_freed, files_removed) while trees are being deleted
+        self.bytes_freed_callback: Optional[Callable[[int, int], None]] = None
+        self.current_item: Optional[Dict] = None
+        self.deletion_engine = DeletionEngine(progress_callback=self.report_bytes_freed)
+        # When set, directories are renamed into a staging area and deleted in the background
+        self.staging_area = None
+        # When set, removed items are renamed into a quarantine and can be restored
+        self.quarantine = None
+        # Checked before each item so cancellation never leaves an item half-done
+        self.cancel_event: Optional[threading.Event] = None
+        # Opt-in: size root-owned locations through the privileged helper while scanning
+        self.privileged_scan = False
     
     @abstractmethod
     def scan(self) -> List[Dict]:
@@ -42,6 +70,145 @@ class BaseCleaner(ABC):
         """
         pass
     
+    def resource_key(self, items: List[Dict]) -> str:
+        """
+        Identify the resource cleaning these items contends for.
+        Categories with different keys can be cleaned concurrently; by default
+        this is the device holding the items, so work on the same disk is serialized.
+        """
+        for item in items:
+            try:
+                return f"device:{os.lstat(item.get('path', '')).st_dev}"
+            except OSError:
+                continue
+        
+        return f"cleaner:{self.name}"
+    
+    def clean_priority(self, item: Dict) -> int:
+        """Relative order of an item within a clean plan (lower runs first)"""
+        return 0
+    
+    def describe_clean(self, item: Dict) -> str:
+        """Describe what cleaning an item will do, for dry-runs"""
+        return f"Delete {item.get('path', '')}"
+    
+    def restorable(self, item: Dict) -> bool:
+        """Whether cleaning an item goes through safe_remove, so quarantine mode can restore it"""
+        return True
+    
+    def fingerprint(self, item: Dict) -> Optional[List]:
+        """
+        Cheap identity of an item: (dev, ino, mtime, ctime) from a single lstat.
+        Returns None when the item can't be fingerprinted.
+        """
+        try:
+            st = os.lstat(item['path'])
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+        
+        return [st.st_dev, st.st_ino, st.st_mtime_ns, st.st_ctime_ns]
+    
+    def fingerprint_items(self, items: List[Dict]):
+        """Attach scan-time fingerprints to items"""
+        for item in items:
+            fingerprint = self.fingerprint(item)
+            if fingerprint is not None:
+                item['fingerprint'] = fingerprint
+    
+    def revalidate(self, items: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Check items against their scan-time fingerprints before cleaning.
+        
+        Unchanged items are returned as-is without re-walking them; changed items
+        are re-measured (or skipped, see on_item_changed) and vanished items are skipped.
+        
+        Returns:
+            Tuple of (items to clean, skipped items with a 'skip_reason')
+        """
+        valid, skipped = [], []
+        current_fingerprints = self.current_fingerprints(items)
+        
+        for item, current in zip(items, current_fingerprints):
+            expected = item.get('fingerprint')
+            if expected is None:
+                valid.append(item)
+                continue
+            
+            if current is None:
+                skipped.append({**item, 'skip_reason': 'No longer exists'})
+            elif list(current) == list(expected):
+                valid.append(item)
+            else:
+                updated = self.on_item_changed(item, current)
+                if updated is None:
+                    skipped.append({**item, 'skip_reason': 'Changed since scan'})
+                else:
+                    valid.append(updated)
+        
+        return valid, skipped
+    
+    def current_fingerprints(self, items: List[Dict]) -> List[Optional[List]]:
+        """Fingerprint items as they are now (override to batch the lookups)"""
+        return [self.fingerprint(item) if item.get('fingerprint') is not None else None
+                for item in items]
+    
+    def on_item_changed(self, item: Dict, fingerprint: List) -> Optional[Dict]:
+        """
+        Handle an item that changed since the scan.
+        By default it is re-measured; return None to skip it instead.
+        """
+        return {**item, 'size': self.measure_item(item), 'fingerprint': fingerprint, 'revalidated': True}
+    
+    def rescan(self, previous_items: List[Dict], touched_paths: Set[str]) -> List[Dict]:
+        """
+        Refresh items after a clean without a full scan.
+        Items that weren't touched are reused as-is; touched ones are re-measured
+        and dropped once gone or empty. Cleaners whose items depend on each other
+        override this with a full scan.
+        """
+        items = []
+        for item in previous_items:
+            path = item.get('path')
+            if path not in touched_paths:
+                items.append(item)
+            elif os.path.lexists(path):
+                size = self.measure_item(item)
+                if size > 0:
+                    items.append({**item, 'size': size})
+        return items
+    
+    def measure_item(self, item: Dict) -> int:
+        """
+        Measure the current size of an item (root-owned items as root, when
+        privileged scanning is on, since the user only sees part of them)
+        """
+        if item.get('requires_root'):
+            request = (item['path'], item.get('pattern'))
+            size = self.measure_privileged([request]).get(request)
+            if size is not None:
+                return size
+        return self.get_directory_size(item['path'])
+    
+    def measure_freed(self, item: Dict) -> int:
+        """
+        Bytes actually freed for an item cleaned by an external command.
+        What's left is usually tiny, so re-measuring it is cheap.
+        """
+        return max(0, item.get('size', 0) - self.measure_item(item))
+    
+    def estimate_reclaimable(self, items: List[Dict]) -> int:
+        """
+        Bytes actually freed by cleaning these items together.
+        Defaults to the sum of item sizes; cleaners whose items share storage
+        (e.g. Docker image layers) override it.
+        """
+        return sum(item.get('size', 0) for item in items)
+    
+    def measurement_paths(self, items: List[Dict]) -> List[str]:
+        """Paths whose filesystems are snapshotted to measure really freed space"""
+        return [item['path'] for item in items
+                if isinstance(item.get('path'), str) and item['path'].startswith('/')]
+    
     def get_directory_size(self, path: str) -> int:
         """Calculate total size of a directory"""
         total_size = 0
@@ -62,59 +229,151 @@ class BaseCleaner(ABC):
         return total_size
     
     def safe_remove(self, path: str) -> bool:
-        """Safely remove a file or directory"""
-        try:
-            if os.path.isfile(path):
-                os.remove(path)
-                return True
-            elif os.path.isdir(path):
-                shutil.rmtree(path)
+        """
+        Safely remove a file or directory.
+        In quarantine mode items are only moved aside (never deleted); otherwise
+        directories are staged for background deletion when a staging area is set,
+        or deleted in parallel with symlink-safe, fd-relative operations.
+        """
+        if self.quarantine:
+            item = self.current_item or {}
+            size = item.get('size', 0) if item.get('path') == path else 0
+            return self.quarantine.quarantine(path, size=size, category=self.name)
+        
+        if (self.staging_area and os.path.isdir(path) and not os.path.islink(path)
+                and self.staging_area.stage(path)):
+            return True
+        
+        result = self.deletion_engine.remove(path)
+        
+        # Root-owned items go through the privileged helper (one authentication per session)
+        if not result.removed and (self.current_item or {}).get('requires_root'):
+            outcome = self.run_privileged([{'op': 'unlink', 'args': {'paths': [path]}}])[0]
+            if outcome['ok'] and outcome['result'].get(path):
                 return True
-        except (OSError, PermissionError) as e:
-            print(f"Error removing {path}: {e}")
-            return False
         
-        return False
+        if result.errors:
+            print(f"Error removing {path}: {result.errors[0]}"
+                  + (f" (+{len(result.errors) - 1} more)" if len(result.errors) > 1 else ""))
+        
+        return result.removed
     
-    def run_command(self, command: List[str], check: bool = False, use_sudo: bool = False) -> subprocess.CompletedProcess:
+    def check_cancelled(self):
+        """Raise CleanCancelled if the user cancelled cleaning"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise CleanCancelled()
+    
+    def notify_item_started(self, item: Dict, check_cancel: bool = True):
+        """
+        Report that cleaning of an item has started (raises CleanCancelled if
+        cancelled, unless check_cancel is False because the item was already
+        removed as part of a batch)
         """
-        Safely run a shell command.
+        if check_cancel:
+            self.check_cancelled()
+        self.current_item = item
+        if self.item_started_callback:
+            self.item_started_callback(item)
+    
+    def notify_item_finished(self, item: Dict, cleaned_size: int, success: bool):
+        """Report that cleaning of an item has finished"""
+        self.current_item = None
+        if self.item_finished_callback:
+            self.item_finished_callback(item, cleaned_size, success)
+    
+    def report_bytes_freed(self, bytes_freed: int, files_removed: int):
+        """Forward incremental deletion progress to the registered callback"""
+        if self.bytes_freed_callback:
+            self.bytes_freed_callback(bytes_freed, files_removed)
+    
+    def run_command(self, command: List[str], check: bool = False, use_sudo: bool = False,
+                    timeout: Optional[float] = None,
+                    on_line: Optional[Callable[[str], None]] = None,
+                    backend: Optional[str] = None) -> subprocess.CompletedProcess:
+        """
+        Safely run a command through the shared asynchronous command runner.
         
         Args:
             command: Command as list of strings
             check: Whether to raise exception on non-zero exit
             use_sudo: Whether to run with elevated privileges using pkexec
+            timeout: Seconds before the command is killed (default: learned from
+                     earlier runs of the same read-only command, else UNLEARNED_TIMEOUT)
+            on_line: Receive stdout line by line instead of buffering it
+            backend: Health backend the command depends on (default: the tool itself)
         
         Returns:
             CompletedProcess object
         """
-        try:
+        # Commands to a backend whose circuit is open fail fast instead of timing out
+        health = get_health_monitor()
+        backend = backend or command[0]
+        if not health.tracks(backend):
+            backend = None
+        if backend and not health.allow(backend):
+            result = subprocess.CompletedProcess(command, -1, '', f"{backend} is unavailable")
+        else:
+            key = command_key(command)
+            learned = not use_sudo and learns_timeout(command)
+            
             # If sudo is needed, prepend pkexec (graphical sudo alternative)
             if use_sudo:
-                # Check if pkexec is available
-                if shutil.which('pkexec'):
-                    command = ['pkexec'] + command
-                # Fallback to sudo if pkexec not available
-                elif shutil.which('sudo'):
-                    command = ['sudo', '-n'] + command  # -n = non-interactive
-                else:
-                    print(f"Warning: No privilege escalation tool available for: {' '.join(command)}")
+                command = self._elevate(command)
             
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                check=check,
-                timeout=60  # Increased timeout for sudo operations
-            )
-            return result
-        except subprocess.TimeoutExpired:
-            print(f"Command timed out: {' '.join(command)}")
-            return subprocess.CompletedProcess(command, -1, '', 'Timeout')
-        except Exception as e:
-            print(f"Error running command: {e}")
-            return subprocess.CompletedProcess(command, -1, '', str(e))
+            started = time.monotonic()
+            if not timeout:
+                timeout = health.timeout_for(key, self.UNLEARNED_TIMEOUT) if learned else self.UNLEARNED_TIMEOUT
+            result = get_command_runner().run(command, timeout=timeout, on_line=on_line)
+            timed_out = result.returncode == -1 and result.stderr == TIMED_OUT
+            if learned:
+                health.observe(key, time.monotonic() - started, timed_out, self.UNLEARNED_TIMEOUT)
+            if backend:
+                # Only hangs count against a backend; a refused removal is a normal answer
+                health.record(backend, not timed_out, ' '.join(command))
+        
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+        return result
+    
+    def run_commands(self, commands: List[List[str]],
+                     timeout: Optional[float] = None) -> List[subprocess.CompletedProcess]:
+        """Run independent commands concurrently; results keep the same order"""
+        return get_command_runner().run_many(commands, timeout=timeout)
+    
+    def _elevate(self, command: List[str]) -> List[str]:
+        """Prefix a command with the available privilege escalation tool"""
+        tools = get_tool_registry()
+        # Check if pkexec is available
+        if tools.available('pkexec'):
+            return ['pkexec'] + command
+        # Fallback to sudo if pkexec not available
+        if tools.available('sudo'):
+            return ['sudo', '-n'] + command  # -n = non-interactive
+        print(f"Warning: No privilege escalation tool available for: {' '.join(command)}")
+        return command
+    
+    def run_privileged(self, ops: List[Dict]) -> List[Dict]:
+        """
+        Run a batch of whitelisted root operations ('du', 'pkg_clean', 'unlink',
+        'truncate') back to back in the session's privileged helper.
+        Returns one {'ok', 'result' | 'error'} dict per operation.
+        """
+        return get_privileged_helper().request(ops)
+    
+    def measure_privileged(self, requests: List[SizeRequest]) -> Dict[SizeRequest, Optional[int]]:
+        """
+        Sizes of root-owned (path, pattern) locations in one batched helper call,
+        reusing cached sizes whose fingerprints still match.
+        Returns an empty dict unless privileged scanning is enabled.
+        """
+        if not self.privileged_scan or not requests:
+            return {}
+        return get_privileged_size_cache().sizes(requests)
+    
+    def backend_healthy(self, backend: str) -> bool:
+        """Whether a backend (e.g. 'docker') answers its health probe; cached and circuit-broken"""
+        return get_health_monitor().is_healthy(backend)
     
     def is_command_available(self, command: str) -> bool:
-        """Check if a command is available in the system"""
-        return shutil.which(command) is not None
+        """Check if a command is available in the system (cached for the session)"""
+        return get_tool_registry().available(command)
@@ -0,0 +1,203 @@
+"""
+Command Runner - Concurrent external commands on a shared asyncio loop
+"""
+
+import asyncio
+import shutil
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+TIMED_OUT = 'Timeout'  # stderr of a CompletedProcess whose command was killed on timeout
+
+
+class CommandRunner:
+    """
+    Runs external commands as asyncio subprocesses on a private event loop.
+
+    The loop lives in a daemon thread, so synchronous cleaners can call run()
+    while several threads (scan workers, clean lanes) share one concurrency
+    limit. stdout can be consumed line by line through `on_line` instead of
+    being buffered whole, which keeps memory flat for commands that list
+    thousands of objects. `on_line` runs on the loop thread and must not call
+    back into the runner.
+    """
+
+    DEFAULT_TIMEOUT = 60.0
+    LINE_LIMIT = 16 * 1024 ** 2  # Longest stdout line accepted when streaming
+
+    def __init__(self, max_concurrency: int = 8):
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def run(self, command: List[str], timeout: Optional[float] = None,
+            on_line: Optional[Callable[[str], None]] = None,
+            input_text: Optional[str] = None) -> subprocess.CompletedProcess:
+        """Run a command and wait for it"""
+        return self.submit(command, timeout, on_line, input_text).result()
+
+    def run_many(self, commands: Iterable[List[str]],
+                 timeout: Optional[float] = None) -> List[subprocess.CompletedProcess]:
+        """Run commands concurrently (within the limit), results in the same order"""
+        futures = [self.submit(command, timeout) for command in commands]
+        return [future.result() for future in futures]
+
+    def submit(self, command: List[str], timeout: Optional[float] = None,
+               on_line: Optional[Callable[[str], None]] = None,
+               input_text: Optional[str] = None) -> Future:
+        """Start a command without waiting; returns a future of its CompletedProcess"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(
+            self._run(list(command), timeout or self.DEFAULT_TIMEOUT, on_line, input_text), loop
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def serve():
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=serve, name="command-runner", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    async def _run(self, command: List[str], timeout: float,
+                   on_line: Optional[Callable[[str], None]],
+                   input_text: Optional[str]) -> subprocess.CompletedProcess:
+        async with self._semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    limit=self.LINE_LIMIT
+                )
+            except OSError as e:
+                return subprocess.CompletedProcess(command, -1, '', str(e))
+
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    self._communicate(process, on_line, input_text), timeout
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                print(f"Command timed out: {' '.join(command)}")
+                return subprocess.CompletedProcess(command, -1, '', TIMED_OUT)
+            except ValueError as e:
+                # A streamed line longer than LINE_LIMIT (or on_line rejecting one)
+                if process.returncode is None:
+                    process.kill()
+                await process.wait()
+                return subprocess.CompletedProcess(command, -1, '', f"Could not read output: {e}")
+
+            return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+    @staticmethod
+    async def _communicate(process, on_line: Optional[Callable[[str], None]],
+                           input_text: Optional[str]):
+        """Collect (or stream) stdout and stderr concurrently, then wait for exit"""
+        async def read_stdout() -> str:
+            if on_line is None:
+                return (await process.stdout.read()).decode(errors='replace')
+            async for raw in process.stdout:
+                on_line(raw.decode(errors='replace').rstrip('\n'))
+            return ''
+
+        async def write_stdin():
+            if input_text is not None:
+                process.stdin.write(input_text.encode())
+                await process.stdin.drain()
+                process.stdin.close()
+
+        _, stdout, stderr = await asyncio.gather(
+            write_stdin(), read_stdout(), process.stderr.read()
+        )
+        await process.wait()
+        return stdout, stderr.decode(errors='replace')
+
+
+class ToolRegistry:
+    """
+    Session cache of which external tools are installed.
+    The known tools are probed in parallel once; unknown ones on first use.
+    """
+
+    KNOWN_TOOLS = [
+        'docker', 'kubectl', 'minikube', 'kind', 'helm',
+        'npm', 'yarn', 'pip', 'pip3', 'gradle', 'go', 'cargo',
+        'apt', 'apt-get', 'dnf', 'pacman', 'pkexec', 'sudo', 'du',
+    ]
+
+    def __init__(self):
+        self._paths: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._probed = False
+
+    def which(self, tool: str) -> Optional[str]:
+        """Full path of a tool, or None when it isn't installed"""
+        self._probe_known()
+        with self._lock:
+            if tool in self._paths:
+                return self._paths[tool]
+        path = shutil.which(tool)
+        with self._lock:
+            self._paths[tool] = path
+        return path
+
+    def available(self, tool: str) -> bool:
+        return self.which(tool) is not None
+
+    def refresh(self):
+        """Forget cached results, e.g. after installing a tool"""
+        with self._lock:
+            self._paths.clear()
+            self._probed = False
+
+    def _probe_known(self):
+        with self._lock:
+            if self._probed:
+                return
+            self._probed = True
+
+        with ThreadPoolExecutor(max_workers=len(self.KNOWN_TOOLS)) as pool:
+            found = dict(zip(self.KNOWN_TOOLS, pool.map(shutil.which, self.KNOWN_TOOLS)))
+
+        with self._lock:
+            for tool, path in found.items():
+                self._paths.setdefault(tool, path)
+
+
+_runner: Optional[CommandRunner] = None
+_registry: Optional[ToolRegistry] = None
+_singleton_lock = threading.Lock()
+
+
+def get_command_runner() -> CommandRunner:
+    """Session-wide command runner shared by all cleaners"""
+    global _runner
+    with _singleton_lock:
+        if _runner is None:
+            _runner = CommandRunner()
+        return _runner
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Session-wide tool discovery cache"""
+    global _registry
+    with _singleton_lock:
+        if _registry is None:
+            _registry = ToolRegistry()
+        return _registry
@@ -0,0 +1,266 @@
+"""
+Deletion Engine - Parallel, symlink-safe removal of directory trees
+"""
+
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+from .io_throttle import IOThrottle
+
+
+_DIR_FLAGS = os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | getattr(os, 'O_CLOEXEC', 0)
+
+
+@dataclass
+class DeletionResult:
+    """Outcome of removing a single path"""
+
+    path: str
+    removed: bool = False
+    bytes_freed: int = 0
+    files_removed: int = 0
+    dirs_removed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class DeletionEngine:
+    """
+    Removes files and directory trees using dir_fd-relative unlink/rmdir.
+
+    Every operation is resolved relative to an already-open directory descriptor
+    opened with O_NOFOLLOW, so swapping a directory for a symlink mid-deletion
+    can never redirect the removal outside the tree. Independent subtrees are
+    removed in parallel by a bounded thread pool, read-only directories (e.g. the
+    Go module cache) are made writable on the fly, and freed bytes are reported
+    incrementally through `progress_callback(bytes_freed, files_removed)`.
+
+    With a `throttle`, every unlink is paced by an IOThrottle and large files
+    are truncated progressively before being unlinked.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, split_depth: int = 2,
+                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                 throttle: Optional[IOThrottle] = None):
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) * 2)
+        self.split_depth = split_depth
+        self.progress_callback = progress_callback
+        self.throttle = throttle
+        self._lock = threading.Lock()
+
+    def remove(self, path: str) -> DeletionResult:
+        """Remove a file, symlink or directory tree"""
+        path = os.path.abspath(path)
+        result = DeletionResult(path=path)
+        parent, name = os.path.split(path)
+
+        if not name:
+            result.errors.append("Refusing to remove a filesystem root")
+            return result
+
+        try:
+            parent_fd = os.open(parent, os.O_RDONLY | os.O_DIRECTORY | getattr(os, 'O_CLOEXEC', 0))
+        except OSError as e:
+            result.errors.append(f"{parent}: {e}")
+            return result
+
+        try:
+            st = os.stat(name, dir_fd=parent_fd, follow_symlinks=False)
+            if stat.S_ISDIR(st.st_mode):
+                self._remove_directory(parent_fd, name, result)
+            else:
+                self._record_batch(result, [self._unlink_at(parent_fd, name, result, st)])
+            result.removed = not self._exists_at(parent_fd, name)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            result.errors.append(f"{path}: {e}")
+        finally:
+            os.close(parent_fd)
+
+        return result
+
+    def _remove_directory(self, parent_fd: int, name: str, result: DeletionResult):
+        """Split a tree into independent subtrees and remove them in parallel"""
+        frames: List[Tuple[int, str, int]] = []  # (parent_fd, name, fd), in pre-order
+        tasks: List[Tuple[int, str]] = []  # subtrees handed to the pool
+
+        try:
+            root_fd = os.open(name, _DIR_FLAGS, dir_fd=parent_fd)
+        except OSError as e:
+            result.errors.append(f"{name}: {e}")
+            return
+
+        frames.append((parent_fd, name, root_fd))
+        try:
+            self._expand(root_fd, 0, frames, tasks, result)
+
+            if len(tasks) == 1:
+                self._remove_subtree(*tasks[0], result)
+            elif tasks:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    futures = [pool.submit(self._remove_subtree, pfd, sub, result)
+                               for pfd, sub in tasks]
+                    for future in futures:
+                        future.result()
+
+            # Children were opened after their parents, so walking backwards removes bottom-up
+            while frames:
+                frame_parent_fd, frame_name, fd = frames.pop()
+                os.close(fd)
+                self._rmdir_at(frame_parent_fd, frame_name, result)
+        finally:
+            for _, _, fd in frames:
+                os.close(fd)
+
+    def _expand(self, dir_fd: int, depth: int, frames: List[Tuple[int, str, int]],
+                tasks: List[Tuple[int, str]], result: DeletionResult):
+        """Unlink the files of a directory and collect its subdirectories as subtrees"""
+        self._ensure_writable(dir_fd)
+
+        subdirs = []
+        freed = []
+        with os.scandir(dir_fd) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                else:
+                    freed.append(self._unlink_at(dir_fd, entry.name, result))
+        self._record_batch(result, freed)
+
+        # Go one level deeper when there are too few subtrees to keep the pool busy
+        if depth + 1 < self.split_depth and len(subdirs) < self.max_workers:
+            for sub in subdirs:
+                try:
+                    fd = os.open(sub, _DIR_FLAGS, dir_fd=dir_fd)
+                except OSError as e:
+                    result.errors.append(f"{sub}: {e}")
+                    continue
+                frames.append((dir_fd, sub, fd))
+                self._expand(fd, depth + 1, frames, tasks, result)
+        else:
+            tasks.extend((dir_fd, sub) for sub in subdirs)
+
+    def _remove_subtree(self, parent_fd: int, name: str, result: DeletionResult):
+        """Remove a whole subtree bottom-up with os.fwalk"""
+        def on_error(error):
+            self._add_error(result, f"{error.filename or name}: {error.strerror or error}")
+
+        for _, dirnames, filenames, dir_fd in os.fwalk(name, dir_fd=parent_fd, topdown=False,
+                                                       onerror=on_error):
+            self._ensure_writable(dir_fd)
+
+            # Account per directory rather than per file to keep progress reporting cheap
+            self._record_batch(result, [self._unlink_at(dir_fd, f, result) for f in filenames])
+
+            for dirname in dirnames:
+                self._rmdir_at(dir_fd, dirname, result)
+
+        self._rmdir_at(parent_fd, name, result)
+
+    def _unlink_at(self, dir_fd: int, name: str, result: DeletionResult,
+                   st: Optional[os.stat_result] = None) -> Optional[int]:
+        """Unlink a directory entry, returning its size or None if nothing was removed"""
+        try:
+            if st is None:
+                st = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+            if self.throttle:
+                remaining = st.st_size
+                if stat.S_ISREG(st.st_mode) and self.throttle.should_truncate(st.st_size):
+                    remaining = self._truncate_gradually(dir_fd, name, st)
+                self.throttle.acquire(unlinks=1, nbytes=remaining)
+            os.unlink(name, dir_fd=dir_fd)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self._add_error(result, f"{name}: {e}")
+            return None
+
+        return st.st_size
+
+    def _truncate_gradually(self, dir_fd: int, name: str, st: os.stat_result) -> int:
+        """Shrink a large file step by step within the byte budget; returns the size left"""
+        # Truncating a hard-linked file would destroy the data of its other names
+        if st.st_nlink != 1:
+            return st.st_size
+
+        try:
+            fd = os.open(name, os.O_WRONLY | os.O_NOFOLLOW | getattr(os, 'O_CLOEXEC', 0), dir_fd=dir_fd)
+        except OSError:
+            return st.st_size
+
+        size = st.st_size
+        try:
+            current = os.fstat(fd)
+            if (current.st_dev, current.st_ino) != (st.st_dev, st.st_ino):
+                return size  # Replaced since it was listed
+
+            step = self.throttle.truncate_step
+            while size > step:
+                self.throttle.acquire(nbytes=step)
+                os.ftruncate(fd, size - step)
+                size -= step
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+        return size
+
+    def _rmdir_at(self, dir_fd: int, name: str, result: DeletionResult):
+        """Remove an (already emptied) directory entry"""
+        try:
+            os.rmdir(name, dir_fd=dir_fd)
+        except NotADirectoryError:
+            # fwalk lists symlinks to directories as directories without following them
+            self._record_batch(result, [self._unlink_at(dir_fd, name, result)])
+            return
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            self._add_error(result, f"{name}: {e}")
+            return
+
+        self._record(result, 0, dirs=1)
+
+    @staticmethod
+    def _ensure_writable(dir_fd: int):
+        """Grant the owner rwx on a directory so its entries can be unlinked"""
+        try:
+            mode = os.fstat(dir_fd).st_mode
+            if mode & stat.S_IRWXU != stat.S_IRWXU:
+                os.fchmod(dir_fd, stat.S_IMODE(mode) | stat.S_IRWXU)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _exists_at(dir_fd: int, name: str) -> bool:
+        """Check whether a directory entry still exists"""
+        try:
+            os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+            return True
+        except OSError:
+            return False
+
+    def _record_batch(self, result: DeletionResult, sizes: List[Optional[int]]):
+        """Account a batch of unlinked files"""
+        removed = [size for size in sizes if size is not None]
+        if removed:
+            self._record(result, sum(removed), files=len(removed))
+
+    def _record(self, result: DeletionResult, size: int, files: int = 0, dirs: int = 0):
+        """Account freed space (thread-safe) and report it"""
+        with self._lock:
+            result.bytes_freed += size
+            result.files_removed += files
+            result.dirs_removed += dirs
+
+        if self.progress_callback and (size or files):
+            self.progress_callback(size, files)
+
+    def _add_error(self, result: DeletionResult, message: str):
+        """Record an error (thread-safe)"""
+        with self._lock:
+            result.errors.append(message)
@@ -3,13 +3,22 @@ Dev Dependencies Cleaner - Cleans language-specific caches
 """
 
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from .base_cleaner import BaseCleaner
 
 
 class DevDependenciesCleaner(BaseCleaner):
     """Cleans development dependency caches (npm, pip, maven, gradle, etc.)"""
     
+    # Cache type -> native clean command, used when its tool is installed
+    CLEAN_COMMANDS = {
+        'npm_cache': ['npm', 'cache', 'clean', '--force'],
+        'yarn_cache': ['yarn', 'cache', 'clean'],
+        'pip_cache': ['pip', 'cache', 'purge'],
+        'gradle_cache': ['gradle', 'cleanBuildCache'],
+        'go_cache': ['go', 'clean', '-modcache'],
+    }
+    
     def __init__(self):
         super().__init__(
             name="Dev Dependencies",
@@ -115,42 +124,40 @@ class DevDependenciesCleaner(BaseCleaner):
         for item in items:
             path = item['path']
             size = item['size']
-            cache_type = item.get('type')
-            
-            # Use package manager commands when available
-            if cache_type == 'npm_cache' and self.is_command_available('npm'):
-                result = self.run_command(['npm', 'cache', 'clean', '--force'])
-                if result.returncode == 0:
-                    total_cleaned += size
-            
-            elif cache_type == 'yarn_cache' and self.is_command_available('yarn'):
-                result = self.run_command(['yarn', 'cache', 'clean'])
-                if result.returncode == 0:
-                    total_cleaned += size
-            
-            elif cache_type == 'pip_cache' and self.is_command_available('pip'):
-                result = self.run_command(['pip', 'cache', 'purge'])
-                if result.returncode == 0:
-                    total_cleaned += size
-            
-            elif cache_type == 'gradle_cache' and self.is_command_available('gradle'):
-                result = self.run_command(['gradle', 'cleanBuildCache'])
-                if result.returncode == 0:
-                    total_cleaned += size
             
-            elif cache_type == 'go_cache' and self.is_command_available('go'):
-                result = self.run_command(['go', 'clean', '-modcache'])
-                if result.returncode == 0:
-                    total_cleaned += size
-            
-            elif cache_type == 'cargo_cache' and self.is_command_available('cargo'):
-                # Cargo doesn't have a clean command, remove manually
-                if self.safe_remove(path):
-                    total_cleaned += size
+            self.notify_item_started(item)
             
+            # Use package manager commands when available
+            command = self._clean_command(item)
+            if command:
+                result = self.run_command(command)
+                success = result.returncode == 0
+                # Tools may keep part of their cache, so count what really went away
+                cleaned = self.measure_freed(item) if success else 0
             else:
-                # Fallback to manual removal
-                if self.safe_remove(path):
-                    total_cleaned += size
+                # Fallback to manual removal (Cargo doesn't have a clean command)
+                success = self.safe_remove(path)
+                cleaned = size if success else 0
+            
+            total_cleaned += cleaned
+            self.notify_item_finished(item, cleaned, success)
         
         return total_cleaned
+    
+    def _clean_command(self, item: Dict) -> Optional[List[str]]:
+        """Native clean command for an item, if its tool is installed"""
+        command = self.CLEAN_COMMANDS.get(item.get('type'))
+        if command and self.is_command_available(command[0]):
+            return command
+        return None
+    
+    def describe_clean(self, item: Dict) -> str:
+        """Describe the native command or deletion used for an item"""
+        command = self._clean_command(item)
+        if command:
+            return f"Run: {' '.join(command)}"
+        return super().describe_clean(item)
+    
+    def restorable(self, item: Dict) -> bool:
+        """Native clean commands delete on their own, bypassing quarantine"""
+        return self._clean_command(item) is None
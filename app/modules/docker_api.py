@@ -0,0 +1,319 @@
+"""
+Docker API - Minimal Docker Engine API client over the daemon's unix socket
+"""
+
+import glob
+import http.client
+import json
+import os
+import queue
+import socket
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import quote, urlencode
+
+
+class DockerAPIError(Exception):
+    """A request the daemon refused (status >= 400) or that could not be made"""
+
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status = status
+
+
+def docker_socket_path() -> Optional[str]:
+    """Unix socket of the local Docker daemon (DOCKER_HOST, rootful or rootless)"""
+    host = os.environ.get('DOCKER_HOST', '')
+    if host.startswith('unix://'):
+        return host[len('unix://'):]
+    if host:
+        return None  # tcp:// or ssh://, not a local socket
+
+    candidates = ['/var/run/docker.sock']
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        candidates.append(os.path.join(runtime_dir, 'docker.sock'))
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    return candidates[0]
+
+
+@dataclass
+class DockerEndpoint:
+    """A local daemon: display name and unix socket"""
+    name: str
+    socket_path: str
+
+
+def docker_endpoints() -> List[DockerEndpoint]:
+    """
+    Local daemons to scan: the system and rootless sockets, then docker
+    contexts that point at unix sockets. A socket reachable under several
+    names is listed once, under the first. When DOCKER_HOST pins a daemon,
+    only that one is returned (none if it's remote).
+    """
+    host = os.environ.get('DOCKER_HOST', '')
+    if host:
+        return [DockerEndpoint('default', host[len('unix://'):])] if host.startswith('unix://') else []
+
+    candidates = [('system', '/var/run/docker.sock')]
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        candidates.append(('rootless', os.path.join(runtime_dir, 'docker.sock')))
+
+    config_dir = os.environ.get('DOCKER_CONFIG') or os.path.expanduser('~/.docker')
+    for meta_file in sorted(glob.glob(os.path.join(config_dir, 'contexts', 'meta', '*', 'meta.json'))):
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            context_host = meta['Endpoints']['docker']['Host']
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        if isinstance(context_host, str) and context_host.startswith('unix://'):
+            candidates.append((str(meta.get('Name', '')), context_host[len('unix://'):]))
+
+    endpoints = []
+    seen = set()
+    for name, path in candidates:
+        real_path = os.path.realpath(path)
+        if name and real_path not in seen and os.path.exists(path):
+            seen.add(real_path)
+            endpoints.append(DockerEndpoint(name, path))
+    return endpoints
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP/1.1 connection over a unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class EventStream:
+    """
+    Long-lived GET /events response on a dedicated connection (never pooled).
+    Iterating yields decoded events until the daemon closes the stream;
+    close() may be called from another thread to stop a blocked read.
+    """
+
+    def __init__(self, socket_path: str, query: Dict[str, Any]):
+        self._connection = UnixHTTPConnection(socket_path, timeout=None)
+        self._query = query
+        self._response: Optional[http.client.HTTPResponse] = None
+        self._closed = False
+
+    def open(self):
+        """Connect and wait for the response headers; raises DockerAPIError on failure"""
+        try:
+            self._connection.request('GET', '/events?' + urlencode(self._query), headers={'Host': 'docker'})
+            self._response = self._connection.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            raise DockerAPIError(f"GET /events: {e}") from e
+        if self._response.status >= 400:
+            raise DockerAPIError(f"GET /events: {self._response.reason}", self._response.status)
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._response is None:
+            self.open()
+        while True:
+            try:
+                line = self._response.readline()
+            except (OSError, ValueError, AttributeError, http.client.HTTPException) as e:
+                # http.client fails in odd ways (AttributeError) when close() races a read
+                if self._closed:
+                    return
+                raise DockerAPIError(f"Event stream interrupted: {e}") from e
+            if not line:
+                return  # Daemon closed the stream
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+    def close(self):
+        self._closed = True
+        sock = self._connection.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)  # Wakes up a reader blocked in recv()
+            except OSError:
+                pass
+        self._connection.close()
+
+
+class DockerAPI:
+    """
+    Docker Engine API client with a pool of keep-alive connections.
+
+    Listing and sizing go through single requests that return exact byte
+    counts (/system/df, /images/json, /containers/json?size=1) instead of a
+    CLI process per query and human-formatted sizes. Connections are reused
+    across requests and threads; a connection the daemon closed while idle is
+    replaced transparently. The socket path is injectable so the client can
+    be pointed at a fake API server.
+    """
+
+    DEFAULT_TIMEOUT = 30.0
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT,
+                 pool_size: int = 4):
+        self.socket_path = socket_path or docker_socket_path()
+        self.timeout = timeout
+        self._pool: 'queue.LifoQueue[UnixHTTPConnection]' = queue.LifoQueue(maxsize=pool_size)
+
+    @property
+    def usable(self) -> bool:
+        """Whether there is a local socket to talk to (remote daemons go through the CLI)"""
+        return bool(self.socket_path) and os.path.exists(self.socket_path)
+
+    def request(self, method: str, path: str, query: Optional[Dict[str, Any]] = None,
+                timeout: Optional[float] = None) -> Any:
+        """Make a request and return the decoded JSON body (None when empty)"""
+        if not self.socket_path:
+            raise DockerAPIError("No local Docker socket")
+
+        url = path
+        if query:
+            url += '?' + urlencode({
+                key: json.dumps(value) if isinstance(value, dict) else value
+                for key, value in query.items()
+            })
+
+        # A pooled connection may have been closed by the daemon while idle: retry once on a fresh one
+        for attempt in range(2):
+            connection = self._acquire(timeout)
+            try:
+                connection.request(method, url, headers={'Host': 'docker'})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                connection.close()
+                if attempt == 0:
+                    continue
+                raise DockerAPIError(f"{method} {path}: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise DockerAPIError(f"{method} {path}: {e}") from e
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+
+            if response.status >= 400:
+                try:
+                    message = json.loads(body).get('message', '')
+                except (ValueError, AttributeError):
+                    message = body.decode(errors='replace')
+                raise DockerAPIError(f"{method} {path}: {message or response.reason}", response.status)
+            if not body:
+                return None
+            try:
+                return json.loads(body)
+            except ValueError:
+                return body.decode(errors='replace')
+
+        raise DockerAPIError(f"{method} {path}: connection failed")
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    # --- Endpoints --------------------------------------------------------------
+
+    def ping(self, timeout: Optional[float] = None) -> bool:
+        try:
+            return self.request('GET', '/_ping', timeout=timeout) == 'OK'
+        except DockerAPIError:
+            return False
+
+    def info(self) -> Dict:
+        return self.request('GET', '/info')
+
+    def system_df(self, object_type: Optional[str] = None) -> Dict:
+        """
+        Images, containers (with sizes), volumes (with sizes) and build cache in one
+        call, or only one section ('container', 'image', 'volume', 'build-cache';
+        daemons before API 1.42 ignore the type and return everything)
+        """
+        return self.request('GET', '/system/df', {'type': object_type} if object_type else None)
+
+    def images(self, all_images: bool = False, filters: Optional[Dict] = None) -> List[Dict]:
+        query: Dict[str, Any] = {'all': int(all_images)}
+        if filters:
+            query['filters'] = filters
+        return self.request('GET', '/images/json', query)
+
+    def inspect_image(self, image_id: str) -> Dict:
+        return self.request('GET', f"/images/{quote(image_id, safe='')}/json")
+
+    def containers(self, all_containers: bool = True, size: bool = False,
+                   filters: Optional[Dict] = None) -> List[Dict]:
+        query: Dict[str, Any] = {'all': int(all_containers), 'size': int(size)}
+        if filters:
+            query['filters'] = filters
+        return self.request('GET', '/containers/json', query)
+
+    def inspect_container(self, container_id: str) -> Dict:
+        return self.request('GET', f"/containers/{quote(container_id, safe='')}/json")
+
+    def volumes(self, filters: Optional[Dict] = None) -> List[Dict]:
+        result = self.request('GET', '/volumes', {'filters': filters} if filters else None)
+        return (result or {}).get('Volumes') or []
+
+    def remove_container(self, container_id: str, force: bool = False):
+        self.request('DELETE', f"/containers/{quote(container_id, safe='')}", {'force': int(force)})
+
+    def remove_image(self, image_id: str, force: bool = False) -> List[Dict]:
+        return self.request('DELETE', f"/images/{quote(image_id, safe='')}", {'force': int(force)})
+
+    def remove_volume(self, name: str):
+        self.request('DELETE', f"/volumes/{quote(name, safe='')}")
+
+    def prune_build_cache(self, record_id: Optional[str] = None) -> Dict:
+        """
+        Remove unused build cache, or only one record (BuildKit accepts a single
+        value per prune filter); returns {'CachesDeleted': [ids], 'SpaceReclaimed': bytes}
+        """
+        query = {'filters': {'id': [record_id]}} if record_id else None
+        return self.request('POST', '/build/prune', query, timeout=max(self.timeout, 600))
+
+    def event_stream(self, filters: Optional[Dict] = None) -> EventStream:
+        """Stream of daemon events (not yet connected: call open() or iterate)"""
+        if not self.socket_path:
+            raise DockerAPIError("No local Docker socket")
+        return EventStream(self.socket_path, {'filters': json.dumps(filters)} if filters else {})
+
+    # --- Pool -------------------------------------------------------------------
+
+    def _acquire(self, timeout: Optional[float]) -> UnixHTTPConnection:
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = UnixHTTPConnection(self.socket_path, self.timeout)
+        connection.timeout = timeout or self.timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(connection.timeout)
+        return connection
+
+    def _release(self, connection: UnixHTTPConnection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
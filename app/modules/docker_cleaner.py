@@ -3,56 +3,482 @@ Docker Cleaner - Cleans Docker artifacts
 """
 
 import json
+import os
 import re
-from typing import List, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from itertools import groupby
+from typing import List, Dict, Optional, Set, Tuple
 from .base_cleaner import BaseCleaner
+from .docker_api import DockerAPI, DockerAPIError, docker_endpoints
+from .docker_inventory import DockerInventory
+from .health import get_health_monitor, probe_docker
+from .storage import load_settings
 
 
 class DockerCleaner(BaseCleaner):
-    """Cleans Docker images, containers, and volumes"""
+    """
+    Cleans Docker images, containers, and volumes.
     
-    def __init__(self):
+    Created without a socket, the cleaner finds every local daemon (system,
+    rootless, docker contexts on unix sockets). With more than one, each gets
+    its own DockerCleaner: they are scanned concurrently, their subcategories
+    are prefixed with the daemon's name, and items carry an 'endpoint' that
+    routes removals back to the daemon they came from.
+    """
+    
+    # Containers go first so the images they reference are no longer in use
+    # (their logs before them, since removing a container deletes its log anyway)
+    CLEAN_ORDER = ['docker_log', 'docker_container', 'docker_image', 'docker_volume', 'docker_build_cache']
+    
+    # Container logs the privileged helper may size, truncate and delete
+    PRIVILEGED_LOG_ROOT = '/var/lib/docker/containers'
+    # Container states in which the daemon holds no log file open (any other: truncate, don't unlink)
+    LOG_CLOSED_STATES = ('exited', 'created', 'dead')
+    
+    REMOVAL_BATCH_SIZE = 100  # Objects per multi-ID CLI command (and per progress batch)
+    MAX_PARALLEL_REMOVALS = 8  # Concurrent API removals
+    MAX_PARALLEL_PRUNES = 4  # Concurrent single-record build cache prunes
+    
+    def __init__(self, socket_path: Optional[str] = None, endpoint: str = ''):
         super().__init__(
             name="Docker",
             description="Docker images, containers, and volumes"
         )
+        self.endpoint = endpoint  # Daemon name in subcategories, '' when it's the only one
+        # Per-daemon cleaners by endpoint name, when several local daemons are found
+        self._daemons: Dict[str, 'DockerCleaner'] = {}
+        self._discover = socket_path is None and not endpoint
+        # CLI commands go to the same daemon as the API
+        self._cli_host = f"unix://{socket_path}" if socket_path else ''
+        self._data_root: Optional[str] = None
+        # Engine API over the local socket; the docker CLI is the fallback
+        self.api = DockerAPI(socket_path, pool_size=self.MAX_PARALLEL_REMOVALS)
+        # Kept current from the daemon's event stream, so rescans don't list everything again
+        self.inventory = DockerInventory(self.api)
+        self._health_backend = 'docker'
+        if socket_path:
+            self._health_backend = f"docker@{socket_path}"
+            health = get_health_monitor()
+            if not health.tracks(self._health_backend):
+                health.register(self._health_backend, lambda timeout: probe_docker(timeout, socket_path))
+        # Image ID -> {'size', 'shared_size'} of every image on the daemon, from the last scan
+        self._image_usage: Dict[str, Dict[str, int]] = {}
+        # Raw 'docker system df -v' documents from the last CLI scan
+        self._cli_usage: List[Dict] = []
+        # Container ID -> json-file log path ('' for other log drivers); fixed for a container's lifetime
+        self._log_paths: Dict[str, str] = {}
+    
+    def resource_key(self, items: List[Dict]) -> str:
+        """Docker removals are bound by the daemon, not by local disk I/O"""
+        return "docker"
+    
+    def clean_priority(self, item: Dict) -> int:
+        """Order removals so containers are removed before their images"""
+        item_type = item.get('type')
+        return self.CLEAN_ORDER.index(item_type) if item_type in self.CLEAN_ORDER else len(self.CLEAN_ORDER)
+    
+    def describe_clean(self, item: Dict) -> str:
+        """Describe the docker command used to remove an item"""
+        daemon = self._daemon_for(item)
+        if daemon is not self:
+            return daemon.describe_clean(item)
+        if item.get('type') == 'docker_log':
+            if self._log_in_use(item):
+                return f"Truncate {item['path']} in place (the container may still be writing it)"
+            return f"Delete {item['path']}"
+        command = self._removal_command(item)
+        return f"Run: {' '.join(self._cli_command(command))}" if command else super().describe_clean(item)
+    
+    def restorable(self, item: Dict) -> bool:
+        """Objects are removed by the daemon and container logs are truncated or deleted in place"""
+        return False
+    
+    def run_command(self, command: List[str], *args, backend: Optional[str] = None, **kwargs):
+        """Point docker CLI commands at this cleaner's daemon"""
+        if command[:1] == ['docker'] and self._cli_host:
+            command = self._cli_command(command)
+            backend = backend or self._health_backend
+        return super().run_command(command, *args, backend=backend, **kwargs)
+    
+    def _cli_command(self, command: List[str]) -> List[str]:
+        if command[:1] == ['docker'] and self._cli_host:
+            return ['docker', f'--host={self._cli_host}'] + command[1:]
+        return command
+    
+    def _removal_command(self, item: Dict) -> List[str]:
+        """Docker CLI command that removes an item"""
+        path = item.get('path', '')
+        return {
+            'docker_image': ['docker', 'rmi', path],
+            'docker_container': ['docker', 'rm', path],
+            'docker_volume': ['docker', 'volume', 'rm', path],
+            'docker_build_cache': ['docker', 'builder', 'prune', '-f']
+                                  + ([] if path == 'build-cache' else ['--filter', f'id={path}']),
+        }.get(item.get('type'), [])
+    
+    def rescan(self, previous_items: List[Dict], touched_paths: Set[str]) -> List[Dict]:
+        """
+        Removing containers can leave images dangling, so Docker is always
+        rescanned fully; with the event stream connected that's in memory
+        """
+        return self.scan()
+    
+    def measurement_paths(self, items: List[Dict]) -> List[str]:
+        """Docker items aren't paths; space is freed under the daemon's data root"""
+        if self._daemons:
+            return sorted({path for daemon, group in self._group_by_daemon(items)
+                           for path in daemon.measurement_paths(group)})
+        if self._data_root is None:
+            root = ''
+            if self.api.usable:
+                try:
+                    root = (self.api.info() or {}).get('DockerRootDir', '')
+                except DockerAPIError as e:
+                    print(f"Docker API error: {e}")
+            if not root:
+                result = self.run_command(['docker', 'info', '--format', '{{.DockerRootDir}}'])
+                root = result.stdout.strip() if result.returncode == 0 else ''
+            self._data_root = root if root.startswith('/') else ''
+        return [self._data_root] if self._data_root else []
+    
+    def fingerprint(self, item: Dict) -> Optional[List]:
+        """Docker objects are identified by their ID (and state, for containers and their logs)"""
+        item_type = item.get('type')
+        if item_type == 'docker_container':
+            return [item_type, item['path'], item.get('state', 'exited')]
+        if item_type == 'docker_log':
+            return [item_type, item['container_id'], item.get('state', '')]
+        if item_type in ('docker_image', 'docker_volume'):
+            return [item_type, item['path']]
+        return None
+    
+    def current_fingerprints(self, items: List[Dict]) -> List[Optional[List]]:
+        """Look up the current state of all items with one inspect call per object type"""
+        if self._daemons:
+            by_item = {}
+            for daemon, group in self._group_by_daemon(items):
+                for item, fingerprint in zip(group, daemon.current_fingerprints(group)):
+                    by_item[id(item)] = fingerprint
+            return [by_item[id(item)] for item in items]
+        
+        def ids_of(item_type):
+            return [item['path'] for item in items
+                    if item.get('type') == item_type and item.get('fingerprint') is not None]
+        
+        log_owners = [item['container_id'] for item in items
+                      if item.get('type') == 'docker_log' and item.get('fingerprint') is not None]
+        containers = self._inspect('container', ids_of('docker_container') + log_owners, '{{.Id}} {{.State.Status}}')
+        images = self._inspect('image', ids_of('docker_image'), '{{.Id}}')
+        volumes = self._inspect('volume', ids_of('docker_volume'), '{{.Name}}')
+        
+        fingerprints = []
+        for item in items:
+            item_type, object_id = item.get('type'), item.get('path', '')
+            current = None
+            
+            if item.get('fingerprint') is not None:
+                if item_type == 'docker_container':
+                    state = self._match_id(containers, object_id)
+                    if state is not None:
+                        current = [item_type, object_id, state]
+                elif item_type == 'docker_log':
+                    # A container that started or stopped since the scan needs the other treatment
+                    state = self._match_id(containers, item['container_id'])
+                    if state is not None:
+                        current = [item_type, item['container_id'], state]
+                elif item_type == 'docker_image':
+                    if self._match_id(images, object_id) is not None:
+                        current = [item_type, object_id]
+                elif item_type == 'docker_volume':
+                    if object_id in volumes:
+                        current = [item_type, object_id]
+            
+            fingerprints.append(current)
+        
+        return fingerprints
+    
+    def on_item_changed(self, item: Dict, fingerprint: List) -> Optional[Dict]:
+        """A container that was restarted since the scan must not be removed"""
+        return None
+    
+    def _inspect(self, object_type: str, ids: List[str], template: str) -> Dict[str, str]:
+        """Inspect many objects in a single call, returning {full id: rest of the line}"""
+        if not ids:
+            return {}
+        
+        if self.api.usable:
+            try:
+                return self._inspect_api(object_type, ids)
+            except DockerAPIError as e:
+                print(f"Docker API error, falling back to the CLI: {e}")
+        
+        # Missing objects are reported on stderr; the others are still printed
+        result = self.run_command(['docker', object_type, 'inspect', '--format', template] + ids)
+        
+        found = {}
+        for line in (result.stdout or '').splitlines():
+            parts = line.strip().split(' ', 1)
+            if parts and parts[0]:
+                found[parts[0]] = parts[1] if len(parts) > 1 else ''
+        return found
+    
+    def _inspect_api(self, object_type: str, ids: List[str]) -> Dict[str, str]:
+        """Same as _inspect, with one list request to the Engine API"""
+        if object_type == 'container':
+            return {
+                container['Id']: container.get('State', '')
+                for container in self.api.containers(all_containers=True, filters={'id': ids})
+            }
+        if object_type == 'image':
+            return {image['Id']: '' for image in self.api.images(all_images=True)}
+        return {volume['Name']: '' for volume in self.api.volumes()}
+    
+    @staticmethod
+    def _match_id(found: Dict[str, str], object_id: str) -> Optional[str]:
+        """Find an inspected object by (possibly truncated) ID"""
+        short_id = object_id.replace('sha256:', '')
+        for full_id, value in found.items():
+            if short_id and full_id.replace('sha256:', '').startswith(short_id):
+                return value
+        return None
     
     def scan(self) -> List[Dict]:
         """Scan for Docker artifacts to clean - organized by subcategory"""
+        if self._discover:
+            self._daemons = self._discover_daemons()
+        if not self._daemons:
+            return self._scan_daemon()
+        
+        # Daemons are independent: scan them all at once
+        daemons = list(self._daemons.values())
+        with ThreadPoolExecutor(max_workers=len(daemons)) as pool:
+            results = list(pool.map(lambda daemon: daemon._scan_daemon(), daemons))
+        return [item for found in results for item in found]
+    
+    def _discover_daemons(self) -> Dict[str, 'DockerCleaner']:
+        """
+        One cleaner per local daemon, reusing existing ones (and their live
+        inventories). Cleaners of daemons that are gone stop listening.
+        """
+        endpoints = docker_endpoints()
+        daemons = {}
+        if len(endpoints) > 1:  # Otherwise only the default daemon: this cleaner talks to it directly
+            for endpoint in endpoints:
+                daemon = self._daemons.get(endpoint.name)
+                if daemon is None or daemon.api.socket_path != endpoint.socket_path:
+                    daemon = DockerCleaner(endpoint.socket_path, endpoint.name)
+                daemons[endpoint.name] = daemon
+        
+        for daemon in self._daemons.values():
+            if all(daemon is not kept for kept in daemons.values()):
+                daemon.inventory.stop()
+                daemon.api.close()
+        return daemons
+    
+    def _daemon_for(self, item: Dict) -> 'DockerCleaner':
+        """Cleaner of the daemon an item came from (items without an endpoint go to the first daemon)"""
+        if not self._daemons:
+            return self
+        return self._daemons.get(item.get('endpoint', '')) or next(iter(self._daemons.values()))
+    
+    def _group_by_daemon(self, items: List[Dict]) -> List[Tuple['DockerCleaner', List[Dict]]]:
+        groups: Dict[int, Tuple['DockerCleaner', List[Dict]]] = {}
+        for item in items:
+            daemon = self._daemon_for(item)
+            groups.setdefault(id(daemon), (daemon, []))[1].append(item)
+        return list(groups.values())
+    
+    def _scan_daemon(self) -> List[Dict]:
+        """Items of this cleaner's daemon"""
         items = []
         
-        # Check if Docker is available
-        if not self.is_command_available('docker'):
+        # The daemon answers a ping (skipped quickly while it's failing); a live event stream is proof enough
+        if not self.inventory.live and not self.backend_healthy(self._health_backend):
             return items
         
-        # Check if Docker daemon is running
-        result = self.run_command(['docker', 'info'])
-        if result.returncode != 0:
-            return items
+        # The live inventory (one /system/df request at most) when the socket is reachable, else several CLI calls
+        inventory = None
+        if self.api.usable:
+            try:
+                inventory = self._inventory_api()
+            except DockerAPIError as e:
+                print(f"Docker API error, falling back to the CLI: {e}")
+        if inventory is None:
+            inventory = self._inventory_cli()
         
-        # Find dangling images
-        dangling_images = self._find_dangling_images()
-        for img in dangling_images:
-            img['subcategory'] = 'Dangling Images'
-        items.extend(dangling_images)
-        
-        # Find stopped containers
-        stopped_containers = self._find_stopped_containers()
-        for cont in stopped_containers:
-            cont['subcategory'] = 'Stopped Containers'
-        items.extend(stopped_containers)
-        
-        # Find unused volumes
-        unused_volumes = self._find_unused_volumes()
-        for vol in unused_volumes:
-            vol['subcategory'] = 'Unused Volumes'
-        items.extend(unused_volumes)
-        
-        # Build cache
-        build_cache = self._get_build_cache_size()
-        if build_cache:
-            build_cache['subcategory'] = 'Build Cache'
-            items.append(build_cache)
+        # Subcategory -> items, in display order
+        for subcategory, found in inventory.items():
+            for item in found:
+                item['subcategory'] = f"{self.endpoint}: {subcategory}" if self.endpoint else subcategory
+                if self.endpoint:
+                    item['endpoint'] = self.endpoint
+            items.extend(found)
+        
+        return items
+    
+    def _inventory_api(self) -> Dict[str, List[Dict]]:
+        """All Docker items by subcategory, from the live /system/df document"""
+        df = self.inventory.snapshot()
+        
+        self._image_usage = {
+            image['Id']: {'size': max(0, image.get('Size', 0)), 'shared_size': max(0, image.get('SharedSize', 0))}
+            for image in df.get('Images') or []
+        }
+        
+        # Images referenced by any container, running or not
+        used_images = {container.get('ImageID') for container in df.get('Containers') or []}
+        image_records = [
+            {
+                'id': image['Id'],
+                'tags': [tag for tag in image.get('RepoTags') or [] if tag != '<none>:<none>'],
+                'created': image.get('Created', 0),
+                'in_use': image['Id'] in used_images or image.get('Containers', 0) > 0
+            }
+            for image in df.get('Images') or []
+        ]
+        
+        images = []
+        for image in df.get('Images') or []:
+            tags = [tag for tag in image.get('RepoTags') or [] if tag != '<none>:<none>']
+            if tags:
+                continue
+            created = datetime.fromtimestamp(image.get('Created', 0)).strftime('%Y-%m-%d')
+            images.append(self._image_item(image['Id'], f"Created {created}"))
+        
+        containers = []
+        for container in df.get('Containers') or []:
+            if container.get('State') != 'exited':
+                continue
+            names = container.get('Names') or ['Unknown']
+            containers.append({
+                'path': container['Id'],
+                'name': names[0].lstrip('/'),
+                'size': max(0, container.get('SizeRw') or 0),
+                'type': 'docker_container',
+                'state': container.get('State', 'exited'),
+                'details': f"Stopped • Status: {container.get('Status', 'Unknown')}"
+            })
+        
+        volumes = []
+        for volume in df.get('Volumes') or []:
+            usage = volume.get('UsageData') or {}
+            if usage.get('RefCount', 0) != 0:
+                continue
+            volumes.append(self._volume_item(volume['Name'], max(0, usage.get('Size', 0))))
+        
+        build_cache = [
+            self._build_cache_item(
+                record['ID'], record.get('Type', ''), record.get('Description', ''),
+                max(0, record.get('Size', 0)), self._parse_timestamp(record.get('LastUsedAt')),
+                record.get('Shared', False)
+            )
+            for record in df.get('BuildCache') or []
+            if not record.get('InUse') and record.get('Size', 0) > 0
+        ]
+        
+        return {
+            'Dangling Images': images,
+            'Unused Images': self._find_unused_images(image_records),
+            'Stopped Containers': containers,
+            'Container Logs': self._find_container_logs(self._log_records_api(df.get('Containers') or [])),
+            'Unused Volumes': volumes,
+            'Build Cache': self._apply_build_cache_policy(build_cache),
+        }
+    
+    def _inventory_cli(self) -> Dict[str, List[Dict]]:
+        """Same as _inventory_api, through the docker CLI (remote daemons, or no API access)"""
+        image_records = self._load_images_cli()
+        return {
+            'Dangling Images': self._find_dangling_images(),
+            'Unused Images': self._find_unused_images(image_records),
+            'Stopped Containers': self._find_stopped_containers(),
+            'Container Logs': self._find_container_logs(self._log_records_cli()),
+            'Unused Volumes': self._find_unused_volumes(),
+            'Build Cache': self._apply_build_cache_policy(self._find_build_cache_cli()),
+        }
+    
+    def _load_images_cli(self) -> List[Dict]:
+        """
+        Every image with its unique/shared size, tags and container count, from one
+        'docker system df -v' call (one row per tag, merged by ID)
+        """
+        self._image_usage = {}
+        records: Dict[str, Dict] = {}
+        self._cli_usage = self._json_lines(['docker', 'system', 'df', '-v', '--format', '{{json .}}'])
+        for usage in self._cli_usage:
+            for image in usage.get('Images') or []:
+                image_id = image.get('ID', '')
+                self._image_usage[image_id] = {
+                    'size': self._parse_docker_size(image.get('Size', '0B')),
+                    'shared_size': self._parse_docker_size(image.get('SharedSize', '0B'))
+                }
+                
+                try:
+                    created = datetime.strptime(image.get('CreatedAt', '')[:19], '%Y-%m-%d %H:%M:%S').timestamp()
+                except ValueError:
+                    created = 0
+                record = records.setdefault(image_id, {'id': image_id, 'tags': [], 'created': created, 'in_use': False})
+                
+                repository, tag = image.get('Repository', '<none>'), image.get('Tag', '<none>')
+                if repository != '<none>' and tag != '<none>':
+                    record['tags'].append(f"{repository}:{tag}")
+                try:
+                    record['in_use'] = record['in_use'] or int(image.get('Containers', '0')) > 0
+                except ValueError:
+                    record['in_use'] = True  # Unknown: don't offer it
+        
+        return list(records.values())
+    
+    def _find_unused_images(self, image_records: List[Dict]) -> List[Dict]:
+        """
+        Tagged images no container references, oldest first.
+        
+        Per repository the newest `docker_keep_per_repo` images (in use or not)
+        are kept, and images matching a `docker_protected_images` pattern are
+        never offered. Computed in memory from the inventory already fetched.
+        """
+        settings = load_settings()
+        keep_per_repo = max(0, int(settings.get('docker_keep_per_repo', 3)))
+        protected = settings.get('docker_protected_images') or []
+        
+        def is_protected(tag):
+            repository = tag.rsplit(':', 1)[0]
+            return any(fnmatch(tag, pattern) or fnmatch(repository, pattern) for pattern in protected)
+        
+        # Rank every tagged image within each repository it belongs to, newest first
+        by_repository: Dict[str, List[Dict]] = {}
+        for record in image_records:
+            for repository in {tag.rsplit(':', 1)[0] for tag in record['tags']}:
+                by_repository.setdefault(repository, []).append(record)
+        
+        kept_ids = set()
+        newer_counts: Dict[str, int] = {}
+        for repository, records in by_repository.items():
+            records.sort(key=lambda record: record['created'], reverse=True)
+            kept_ids.update(record['id'] for record in records[:keep_per_repo])
+            for rank, record in enumerate(records):
+                newer_counts[record['id']] = max(newer_counts.get(record['id'], 0), rank)
+        
+        candidates = [
+            record for record in image_records
+            if record['tags'] and not record['in_use'] and record['id'] not in kept_ids
+            and not any(is_protected(tag) for tag in record['tags'])
+        ]
+        
+        items = []
+        for record in sorted(candidates, key=lambda record: record['created']):
+            created = datetime.fromtimestamp(record['created']).strftime('%Y-%m-%d')
+            item = self._image_item(
+                record['id'],
+                f"Created {created} • Not used by any container • {newer_counts[record['id']]} newer in its repository"
+            )
+            item['name'] = ', '.join(record['tags'])
+            item['tags'] = record['tags']
+            item['default_selected'] = False  # Tagged images may still be wanted: opt in
+            items.append(item)
         
         return items
     
@@ -60,74 +486,169 @@ class DockerCleaner(BaseCleaner):
         """Find dangling Docker images"""
         items = []
         
-        result = self.run_command([
+        dangling = self._json_lines([
             'docker', 'images', 
             '--filter', 'dangling=true',
             '--format', '{{json .}}'
         ])
         
-        if result.returncode == 0 and result.stdout:
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        image = json.loads(line)
-                        # Parse size - Docker provides it in Size field
-                        size_str = image.get('Size', '0B')
-                        size_bytes = self._parse_docker_size(size_str)
-                        
-                        image_id = image.get('ID', 'unknown')[:12]
-                        created = image.get('CreatedSince', 'unknown')
-                        
-                        items.append({
-                            'path': image.get('ID'),
-                            'name': f"Image {image_id}",
-                            'size': size_bytes,
-                            'type': 'docker_image',
-                            'details': f"Created {created}"
-                        })
-                    except json.JSONDecodeError:
-                        continue
+        # Sizes come from _load_images_cli: the Size column counts shared layers in full
+        for image in dangling:
+            image_id = image.get('ID', 'unknown')
+            if self._image_key(image_id) is None:
+                # Not in the usage listing: fall back to the Size column
+                self._image_usage[image_id] = {
+                    'size': self._parse_docker_size(image.get('Size', '0B')), 'shared_size': 0
+                }
+            items.append(self._image_item(image_id, f"Created {image.get('CreatedSince', 'unknown')}"))
         
         return items
     
+    def _image_item(self, image_id: str, details: str) -> Dict:
+        """Item for a dangling image, sized by the bytes only it holds"""
+        usage = self._image_usage.get(self._image_key(image_id) or '', {'size': 0, 'shared_size': 0})
+        unique_size = max(0, usage['size'] - usage['shared_size'])
+        if usage['shared_size'] > 0:
+            details += " • Shares layers with other images"
+        
+        return {
+            'path': image_id,
+            'name': f"Image {image_id.replace('sha256:', '')[:12]}",
+            'size': unique_size,
+            'shared_size': usage['shared_size'],
+            'virtual_size': usage['size'],
+            'type': 'docker_image',
+            'details': details
+        }
+    
+    def _image_key(self, image_id: str) -> Optional[str]:
+        """Key of an image in _image_usage, matching full and truncated IDs either way"""
+        if image_id in self._image_usage:
+            return image_id
+        short_id = image_id.replace('sha256:', '')
+        for key in self._image_usage:
+            short_key = key.replace('sha256:', '')
+            if short_id and short_key and (short_key.startswith(short_id) or short_id.startswith(short_key)):
+                return key
+        return None
+    
+    def estimate_reclaimable(self, items: List[Dict]) -> int:
+        """
+        Bytes freed by removing these items together.
+        
+        Image sizes are unique sizes (shared layers excluded), which undercounts
+        a selection that includes every image holding a shared layer. Selected
+        images are grouped by the layers they share; a group whose shared layers
+        no unselected image uses also frees those layers, counted as the largest
+        SharedSize in the group (a lower bound, since the exact per-layer sizes
+        aren't exposed by the daemon).
+        """
+        if self._daemons:
+            return sum(daemon.estimate_reclaimable(group) for daemon, group in self._group_by_daemon(items))
+        
+        total = super().estimate_reclaimable(items)
+        
+        selected = {
+            self._image_key(item['path']) for item in items
+            if item.get('type') == 'docker_image' and item.get('shared_size', 0) > 0
+        } - {None}
+        if len(selected) < 2:
+            return total
+        
+        # Only images with shared layers can hold a layer another image needs
+        sharing = [key for key, usage in self._image_usage.items() if usage['shared_size'] > 0]
+        layers = self._image_layers(sharing)
+        if not layers:
+            return total
+        
+        holders: Dict[str, Set[str]] = {}
+        for key, image_layers in layers.items():
+            for layer in image_layers:
+                holders.setdefault(layer, set()).add(key)
+        
+        # Union-find over selected images connected by a shared layer
+        parent = {key: key for key in selected}
+        
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+        
+        for layer_holders in holders.values():
+            members = sorted(layer_holders & selected)
+            for other in members[1:]:
+                parent[find(other)] = find(members[0])
+        
+        groups: Dict[str, List[str]] = {}
+        for key in selected:
+            groups.setdefault(find(key), []).append(key)
+        
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            group_layers = {layer for key in members for layer in layers.get(key, [])}
+            if any(holders[layer] - selected for layer in group_layers if len(holders[layer]) > 1):
+                continue  # Some shared layer stays in use by an image that isn't removed
+            total += max(self._image_usage[key]['shared_size'] for key in members)
+        
+        return total
+    
+    def _image_layers(self, image_keys: List[str]) -> Dict[str, List[str]]:
+        """Layer digests (RootFS.Layers) of images, by _image_usage key"""
+        if not image_keys:
+            return {}
+        
+        if self.api.usable:
+            try:
+                with ThreadPoolExecutor(max_workers=self.MAX_PARALLEL_REMOVALS) as pool:
+                    inspected = list(pool.map(self.api.inspect_image, image_keys))
+                return {
+                    key: (data.get('RootFS') or {}).get('Layers') or []
+                    for key, data in zip(image_keys, inspected)
+                }
+            except DockerAPIError as e:
+                print(f"Docker API error, falling back to the CLI: {e}")
+        
+        result = self.run_command(
+            ['docker', 'image', 'inspect', '--format', '{{.Id}} {{json .RootFS.Layers}}'] + image_keys
+        )
+        layers = {}
+        for line in (result.stdout or '').splitlines():
+            parts = line.strip().split(' ', 1)
+            if len(parts) == 2:
+                key = self._image_key(parts[0])
+                try:
+                    if key is not None:
+                        layers[key] = json.loads(parts[1]) or []
+                except json.JSONDecodeError:
+                    continue
+        return layers
+    
     def _find_stopped_containers(self) -> List[Dict]:
         """Find stopped Docker containers"""
         items = []
         
-        result = self.run_command([
-            'docker', 'ps', '-a',
+        # One listing with sizes for all stopped containers: the daemon computes
+        # them in a single pass instead of once per container
+        containers = self._json_lines([
+            'docker', 'ps', '-a', '-s',
             '--filter', 'status=exited',
             '--format', '{{json .}}'
         ])
         
-        if result.returncode == 0 and result.stdout:
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        container = json.loads(line)
-                        
-                        # Get actual size using docker ps with --size flag
-                        size_result = self.run_command([
-                            'docker', 'ps', '-a', '-s',
-                            '--filter', f'id={container.get("ID")}',
-                            '--format', '{{.Size}}'
-                        ])
-                        
-                        size_bytes = 0
-                        if size_result.returncode == 0 and size_result.stdout:
-                            # Format is like "0B (virtual 1.23GB)"
-                            size_str = size_result.stdout.strip().split('(')[0].strip()
-                            size_bytes = self._parse_docker_size(size_str)
-                        
-                        items.append({
-                            'path': container.get('ID'),
-                            'name': container.get('Names', 'Unknown'),
-                            'size': size_bytes,
-                            'type': 'docker_container',
-                            'details': f"Stopped • Status: {container.get('Status', 'Unknown')}"
-                        })
-                    except json.JSONDecodeError:
-                        continue
+        for container in containers:
+            # Format is like "0B (virtual 1.23GB)"; only the writable layer is freed
+            size_bytes = self._parse_docker_size(container.get('Size', '0B').split('(')[0].strip())
+            
+            items.append({
+                'path': container.get('ID'),
+                'name': container.get('Names', 'Unknown'),
+                'size': size_bytes,
+                'type': 'docker_container',
+                'state': container.get('State', 'exited'),
+                'details': f"Stopped • Status: {container.get('Status', 'Unknown')}"
+            })
         
         return items
     
@@ -201,54 +722,227 @@ class DockerCleaner(BaseCleaner):
             for volume_name in result.stdout.strip().split('\n'):
                 if volume_name:
                     # Get size from the parsed volume_sizes dict
-                    size_bytes = volume_sizes.get(volume_name, 0)
-                    
-                    # Add visual indicator for empty volumes
-                    if size_bytes == 0:
-                        details = "Empty volume • No data stored"
-                    else:
-                        details = "Unused volume"
-                    
-                    # Shorten volume name if too long for display
-                    display_name = volume_name
-                    if len(volume_name) > 64:
-                        display_name = f"{volume_name[:32]}...{volume_name[-28:]}"
-                    
-                    items.append({
-                        'path': volume_name,
-                        'name': display_name,
-                        'size': size_bytes,
-                        'type': 'docker_volume',
-                        'details': details
-                    })
+                    items.append(self._volume_item(volume_name, volume_sizes.get(volume_name, 0)))
         
         return items
     
-    def _get_build_cache_size(self) -> Dict:
-        """Get Docker build cache size"""
-        result = self.run_command(['docker', 'system', 'df', '--format', '{{json .}}'])
+    def _log_records_api(self, containers: List[Dict]) -> List[Dict]:
+        """Log file of every container; only containers not seen before are inspected (concurrently)"""
+        current_ids = {container['Id'] for container in containers}
+        self._log_paths = {key: path for key, path in self._log_paths.items() if key in current_ids}
         
-        if result.returncode == 0 and result.stdout:
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        data = json.loads(line)
-                        if data.get('Type') == 'Build Cache':
-                            size_str = data.get('Size', '0B')
-                            size_bytes = self._parse_docker_size(size_str)
-                            
-                            if size_bytes > 0:
-                                return {
-                                    'path': 'build-cache',
-                                    'name': 'Build Cache',
-                                    'size': size_bytes,
-                                    'type': 'docker_build_cache',
-                                    'details': 'Docker build cache'
-                                }
-                    except json.JSONDecodeError:
-                        continue
+        new_ids = [container_id for container_id in current_ids if container_id not in self._log_paths]
+        if new_ids:
+            def inspect(container_id):
+                try:
+                    return container_id, self.api.inspect_container(container_id) or {}
+                except DockerAPIError:
+                    return container_id, None  # Gone already, or the daemon is struggling: retry next scan
+            
+            with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_REMOVALS, len(new_ids))) as pool:
+                for container_id, details in pool.map(inspect, new_ids):
+                    if details is not None:
+                        log_driver = ((details.get('HostConfig') or {}).get('LogConfig') or {}).get('Type', '')
+                        self._log_paths[container_id] = (details.get('LogPath') or '') if log_driver == 'json-file' else ''
         
-        return None
+        return [
+            {
+                'id': container['Id'],
+                'name': (container.get('Names') or ['Unknown'])[0].lstrip('/'),
+                'state': container.get('State', ''),
+                'log_path': self._log_paths.get(container['Id'], '')
+            }
+            for container in containers
+        ]
+    
+    def _log_records_cli(self) -> List[Dict]:
+        """Same as _log_records_api, with one ps and one inspect call"""
+        if not self.api.socket_path:
+            return []  # A remote daemon's log files aren't on this machine
+        
+        result = self.run_command(['docker', 'ps', '-aq', '--no-trunc'])
+        ids = result.stdout.split() if result.returncode == 0 else []
+        if not ids:
+            return []
+        
+        result = self.run_command([
+            'docker', 'container', 'inspect', '--format',
+            '{{.Id}}\t{{.Name}}\t{{.State.Status}}\t{{.HostConfig.LogConfig.Type}}\t{{.LogPath}}'
+        ] + ids)
+        records = []
+        for line in result.stdout.splitlines():
+            parts = line.split('\t')
+            if len(parts) == 5:
+                records.append({
+                    'id': parts[0],
+                    'name': parts[1].lstrip('/'),
+                    'state': parts[2],
+                    'log_path': parts[4] if parts[3] == 'json-file' else ''
+                })
+        return records
+    
+    def _find_container_logs(self, records: List[Dict]) -> List[Dict]:
+        """
+        json-file logs of all containers, largest first. Logs are sized with a
+        stat where readable; the rest (the rootful daemon's data root) are sized
+        in the batched privileged scan, when privileged scanning is on.
+        """
+        records = [record for record in records if record['log_path']]
+        sizes: Dict[str, int] = {}
+        unreadable = []
+        for record in records:
+            try:
+                sizes[record['log_path']] = os.stat(record['log_path']).st_size
+            except PermissionError:
+                unreadable.append(record['log_path'])
+            except OSError:
+                continue  # Not written yet, or removed with its container
+        
+        privileged = self.measure_privileged([
+            (path, None) for path in unreadable if path.startswith(self.PRIVILEGED_LOG_ROOT + os.sep)
+        ])
+        sizes.update({path: size for (path, _), size in privileged.items() if size is not None})
+        
+        items = []
+        for record in records:
+            size_bytes = sizes.get(record['log_path'], 0)
+            if size_bytes <= 0:
+                continue
+            in_use = record['state'] not in self.LOG_CLOSED_STATES
+            items.append({
+                'path': record['log_path'],
+                'name': f"{record['name']} log",
+                'size': size_bytes,
+                'type': 'docker_log',
+                'container_id': record['id'],
+                'state': record['state'],
+                'requires_root': record['log_path'] in unreadable,
+                # Emptying a live container's log loses history someone may still want
+                'default_selected': not in_use,
+                'details': (f"{record['state'].capitalize() or 'Running'} • Truncated in place" if in_use
+                            else f"{record['state'].capitalize()} • Deleted")
+            })
+        
+        return sorted(items, key=lambda item: item['size'], reverse=True)
+    
+    def _log_in_use(self, item: Dict) -> bool:
+        """Whether the daemon may still hold a container's log open (running, paused, restarting...)"""
+        return item.get('state') not in self.LOG_CLOSED_STATES
+    
+    @staticmethod
+    def _volume_item(volume_name: str, size_bytes: int) -> Dict:
+        """Item for an unused volume"""
+        # Add visual indicator for empty volumes
+        if size_bytes == 0:
+            details = "Empty volume • No data stored"
+        else:
+            details = "Unused volume"
+        
+        # Shorten volume name if too long for display
+        display_name = volume_name
+        if len(volume_name) > 64:
+            display_name = f"{volume_name[:32]}...{volume_name[-28:]}"
+        
+        return {
+            'path': volume_name,
+            'name': display_name,
+            'size': size_bytes,
+            'type': 'docker_volume',
+            'details': details
+        }
+    
+    @staticmethod
+    def _build_cache_item(record_id: str, cache_type: str, description: str, size_bytes: int,
+                          last_used: float, shared: bool) -> Dict:
+        """Item for one build cache record"""
+        name = description or f"{cache_type or 'cache'} {record_id[:12]}"
+        if len(name) > 64:
+            name = f"{name[:61]}..."
+        
+        details = f"{cache_type or 'Build cache'} • Last used "
+        details += datetime.fromtimestamp(last_used).strftime('%Y-%m-%d %H:%M') if last_used else "unknown"
+        if shared:
+            details += " • Shared with other records"
+        
+        return {
+            'path': record_id,
+            'name': name,
+            'size': size_bytes,
+            'type': 'docker_build_cache',
+            'last_used': last_used,
+            'shared': shared,
+            'details': details
+        }
+    
+    def _find_build_cache_cli(self) -> List[Dict]:
+        """Build cache records from the 'docker system df -v' output loaded with the images"""
+        items = []
+        for usage in self._cli_usage:
+            for record in usage.get('BuildCache') or []:
+                size_bytes = self._parse_docker_size(record.get('Size', '0B'))
+                if record.get('InUse') or size_bytes <= 0:
+                    continue
+                items.append(self._build_cache_item(
+                    record.get('ID', ''), record.get('CacheType', ''), record.get('Description', ''),
+                    size_bytes, self._parse_since(record.get('LastUsedSince', '')),
+                    str(record.get('Shared', '')).lower() == 'true'
+                ))
+        return items
+    
+    def _apply_build_cache_policy(self, items: List[Dict]) -> List[Dict]:
+        """
+        Preselect cold records for pruning and leave warm ones unselected:
+        a record is cold when it was last used longer ago than the age limit,
+        or when it falls outside the newest `keep_bytes` of cache. Most
+        recently used records come first.
+        """
+        settings = load_settings()
+        max_age = float(settings.get('docker_build_cache_max_age_hours', 0)) * 3600
+        keep_bytes = int(settings.get('docker_build_cache_keep_bytes', 0))
+        now = time.time()
+        
+        items.sort(key=lambda item: item['last_used'], reverse=True)
+        kept_bytes = 0
+        for item in items:
+            kept_bytes += item['size']
+            stale = max_age > 0 and now - item['last_used'] > max_age
+            over_budget = keep_bytes > 0 and kept_bytes > keep_bytes
+            item['default_selected'] = stale or over_budget or (max_age <= 0 and keep_bytes <= 0)
+        return items
+    
+    @staticmethod
+    def _parse_timestamp(value: Optional[str]) -> float:
+        """Seconds since the epoch from an RFC 3339 API timestamp (0 if missing)"""
+        try:
+            return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+    
+    @staticmethod
+    def _parse_since(value: str) -> float:
+        """Approximate timestamp from the CLI's relative times ("3 days ago", "About an hour ago")"""
+        match = re.match(r'(?:about\s+)?(an?|\d+|less than a)\s+(second|minute|hour|day|week|month|year)s?\s+ago',
+                         value.strip().lower())
+        if not match:
+            return 0.0
+        count = 1 if not match.group(1).isdigit() else int(match.group(1))
+        unit = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400, 'week': 7 * 86400,
+                'month': 30 * 86400, 'year': 365 * 86400}[match.group(2)]
+        return time.time() - count * unit
+    
+    def _json_lines(self, command: List[str]) -> List[Dict]:
+        """Run a command printing one JSON object per line, parsing lines as they stream in"""
+        objects = []
+        
+        def on_line(line):
+            if line:
+                try:
+                    objects.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass
+        
+        result = self.run_command(command, on_line=on_line)
+        return objects if result.returncode == 0 else []
     
     def _parse_docker_size(self, size_str: str) -> int:
         """Parse Docker size string to bytes"""
@@ -286,45 +980,224 @@ class DockerCleaner(BaseCleaner):
     
     def clean(self, items: List[Dict]) -> int:
         """Clean Docker artifacts"""
+        if self._daemons:
+            total_cleaned = 0
+            for daemon, group in self._group_by_daemon(items):
+                # Progress and cancellation go through this cleaner's hooks
+                daemon.cancel_event = self.cancel_event
+                daemon.item_started_callback = self.item_started_callback
+                daemon.item_finished_callback = self.item_finished_callback
+                daemon.bytes_freed_callback = self.bytes_freed_callback
+                total_cleaned += daemon.clean(group)
+            return total_cleaned
+        
         total_cleaned = 0
         
-        for item in items:
-            item_type = item.get('type')
-            size = item['size']
-            path = item['path']
-            
-            if item_type == 'docker_image':
-                # Try to remove image, if it fails due to conflict, force it
-                result = self.run_command(['docker', 'rmi', path])
-                if result.returncode != 0 and 'conflict' in result.stderr.lower():
-                    # Image is being used by a stopped container, force removal
-                    print(f"Image {path} in use, forcing removal...")
-                    result = self.run_command(['docker', 'rmi', '-f', path])
+        # Containers first, so their images are no longer in use when removed
+        ordered = sorted(items, key=self.clean_priority)
+        for item_type, group in groupby(ordered, key=lambda item: item.get('type')):
+            group = list(group)
+            for start in range(0, len(group), self.REMOVAL_BATCH_SIZE):
+                batch = group[start:start + self.REMOVAL_BATCH_SIZE]
                 
-                if result.returncode == 0:
-                    total_cleaned += size
-                else:
-                    print(f"Failed to remove image {path}: {result.stderr}")
-            
-            elif item_type == 'docker_container':
-                result = self.run_command(['docker', 'rm', path])
-                if result.returncode == 0:
-                    total_cleaned += size
-                else:
-                    print(f"Failed to remove container {path}: {result.stderr}")
-            
-            elif item_type == 'docker_volume':
-                result = self.run_command(['docker', 'volume', 'rm', path])
-                if result.returncode == 0:
-                    total_cleaned += size
+                # A batch is removed as a whole, so cancellation takes effect between batches;
+                # each item is reported once its own result is known, never left half-journaled
+                self.check_cancelled()
+                for item, (success, error) in zip(batch, self._remove_batch(item_type, batch)):
+                    self.notify_item_started(item, check_cancel=False)
+                    if not success:
+                        print(f"Failed to remove {item_type} {item['path']}: {error}")
+                    else:
+                        self._forget(item)
+                    cleaned = item['size'] if success else 0
+                    total_cleaned += cleaned
+                    self.notify_item_finished(item, cleaned, success)
+        
+        return total_cleaned
+    
+    def _forget(self, item: Dict):
+        """Drop a removed object from the live inventory before its event arrives"""
+        if item.get('type') == 'docker_log':
+            return  # Logs are files, not daemon objects
+        object_type = {
+            'docker_container': 'container', 'docker_image': 'image', 'docker_volume': 'volume'
+        }.get(item.get('type'), 'builder')
+        self.inventory.forget(object_type, item['path'])
+    
+    def _remove_batch(self, item_type: str, batch: List[Dict]) -> List[Tuple[bool, str]]:
+        """Remove objects of one type: concurrent API calls, or multi-ID CLI commands"""
+        if item_type == 'docker_log':
+            return self._clean_logs(batch)
+        
+        if not self._removal_command(batch[0]):
+            return [(False, f"Unsupported item type: {item_type}")] * len(batch)
+        
+        if item_type == 'docker_build_cache':
+            return self._prune_build_cache(batch)
+        
+        if len(batch) == 1:
+            return [self._remove(item) for item in batch]
+        
+        if self.api.usable:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_REMOVALS, len(batch))) as pool:
+                return list(pool.map(self._remove, batch))
+        
+        ids = [item['path'] for item in batch]
+        errors = self._run_multi_id(self._removal_command(batch[0])[:-1], ids)
+        
+        if item_type == 'docker_image':
+            # Images still used by a container: one forced retry for all of them
+            conflicts = [object_id for object_id in ids if 'conflict' in errors.get(object_id, '').lower()]
+            if conflicts:
+                print(f"{len(conflicts)} images in use, forcing removal...")
+                retry_errors = self._run_multi_id(['docker', 'rmi', '-f'], conflicts)
+                for object_id in conflicts:
+                    errors.pop(object_id)
+                    if object_id in retry_errors:
+                        errors[object_id] = retry_errors[object_id]
+        
+        return [(object_id not in errors, errors.get(object_id, '')) for object_id in ids]
+    
+    def _clean_logs(self, batch: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Truncate logs the daemon may still hold open (running, paused or
+        restarting containers) in place, since it appends and so carries on at
+        offset 0, and delete logs of stopped ones; nothing is restarted. Root-owned logs go to the privileged helper in one request.
+        """
+        results: Dict[str, Tuple[bool, str]] = {}
+        privileged = []
+        for item in batch:
+            path = item['path']
+            try:
+                if self._log_in_use(item):
+                    os.truncate(path, 0)
                 else:
-                    print(f"Failed to remove volume {path}: {result.stderr}")
-            
-            elif item_type == 'docker_build_cache':
-                result = self.run_command(['docker', 'builder', 'prune', '-f'])
-                if result.returncode == 0:
-                    total_cleaned += size
+                    os.remove(path)
+                results[path] = (True, '')
+            except FileNotFoundError:
+                results[path] = (True, '')  # Removed along with its container
+            except PermissionError:
+                privileged.append(item)
+            except OSError as e:
+                results[path] = (False, str(e))
+        
+        allowed = [item for item in privileged if item['path'].startswith(self.PRIVILEGED_LOG_ROOT + os.sep)]
+        for item in privileged:
+            if item not in allowed:
+                results[item['path']] = (False, "Permission denied")
+        
+        if allowed:
+            # One operation per log, so a log that vanished meanwhile doesn't fail the others
+            ops = [{'op': 'truncate' if self._log_in_use(item) else 'unlink', 'args': {'paths': [item['path']]}}
+                   for item in allowed]
+            for item, outcome in zip(allowed, self.run_privileged(ops)):
+                if not outcome['ok']:
+                    results[item['path']] = (False, outcome['error'])
+                elif not self._log_in_use(item) and not outcome['result'].get(item['path']):
+                    results[item['path']] = (False, "Could not delete log")
                 else:
-                    print(f"Failed to clean build cache: {result.stderr}")
+                    results[item['path']] = (True, '')
         
-        return total_cleaned
+        return [results[item['path']] for item in batch]
+    
+    def _prune_build_cache(self, batch: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Prune only the selected build cache records, with a result per record.
+        BuildKit takes a single value per prune filter, so each record gets its
+        own prune (a few at a time); results come from all the responses
+        together, since one prune may also delete records selected for another.
+        """
+        ids = [item['path'] for item in batch if item['path'] != 'build-cache']
+        if len(ids) < len(batch):
+            # A whole-cache item (from an older plan): prune everything unused
+            _, error = self._prune_build_cache_record(None)
+            return [(error is None, error or '')] * len(batch)
+        
+        with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_PRUNES, len(ids))) as pool:
+            responses = list(pool.map(self._prune_build_cache_record, ids))
+        
+        deleted_ids = {record_id.rstrip('*') for deleted, _ in responses for record_id in deleted}
+        results = []
+        for record_id, (_, error) in zip(ids, responses):
+            if any(record_id.startswith(d) or d.startswith(record_id) for d in deleted_ids):
+                results.append((True, ''))
+            else:
+                results.append((False, error or "Not pruned (still referenced or already gone)"))
+        return results
+    
+    def _prune_build_cache_record(self, record_id: Optional[str]) -> Tuple[List[str], Optional[str]]:
+        """Prune one record (all unused records for None); returns (deleted record IDs, error)"""
+        if self.api.usable:
+            try:
+                return (self.api.prune_build_cache(record_id) or {}).get('CachesDeleted') or [], None
+            except DockerAPIError as e:
+                if e.status:
+                    return [], str(e)
+                print(f"Docker API error, falling back to the CLI: {e}")
+        
+        command = ['docker', 'builder', 'prune', '-f'] + ([f'--filter=id={record_id}'] if record_id else [])
+        result = self.run_command(command)
+        if result.returncode != 0:
+            return [], result.stderr.strip()
+        # Output lists the deleted records ("ID  RECLAIMABLE" rows), then a total
+        return [line.split()[0] for line in result.stdout.splitlines()
+                if line.strip() and not line.startswith(('ID', 'Total'))], None
+    
+    def _run_multi_id(self, command: List[str], ids: List[str]) -> Dict[str, str]:
+        """Run a removal command for many IDs at once; returns {id: error} for those that failed"""
+        result = self.run_command(command + ids)
+        if result.returncode == 0:
+            return {}
+        
+        # The daemon reports each failed object on its own stderr line, by name or short ID
+        lines = [line for line in result.stderr.splitlines() if line.strip()]
+        errors = {}
+        for object_id in ids:
+            short_id = object_id.replace('sha256:', '')[:12]
+            pattern = re.compile(
+                rf"(?<![\w.-])({re.escape(object_id)}|{re.escape(short_id)})(?![\w.-])"
+            )
+            for line in lines:
+                if pattern.search(line):
+                    errors[object_id] = line
+                    break
+        
+        if not errors:
+            # Failed without naming any object (e.g. daemon unreachable): nothing was removed
+            errors = {object_id: result.stderr.strip() for object_id in ids}
+        return errors
+    
+    def _remove(self, item: Dict) -> Tuple[bool, str]:
+        """Remove one object through the Engine API, or the CLI if the socket isn't usable"""
+        item_type, path = item.get('type'), item['path']
+        
+        if self.api.usable:
+            try:
+                if item_type == 'docker_container':
+                    self.api.remove_container(path)
+                elif item_type == 'docker_image':
+                    try:
+                        self.api.remove_image(path)
+                    except DockerAPIError as e:
+                        if e.status != 409:
+                            raise
+                        # Image is being used by a stopped container, force removal
+                        print(f"Image {path} in use, forcing removal...")
+                        self.api.remove_image(path, force=True)
+                elif item_type == 'docker_volume':
+                    self.api.remove_volume(path)
+                elif item_type == 'docker_build_cache':
+                    return self._prune_build_cache([item])[0]
+                return True, ''
+            except DockerAPIError as e:
+                if e.status:
+                    return False, str(e)  # The daemon answered: don't retry through the CLI
+                print(f"Docker API error, falling back to the CLI: {e}")
+        
+        result = self.run_command(self._removal_command(item))
+        if (result.returncode != 0 and item_type == 'docker_image'
+                and 'conflict' in result.stderr.lower()):
+            # Image is being used by a stopped container, force removal
+            print(f"Image {path} in use, forcing removal...")
+            result = self.run_command(['docker', 'rmi', '-f', path])
+        return result.returncode == 0, result.stderr
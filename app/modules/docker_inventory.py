@@ -0,0 +1,257 @@
+"""
+Docker Inventory - Live in-memory view of the daemon's objects, kept current from its event stream
+"""
+
+import copy
+import threading
+from typing import Dict, List, Optional
+from .docker_api import DockerAPI, DockerAPIError
+
+
+class DockerInventory:
+    """
+    The daemon's images, containers, volumes and build cache (a /system/df
+    document), fetched once and then updated in place from GET /events.
+
+    Events that carry everything needed are applied directly: container
+    create/start/die/destroy, image delete and volume destroy. Anything else
+    the stream reports (tags, pulls, prunes) marks the document stale, and
+    the next snapshot() fetches it again. Some sections are refreshed on
+    their own instead: a stopped container's writable layer may have grown
+    while it ran, so those containers are re-listed in one filtered request;
+    volume reference counts change when containers are created or destroyed
+    and volumes are created, mounted or unmounted, so the volumes are
+    re-listed then; and no event reports new build cache records or their
+    last use, so the build cache is re-listed on every snapshot.
+
+    While the stream is connected, a snapshot costs the build cache listing
+    plus whatever events made stale. When the stream drops, the listener
+    reconnects with backoff and the document is fetched afresh, since events
+    may have been missed.
+    """
+
+    # Events that can change what is reclaimable
+    EVENT_FILTERS = {
+        'type': ['container', 'image', 'volume', 'builder'],
+        'event': ['create', 'start', 'die', 'destroy', 'delete', 'untag', 'tag', 'pull',
+                  'load', 'import', 'prune', 'mount', 'unmount'],
+    }
+    RECONNECT_DELAY = 1.0  # seconds, doubled after each failed attempt
+    MAX_RECONNECT_DELAY = 60.0
+
+    def __init__(self, api: DockerAPI):
+        self.api = api
+        self._doc: Optional[Dict] = None
+        self._stale = True  # The document must be fetched again
+        self._generation = 0  # Bumped by invalidate(), so one that races a fetch isn't lost
+        self._stale_containers: set = set()  # Container IDs whose size must be fetched again
+        self._stale_volumes = False  # Volume reference counts must be fetched again
+        self._fetching = False
+        self._replay: List[Dict] = []  # Events received while a fetch was in flight
+        self._lock = threading.RLock()
+        self._fetch_lock = threading.Lock()
+        self._connected = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stream = None
+
+    @property
+    def live(self) -> bool:
+        """Whether the event stream is connected (the document is kept current)"""
+        return self._connected.is_set()
+
+    def snapshot(self) -> Dict:
+        """Copy of the current /system/df document, fetching only what events couldn't update"""
+        self._ensure_listening()
+
+        with self._fetch_lock:
+            with self._lock:
+                full = self._doc is None or self._stale or not self.live
+                stale_containers = list(self._stale_containers)
+                stale_volumes = self._stale_volumes
+                self._stale_volumes = False
+                generation = self._generation
+                self._fetching = True
+                self._replay = []
+
+            refreshed, volumes, build_cache = None, None, None
+            try:
+                if full:
+                    doc = self.api.system_df() or {}
+                else:
+                    if stale_containers:
+                        refreshed = self.api.containers(all_containers=True, size=True,
+                                                        filters={'id': stale_containers})
+                    if stale_volumes:
+                        volumes = (self.api.system_df('volume') or {}).get('Volumes') or []
+                    build_cache = (self.api.system_df('build-cache') or {}).get('BuildCache') or []
+            except DockerAPIError:
+                with self._lock:
+                    self._stale_volumes = self._stale_volumes or stale_volumes
+                raise
+            finally:
+                with self._lock:
+                    self._fetching = False
+                    replay, self._replay = self._replay, []
+
+            with self._lock:
+                if full:
+                    self._doc = doc
+                    self._stale = self._generation != generation
+                    self._stale_containers.clear()
+                    self._stale_volumes = False
+                else:
+                    if stale_containers:
+                        by_id = {container['Id']: container for container in refreshed or []}
+                        self._doc['Containers'] = [
+                            by_id.get(container['Id'], container)
+                            for container in self._doc.get('Containers') or []
+                        ]
+                        self._stale_containers.difference_update(stale_containers)
+                    if volumes is not None:
+                        self._doc['Volumes'] = volumes
+                    self._doc['BuildCache'] = build_cache
+                # Events that raced the fetch may or may not be reflected in it; applying them is idempotent
+                for event in replay:
+                    self._apply(event)
+                return copy.deepcopy(self._doc)
+
+    def invalidate(self):
+        """Fetch the whole document on the next snapshot"""
+        with self._lock:
+            self._stale = True
+            self._generation += 1
+
+    def forget(self, object_type: str, object_id: str):
+        """Drop an object we removed ourselves, without waiting for its event"""
+        action = {'container': 'destroy', 'image': 'delete', 'volume': 'destroy'}.get(object_type)
+        if action is None:
+            self.invalidate()
+            return
+        with self._lock:
+            self._apply({'Type': object_type, 'Action': action, 'Actor': {'ID': object_id}})
+
+    def stop(self):
+        """Stop listening (the document is fetched on every snapshot afterwards)"""
+        self._stopped.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+
+    # --- Event stream -----------------------------------------------------------
+
+    def _ensure_listening(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._listen, name="docker-events", daemon=True)
+            self._thread.start()
+            # Give the stream a moment to connect, so the first snapshot's fetch already counts as synced
+            self._connected.wait(timeout=1.0)
+
+    def _listen(self):
+        delay = self.RECONNECT_DELAY
+        while not self._stopped.is_set():
+            try:
+                self._stream = self.api.event_stream(self.EVENT_FILTERS)
+                self._stream.open()
+                # Whatever happened while disconnected is unknown: resync on the next snapshot
+                self.invalidate()
+                self._connected.set()
+                delay = self.RECONNECT_DELAY
+                for event in self._stream:
+                    with self._lock:
+                        if self._fetching:
+                            self._replay.append(event)
+                        self._apply(event)
+            except DockerAPIError as e:
+                if not self._stopped.is_set():
+                    print(f"Docker event stream lost, resynchronizing: {e}")
+            finally:
+                self._connected.clear()
+                self.invalidate()
+                if self._stream is not None:
+                    self._stream.close()
+                    self._stream = None
+
+            self._stopped.wait(delay)
+            delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    def _apply(self, event: Dict):
+        """Update the document from one event (caller holds the lock)"""
+        if self._doc is None:
+            return
+        object_type = event.get('Type')
+        action = event.get('Action', '')
+        actor = event.get('Actor') or {}
+        object_id = actor.get('ID') or event.get('id') or ''
+        attributes = actor.get('Attributes') or {}
+
+        if object_type == 'container':
+            containers = self._doc.setdefault('Containers', [])
+            existing = next((c for c in containers if object_id and c['Id'].startswith(object_id)), None)
+            if action == 'destroy':
+                if existing is not None:
+                    containers.remove(existing)
+                    self._count_image_use(existing.get('ImageID'), -1)
+                    self._stale_containers.discard(existing['Id'])
+                self._stale_volumes = True  # Its volumes may be unused now
+            elif action == 'create':
+                image_id = self._resolve_image(attributes.get('image', ''))
+                if existing is None and image_id is None:
+                    self.invalidate()  # Unknown image: a full fetch will sort it out
+                elif existing is None:
+                    containers.append({
+                        'Id': object_id,
+                        'Names': ['/' + attributes.get('name', object_id[:12])],
+                        'Image': attributes.get('image', ''),
+                        'ImageID': image_id,
+                        'State': 'created',
+                        'Status': 'Created',
+                        'SizeRw': 0,
+                    })
+                    self._count_image_use(image_id, 1)
+                self._stale_volumes = True  # Its volumes are referenced now
+            elif existing is None:
+                self.invalidate()  # Started or stopped before we knew about it
+            elif action == 'start':
+                existing['State'] = 'running'
+                existing['Status'] = 'Up'
+            elif action == 'die':
+                existing['State'] = 'exited'
+                existing['Status'] = f"Exited ({attributes.get('exitCode', '0')})"
+                self._stale_containers.add(existing['Id'])
+            else:
+                self.invalidate()  # prune
+        elif object_type == 'image' and action == 'delete':
+            short_id = object_id.replace('sha256:', '')
+            self._doc['Images'] = [
+                image for image in self._doc.get('Images') or []
+                if not (short_id and image['Id'].replace('sha256:', '').startswith(short_id))
+            ]
+        elif object_type == 'volume' and action == 'destroy':
+            self._doc['Volumes'] = [
+                volume for volume in self._doc.get('Volumes') or [] if volume.get('Name') != object_id
+            ]
+        elif object_type == 'volume' and action in ('create', 'mount', 'unmount'):
+            self._stale_volumes = True
+        else:
+            self.invalidate()
+
+    def _resolve_image(self, reference: str) -> Optional[str]:
+        """Image ID for a container's image reference (tag or ID), if the document knows it"""
+        if not reference:
+            return None
+        tag = reference if ':' in reference.rsplit('/', 1)[-1] else reference + ':latest'
+        short_id = reference.replace('sha256:', '')
+        is_id = len(short_id) >= 12 and all(c in '0123456789abcdef' for c in short_id)
+        for image in self._doc.get('Images') or []:
+            if tag in (image.get('RepoTags') or []):
+                return image['Id']
+            if is_id and image['Id'].replace('sha256:', '').startswith(short_id):
+                return image['Id']
+        return None
+
+    def _count_image_use(self, image_id: Optional[str], delta: int):
+        for image in self._doc.get('Images') or []:
+            if image['Id'] == image_id:
+                image['Containers'] = max(0, image.get('Containers', 0) + delta)
@@ -0,0 +1,315 @@
+"""
+Health - Backend probes, circuit breakers and adaptive command timeouts
+"""
+
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from .command_runner import get_command_runner, get_tool_registry
+from .docker_api import DockerAPI, DockerAPIError
+
+
+class CircuitBreaker:
+    """
+    Stops calling a backend after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are refused immediately. Once `reset_after` seconds have passed a
+    single trial call is let through (half-open): success closes the
+    circuit, failure re-opens it with the wait doubled (up to `max_reset_after`).
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_after: float = 30.0,
+                 max_reset_after: float = 600.0):
+        self.failure_threshold = failure_threshold
+        self.base_reset_after = reset_after
+        self.reset_after = reset_after
+        self.max_reset_after = max_reset_after
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may be made now"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_after:
+            self.state = self.HALF_OPEN
+            return True  # The trial call
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.reset_after = self.base_reset_after
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self.reset_after = min(self.reset_after * 2, self.max_reset_after)
+            self._open()
+        elif self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+
+
+class AdaptiveTimeout:
+    """
+    Per-command timeout learned from observed latencies.
+
+    Uses the TCP retransmission-timeout estimator: smoothed latency plus four
+    times its mean deviation (both EWMAs), clamped to [minimum, maximum].
+    A command that times out doubles its timeout, so a slow but healthy
+    backend isn't killed over and over. The initial timeout is kept until
+    MIN_SAMPLES latencies were seen, so one fast run can't clamp it down.
+    """
+
+    ALPHA = 0.125  # Weight of a new sample in the smoothed latency
+    BETA = 0.25  # Weight of a new sample in the deviation
+    MIN_SAMPLES = 3
+
+    def __init__(self, initial: float = 60.0, minimum: float = 5.0, maximum: float = 120.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.samples = 0
+        self.timeout = initial
+
+    def observe(self, latency: float, timed_out: bool = False):
+        if timed_out:
+            self.timeout = min(self.maximum, self.timeout * 2)
+            return
+
+        if self.srtt is None:
+            self.srtt = latency
+            self.rttvar = latency / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - latency)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * latency
+        self.samples += 1
+        if self.samples >= self.MIN_SAMPLES:
+            self.timeout = min(self.maximum, max(self.minimum, self.srtt + 4 * self.rttvar))
+
+
+def probe_docker(timeout: float, socket_path: Optional[str] = None) -> Tuple[bool, str]:
+    """GET /_ping on the daemon socket; a wedged daemon fails within the timeout"""
+    api = DockerAPI(socket_path, timeout=timeout)
+    if not api.socket_path:
+        # Remote daemon: ask the CLI, still bounded by the probe timeout
+        if not get_tool_registry().available('docker'):
+            return False, "docker is not installed"
+        result = get_command_runner().run(
+            ['docker', 'version', '--format', '{{.Server.Version}}'], timeout=timeout
+        )
+        return result.returncode == 0, (result.stdout or result.stderr).strip()
+
+    try:
+        return api.request('GET', '/_ping') == 'OK', api.socket_path
+    except DockerAPIError as e:
+        return False, str(e)
+    finally:
+        api.close()
+
+
+def probe_command(command: List[str]) -> Callable[[float], Tuple[bool, str]]:
+    """Probe that a tool is installed and answers a cheap command in time"""
+    def probe(timeout: float) -> Tuple[bool, str]:
+        if not get_tool_registry().available(command[0]):
+            return False, f"{command[0]} is not installed"
+        result = get_command_runner().run(command, timeout=timeout)
+        return result.returncode == 0, (result.stdout or result.stderr).strip()[:200]
+    return probe
+
+
+class HealthMonitor:
+    """
+    Cached health of the backends cleaners depend on.
+
+    Each backend has a cheap probe with a short timeout and a circuit
+    breaker. A healthy probe is cached for STATUS_TTL; while a circuit is
+    open the backend is reported unhealthy without probing, so a wedged
+    daemon costs one short probe rather than a full timeout per call.
+    Command outcomes reported through record() feed the same breakers (a
+    failure also drops the cached probe) but never count as a healthy
+    probe, and observe() learns per-command timeouts.
+    """
+
+    PROBE_TIMEOUT = 2.0
+    STATUS_TTL = 30.0
+
+    def __init__(self):
+        self._probes: Dict[str, Callable[[float], Tuple[bool, str]]] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._status: Dict[str, Tuple[bool, str, float]] = {}  # backend -> last probe (healthy, detail, at)
+        self._verified: Dict[str, float] = {}  # backend -> when a probe last found it healthy
+        self._timeouts: Dict[str, AdaptiveTimeout] = {}
+        self._lock = threading.Lock()
+        self._probe_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, backend: str, probe: Callable[[float], Tuple[bool, str]]):
+        """Register a probe: a callable taking a timeout and returning (healthy, detail)"""
+        with self._lock:
+            self._probes[backend] = probe
+            self._breakers.setdefault(backend, CircuitBreaker())
+            self._probe_locks.setdefault(backend, threading.Lock())
+
+    def tracks(self, backend: str) -> bool:
+        return backend in self._probes
+
+    def is_healthy(self, backend: str) -> bool:
+        """Whether a backend answers, probing at most once per STATUS_TTL"""
+        if backend not in self._probes:
+            return True
+
+        # One probe at a time per backend; concurrent callers share its result
+        with self._probe_locks[backend]:
+            with self._lock:
+                breaker = self._breakers[backend]
+                verified = self._verified.get(backend)
+                if (breaker.state == CircuitBreaker.CLOSED and verified is not None
+                        and time.monotonic() - verified < self.STATUS_TTL):
+                    return True
+                if not breaker.allow():
+                    return False
+
+            try:
+                healthy, detail = self._probes[backend](self.PROBE_TIMEOUT)
+            except Exception as e:
+                healthy, detail = False, str(e)
+            self.record(backend, healthy, detail)
+            with self._lock:
+                self._status[backend] = (healthy, detail, time.monotonic())
+                if healthy:
+                    self._verified[backend] = time.monotonic()
+            return healthy
+
+    def allow(self, backend: str) -> bool:
+        """Whether calls to a backend may be made (False while its circuit is open)"""
+        with self._lock:
+            breaker = self._breakers.get(backend)
+            return breaker is None or breaker.allow()
+
+    def record(self, backend: str, success: bool, detail: str = ''):
+        """Report the outcome of a probe or a call to a backend (feeds its circuit breaker)"""
+        with self._lock:
+            breaker = self._breakers.get(backend)
+            if breaker is None:
+                return
+            if success:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+                self._verified.pop(backend, None)  # Probe again before trusting it
+                if breaker.state == CircuitBreaker.OPEN:
+                    print(f"{backend} unavailable, skipping it for {breaker.reset_after:.0f}s: {detail}")
+
+    def timeout_for(self, key: str, maximum: Optional[float] = None) -> float:
+        """Learned timeout for a command, never above `maximum` (the caller's fixed timeout)"""
+        with self._lock:
+            return self._learned(key, maximum).timeout
+
+    def observe(self, key: str, latency: float, timed_out: bool = False,
+                maximum: Optional[float] = None):
+        """Feed a command's latency (or timeout) into its learned timeout"""
+        with self._lock:
+            self._learned(key, maximum).observe(latency, timed_out)
+
+    def _learned(self, key: str, maximum: Optional[float]) -> AdaptiveTimeout:
+        learned = self._timeouts.setdefault(key, AdaptiveTimeout())
+        if maximum is not None:
+            # Learning may shorten a command's timeout, never make it stricter than a fixed one
+            learned.maximum = maximum
+        return learned
+
+    def status(self) -> Dict[str, Dict]:
+        """Last known state of every backend, for display"""
+        with self._lock:
+            return {
+                backend: {
+                    'healthy': self._status.get(backend, (None,))[0],
+                    'detail': self._status.get(backend, (None, ''))[1],
+                    'circuit': self._breakers[backend].state
+                }
+                for backend in self._probes
+            }
+
+
+# Subcommands that change state; how long they take depends on how much there is to remove
+MUTATING_SUBCOMMANDS = {
+    'rm', 'rmi', 'prune', 'delete', 'remove', 'clean', 'autoremove', 'purge', 'truncate', 'kill', 'stop',
+    'cleanBuildCache'
+}
+ELEVATION_TOOLS = {'pkexec', 'sudo'}  # Their duration includes waiting for authentication
+MAX_LEARNED_ARGUMENTS = 2  # More positional arguments (e.g. a list of IDs) make a batch command
+
+_SUBCOMMAND = re.compile(r'^[a-z][a-zA-Z-]*$')  # Also camelCase tasks (gradle cleanBuildCache)
+
+
+def _parse_command(command: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Split a command into (tool and subcommand path, flag names, other arguments).
+    Leading --option=value words are global options and are dropped; flag values
+    and IDs end up in the arguments.
+    """
+    rest = command[1:]
+    while rest and rest[0].startswith('--') and '=' in rest[0]:
+        rest = rest[1:]  # Global options (e.g. docker --host=...) don't change what the command does
+
+    path = command[:1]
+    while rest and len(path) < 3 and _SUBCOMMAND.match(rest[0]):
+        path.append(rest[0])
+        rest = rest[1:]
+
+    flags = [word.split('=', 1)[0] for word in rest if word.startswith('-')]
+    arguments = [word for word in rest if not word.startswith('-')]
+    return path, flags, arguments
+
+
+def command_key(command: List[str]) -> str:
+    """
+    Timeout key of a command: the tool, its subcommand path and the flags it
+    uses, without global options, flag values or IDs ('docker ps -a -s --format')
+    """
+    path, flags, _ = _parse_command(command)
+    return ' '.join(path + flags)
+
+
+def learns_timeout(command: List[str]) -> bool:
+    """
+    Whether a command's timeout may be learned from earlier runs. Mutating,
+    elevated and batch commands take as long as the work they're given, so
+    they keep a fixed timeout.
+    """
+    path, _, arguments = _parse_command(command)
+    return (
+        bool(path)
+        and path[0] not in ELEVATION_TOOLS
+        and not MUTATING_SUBCOMMANDS.intersection(path[1:])
+        and len(arguments) <= MAX_LEARNED_ARGUMENTS
+    )
+
+
+_monitor: Optional[HealthMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Session-wide health monitor with the default backend probes registered"""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = HealthMonitor()
+            _monitor.register('docker', probe_docker)
+            _monitor.register('kubectl', probe_command(['kubectl', 'version', '--client']))
+            for manager in ('apt-get', 'dnf', 'pacman'):
+                _monitor.register(manager, probe_command([manager, '--version']))
+        return _monitor
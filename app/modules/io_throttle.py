@@ -0,0 +1,103 @@
+"""
+I/O Throttle - Rate limiting for deletions on busy hosts
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class IOThrottle:
+    """
+    Paces deletions with two token buckets: unlinks per second and freed
+    bytes per second.
+
+    Freeing the extents of a large file costs the filesystem (ext4, XFS) work
+    proportional to its size, so bytes are budgeted as well as operations;
+    files above `truncate_above` are shrunk in `truncate_step` chunks, each
+    paid for separately, instead of in one long journal transaction. Both
+    rates are scaled down while the kernel reports I/O pressure (PSI) above
+    `pressure_threshold`, so other services on the disk keep their latency.
+    """
+
+    PRESSURE_FILE = "/proc/pressure/io"
+    PRESSURE_INTERVAL = 0.5  # seconds between PSI reads
+    MIN_FACTOR = 0.05
+
+    def __init__(self, unlinks_per_sec: float = 500, bytes_per_sec: float = 64 * 1024 ** 2,
+                 pressure_threshold: float = 10.0, truncate_above: int = 1024 ** 3,
+                 truncate_step: int = 256 * 1024 ** 2, burst_seconds: float = 0.5):
+        self.unlinks_per_sec = unlinks_per_sec
+        self.bytes_per_sec = bytes_per_sec
+        self.pressure_threshold = pressure_threshold
+        self.truncate_above = truncate_above
+        self.truncate_step = truncate_step
+        self.burst_seconds = burst_seconds
+
+        self._next_unlink = 0.0
+        self._next_bytes = 0.0
+        self._factor = 1.0
+        self._pressure_checked = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> Optional['IOThrottle']:
+        """Build a throttle from user settings, or None when gentle mode is off"""
+        if not settings.get('gentle_io'):
+            return None
+        return cls(
+            unlinks_per_sec=settings['gentle_unlinks_per_sec'],
+            bytes_per_sec=settings['gentle_bytes_per_sec'],
+            pressure_threshold=settings['gentle_pressure_threshold'],
+            truncate_above=settings['gentle_truncate_above'],
+            truncate_step=settings['gentle_truncate_step'],
+        )
+
+    def acquire(self, unlinks: int = 0, nbytes: int = 0):
+        """Block until the budget allows the given work"""
+        with self._lock:
+            now = time.monotonic()
+            factor = self._pressure_factor(now)
+            # Idle time accumulates up to burst_seconds of credit
+            start_unlink = max(self._next_unlink, now - self.burst_seconds)
+            start_bytes = max(self._next_bytes, now - self.burst_seconds)
+
+            if unlinks and self.unlinks_per_sec > 0:
+                self._next_unlink = start_unlink + unlinks / (self.unlinks_per_sec * factor)
+            if nbytes and self.bytes_per_sec > 0:
+                self._next_bytes = start_bytes + nbytes / (self.bytes_per_sec * factor)
+
+            delay = max(self._next_unlink, self._next_bytes) - now
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_truncate(self, size: int) -> bool:
+        return self.truncate_above > 0 and size > self.truncate_above
+
+    def _pressure_factor(self, now: float) -> float:
+        """Scale factor for the rates from the 10s average I/O stall percentage"""
+        if now - self._pressure_checked < self.PRESSURE_INTERVAL:
+            return self._factor
+        self._pressure_checked = now
+
+        pressure = self.read_pressure()
+        if pressure is None or pressure <= self.pressure_threshold:
+            self._factor = 1.0
+        else:
+            self._factor = max(self.MIN_FACTOR, self.pressure_threshold / pressure)
+        return self._factor
+
+    @classmethod
+    def read_pressure(cls) -> Optional[float]:
+        """Percentage of time some task was stalled on I/O (avg10), None if unsupported"""
+        try:
+            with open(cls.PRESSURE_FILE, 'r') as f:
+                for line in f:
+                    if line.startswith('some '):
+                        for field in line.split():
+                            if field.startswith('avg10='):
+                                return float(field[len('avg10='):])
+        except (OSError, ValueError):
+            pass
+        return None
@@ -3,15 +3,23 @@ Log Cleaner - Manages system log files
 """
 
 import os
+import re
+import stat
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 from .base_cleaner import BaseCleaner
 
 
 class LogCleaner(BaseCleaner):
     """Cleans old log files"""
     
+    SYSTEM_LOG_ROOT = "/var/log"
+    # Rotated logs (syslog.1, dpkg.log.2.gz, Xorg.0.log.old); the live log is never matched
+    ROTATED_LOG = re.compile(r'\.(\d+|old)(\.(gz|xz|bz2|zst))?$|\.(gz|xz|bz2|zst)$')
+    # Directories only root can list are offered as their compressed archives, sized as root
+    ROOT_ARCHIVE_PATTERN = "*.gz"
+    
     def __init__(self, days_old: int = 30):
         super().__init__(
             name="Logs",
@@ -69,8 +77,84 @@ class LogCleaner(BaseCleaner):
                 except (OSError, PermissionError):
                     pass
         
+        # /var/log belongs to the system: only offered with privileged scanning
+        if self.privileged_scan:
+            items.extend(self._scan_system_logs(cutoff_date))
+        
         return items
     
+    def _scan_system_logs(self, cutoff_date: datetime) -> List[Dict]:
+        """
+        Rotated logs under /var/log older than the cutoff, none selected by
+        default. Listable directories are stat'ed file by file; the compressed
+        archives of directories only root can list are sized in one privileged
+        batch.
+        """
+        items = []
+        unlistable = []
+        
+        def on_error(error: OSError):
+            if isinstance(error, PermissionError) and error.filename:
+                unlistable.append(error.filename)
+        
+        for dirpath, _, filenames in os.walk(self.SYSTEM_LOG_ROOT, onerror=on_error):
+            writable = os.access(dirpath, os.W_OK)
+            for filename in filenames:
+                if not self.ROTATED_LOG.search(filename):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                mtime = datetime.fromtimestamp(st.st_mtime)
+                if not stat.S_ISREG(st.st_mode) or mtime >= cutoff_date:
+                    continue
+                items.append({
+                    'path': path,
+                    'name': filename,
+                    'size': st.st_size,
+                    'type': 'log_file',
+                    'modified': mtime.strftime('%Y-%m-%d'),
+                    'requires_root': not writable,
+                    'default_selected': False
+                })
+        
+        requests = [(path, self.ROOT_ARCHIVE_PATTERN) for path in unlistable]
+        for (path, pattern), size in self.measure_privileged(requests).items():
+            if size:
+                items.append({
+                    'path': path,
+                    'name': f"{os.path.basename(path)}/{pattern}",
+                    'size': size,
+                    'type': 'log_archives',
+                    'pattern': pattern,
+                    'requires_root': True,
+                    'default_selected': False,
+                    'details': "Compressed logs • Sized as root"
+                })
+        
+        return items
+    
+    def describe_clean(self, item: Dict) -> str:
+        """Archives of root-only directories are removed by pattern, as root"""
+        if item.get('type') == 'log_archives':
+            return f"Delete {os.path.join(item['path'], item['pattern'])} (as root)"
+        return super().describe_clean(item)
+    
+    def restorable(self, item: Dict) -> bool:
+        """Archives of root-only directories are unlinked by the privileged helper"""
+        return item.get('type') != 'log_archives'
+    
+    def on_item_changed(self, item: Dict, fingerprint: List) -> Optional[Dict]:
+        """
+        A log written to since the scan is active again, so it's no longer a
+        candidate; an archive directory that changed is re-measured
+        """
+        if item.get('type') == 'log_archives':
+            return super().on_item_changed(item, fingerprint)
+        return None
+    
     def clean(self, items: List[Dict]) -> int:
         """Clean old log files"""
         total_cleaned = 0
@@ -79,7 +163,20 @@ class LogCleaner(BaseCleaner):
             path = item['path']
             size = item['size']
             
-            if self.safe_remove(path):
-                total_cleaned += size
+            self.notify_item_started(item)
+            if item.get('type') == 'log_archives':
+                # Only the matching archives go, never the directory itself
+                outcome = self.run_privileged([
+                    {'op': 'unlink', 'args': {'paths': [path], 'pattern': item['pattern']}}
+                ])[0]
+                removed = outcome['ok'] and outcome['result'].get(path, False)
+                if not outcome['ok']:
+                    print(f"Error removing {path}/{item['pattern']}: {outcome['error']}")
+                cleaned = self.measure_freed(item) if removed else 0
+            else:
+                removed = self.safe_remove(path)
+                cleaned = size if removed else 0
+            total_cleaned += cleaned
+            self.notify_item_finished(item, cleaned, removed)
         
         return total_cleaned
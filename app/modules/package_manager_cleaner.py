@@ -6,68 +6,86 @@ import os
 from pathlib import Path
 from typing import List, Dict
 from .base_cleaner import BaseCleaner
+from .privileged_helper import PACKAGE_CLEAN_COMMANDS
 
 
 class PackageManagerCleaner(BaseCleaner):
     """Cleans package manager caches (APT, DNF, Pacman, etc.)"""
     
+    # Cache type -> (display name, package manager cleaned by the privileged helper)
+    CLEAN_COMMANDS = {
+        'apt_cache': ('APT', 'apt'),
+        'dnf_cache': ('DNF', 'dnf'),
+        'pacman_cache': ('Pacman', 'pacman'),
+    }
+    
     def __init__(self):
         super().__init__(
             name="Package Manager",
             description="Package manager cache files"
         )
     
+    # Cache type -> glob of package files counted in the cache directory
+    CACHE_PATTERNS = {
+        'apt_cache': "*.deb",
+        'dnf_cache': "*.rpm",
+        'pacman_cache': "*.pkg.tar.*",
+    }
+    
+    # (cache type, item name, command that must be installed, cache directory)
+    CACHE_LOCATIONS = [
+        ('apt_cache', 'APT Cache', 'apt', "/var/cache/apt/archives"),  # Debian/Ubuntu
+        ('dnf_cache', 'DNF Cache', 'dnf', "/var/cache/dnf"),  # Fedora/RHEL
+        ('pacman_cache', 'Pacman Cache', 'pacman', "/var/cache/pacman/pkg"),  # Arch Linux
+    ]
+    
+    def resource_key(self, items: List[Dict]) -> str:
+        """Package manager cleans run with elevated privileges and hold the package lock"""
+        return "privileged"
+    
     def scan(self) -> List[Dict]:
         """Scan for package manager caches"""
         items = []
         
-        # APT cache (Debian/Ubuntu)
-        if self.is_command_available('apt'):
-            apt_cache = Path("/var/cache/apt/archives")
-            if apt_cache.exists():
-                # Count only .deb files, not lock files and metadata
-                size = self._count_package_files(apt_cache, "*.deb")
-                if size > 0:
-                    items.append({
-                        'path': str(apt_cache),
-                        'name': 'APT Cache',
-                        'size': size,
-                        'type': 'apt_cache',
-                        'requires_root': True
-                    })
+        caches = [
+            (cache_type, name, Path(directory))
+            for cache_type, name, command, directory in self.CACHE_LOCATIONS
+            if self.is_command_available(command) and Path(directory).exists()
+        ]
         
-        # DNF/YUM cache (Fedora/RHEL)
-        if self.is_command_available('dnf'):
-            dnf_cache = Path("/var/cache/dnf")
-            if dnf_cache.exists():
-                # Count only .rpm files
-                size = self._count_package_files(dnf_cache, "*.rpm")
-                if size > 0:
-                    items.append({
-                        'path': str(dnf_cache),
-                        'name': 'DNF Cache',
-                        'size': size,
-                        'type': 'dnf_cache',
-                        'requires_root': True
-                    })
+        # Root-owned parts of the caches are only visible to the privileged scan,
+        # which sizes all of them in one elevated call (or from its cache)
+        privileged_sizes = self.measure_privileged([
+            (str(directory), self.CACHE_PATTERNS[cache_type])
+            for cache_type, _, directory in caches
+        ])
         
-        # Pacman cache (Arch Linux)
-        if self.is_command_available('pacman'):
-            pacman_cache = Path("/var/cache/pacman/pkg")
-            if pacman_cache.exists():
-                # Count only .pkg.tar.* files
-                size = self._count_package_files(pacman_cache, "*.pkg.tar.*")
-                if size > 0:
-                    items.append({
-                        'path': str(pacman_cache),
-                        'name': 'Pacman Cache',
-                        'size': size,
-                        'type': 'pacman_cache',
-                        'requires_root': True
-                    })
+        for cache_type, name, directory in caches:
+            # Count only package files, not lock files and metadata
+            size = privileged_sizes.get((str(directory), self.CACHE_PATTERNS[cache_type]))
+            if size is None:
+                size = self._count_package_files(directory, self.CACHE_PATTERNS[cache_type])
+            if size > 0:
+                items.append({
+                    'path': str(directory),
+                    'name': name,
+                    'size': size,
+                    'type': cache_type,
+                    'requires_root': True
+                })
         
         return items
     
+    def measure_item(self, item: Dict) -> int:
+        """Re-count only package files, ignoring locks and metadata"""
+        pattern = self.CACHE_PATTERNS.get(item.get('type'))
+        if pattern is None:
+            return super().measure_item(item)
+        size = self.measure_privileged([(item['path'], pattern)]).get((item['path'], pattern))
+        if size is not None:
+            return size
+        return self._count_package_files(Path(item['path']), pattern)
+    
     def _count_package_files(self, directory: Path, pattern: str) -> int:
         """Count size of package files matching pattern, ignoring metadata"""
         total_size = 0
@@ -77,11 +95,9 @@ class PackageManagerCleaner(BaseCleaner):
                     try:
                         total_size += file_path.stat().st_size
                     except (OSError, PermissionError):
-                        # If we can't read a file, try using sudo via du command
                         pass
         except (OSError, PermissionError):
-            # If we can't list directory, try using du command with sudo
-            # But for scan we don't want to prompt for sudo, so return 0
+            # Unreadable without root; the privileged scan (opt-in) sizes it instead
             pass
         
         return total_size
@@ -92,28 +108,42 @@ class PackageManagerCleaner(BaseCleaner):
         
         for item in items:
             cache_type = item.get('type')
-            size = item['size']
+            success = False
+            cleaned = 0
             
-            # Use package manager commands for safe cleaning with elevated privileges
-            if cache_type == 'apt_cache':
-                result = self.run_command(['apt-get', 'clean'], use_sudo=True)
-                if result.returncode == 0:
-                    total_cleaned += size
-                else:
-                    print(f"APT clean failed: {result.stderr}")
+            self.notify_item_started(item)
             
-            elif cache_type == 'dnf_cache':
-                result = self.run_command(['dnf', 'clean', 'all'], use_sudo=True)
-                if result.returncode == 0:
-                    total_cleaned += size
+            # The package manager's own clean, then re-size what's left, both in the
+            # session's privileged helper (authenticated once, not per command)
+            if cache_type in self.CLEAN_COMMANDS:
+                display_name, manager = self.CLEAN_COMMANDS[cache_type]
+                clean_result, size_result = self.run_privileged([
+                    {'op': 'pkg_clean', 'args': {'manager': manager}},
+                    {'op': 'du', 'args': {'paths': [item['path']],
+                                          'pattern': self.CACHE_PATTERNS[cache_type]}},
+                ])
+                success = clean_result['ok'] and clean_result['result']['returncode'] == 0
+                if not success:
+                    print(f"{display_name} clean failed: "
+                          f"{clean_result.get('error') or clean_result['result']['stderr']}")
+                elif size_result['ok']:
+                    remaining = size_result['result'].get(item['path'], 0)
+                    cleaned = max(0, item.get('size', 0) - remaining)
                 else:
-                    print(f"DNF clean failed: {result.stderr}")
+                    cleaned = self.measure_freed(item)
             
-            elif cache_type == 'pacman_cache':
-                result = self.run_command(['pacman', '-Sc', '--noconfirm'], use_sudo=True)
-                if result.returncode == 0:
-                    total_cleaned += size
-                else:
-                    print(f"Pacman clean failed: {result.stderr}")
+            total_cleaned += cleaned
+            self.notify_item_finished(item, cleaned, success)
         
         return total_cleaned
+    
+    def describe_clean(self, item: Dict) -> str:
+        """Describe the privileged package manager command for an item"""
+        if item.get('type') in self.CLEAN_COMMANDS:
+            _, manager = self.CLEAN_COMMANDS[item['type']]
+            return f"Run (as root): {' '.join(PACKAGE_CLEAN_COMMANDS[manager])}"
+        return super().describe_clean(item)
+    
+    def restorable(self, item: Dict) -> bool:
+        """Package managers clean their caches themselves, as root"""
+        return False
@@ -0,0 +1,428 @@
+"""
+Privileged Helper - One elevated process per session for whitelisted root operations
+
+This file runs standalone as root (`pkexec python3 privileged_helper.py --serve`),
+so it only uses the standard library and never imports the rest of the app.
+"""
+
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import threading
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Locations the helper may size or modify; anything else is rejected
+ALLOWED_ROOTS = (
+    '/var/cache',
+    '/var/log',
+    '/var/tmp',
+    '/var/lib/docker',
+)
+
+# Files under these roots may be truncated in place (logs still held open)
+TRUNCATE_ROOTS = (
+    '/var/log',
+    '/var/lib/docker/containers',
+)
+
+# Package manager -> fixed clean command; no arguments are taken from the client
+PACKAGE_CLEAN_COMMANDS = {
+    'apt': ['apt-get', 'clean'],
+    'dnf': ['dnf', 'clean', 'all'],
+    'pacman': ['pacman', '-Sc', '--noconfirm'],
+}
+
+COMMAND_TIMEOUT = 600
+
+
+class HelperError(Exception):
+    """A request the helper refuses or fails to perform"""
+
+
+# --- Server side (runs as root) -------------------------------------------------
+
+def _validate(path: str, roots=ALLOWED_ROOTS, allow_root: bool = False) -> str:
+    """
+    Accept only absolute, normalized paths inside an allowed root.
+    The parent is resolved so symlinked directories can't redirect an operation;
+    the last component itself is never followed.
+    """
+    if not isinstance(path, str) or not os.path.isabs(path) or os.path.normpath(path) != path:
+        raise HelperError(f"Invalid path: {path!r}")
+
+    real = os.path.join(os.path.realpath(os.path.dirname(path)), os.path.basename(path))
+    for root in roots:
+        if real == root and allow_root:
+            return real
+        if real.startswith(root + os.sep):
+            return real
+    raise HelperError(f"Path not allowed: {path}")
+
+
+def _open_parent(real: str) -> int:
+    """
+    Open the parent directory of a validated path component by component with
+    O_NOFOLLOW, so a directory swapped for a symlink after validation is refused.
+    """
+    fd = os.open('/', os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+    try:
+        for part in os.path.dirname(real).strip('/').split('/'):
+            if not part:
+                continue
+            next_fd = os.open(part, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | os.O_CLOEXEC,
+                              dir_fd=fd)
+            os.close(fd)
+            fd = next_fd
+    except OSError:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _tree_size(path: str, pattern: Optional[str] = None) -> int:
+    """Apparent size of a file or tree (optionally only files matching a glob), without following symlinks"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return 0
+    if not stat.S_ISDIR(st.st_mode):
+        return st.st_size if pattern is None else 0
+
+    if pattern is not None:
+        total = 0
+        for file_path in Path(path).glob(pattern):
+            try:
+                file_st = file_path.lstat()
+                if stat.S_ISREG(file_st.st_mode):
+                    total += file_st.st_size
+            except OSError:
+                continue
+        return total
+
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _paths(args: Dict) -> List[str]:
+    """The 'paths' argument, which must be a list (each path is checked by _validate)"""
+    paths = args.get('paths', [])
+    if not isinstance(paths, list):
+        raise HelperError(f"Invalid paths: {paths!r}")
+    return paths
+
+
+def _rmtree_at(parent_fd: int, name: str):
+    """
+    Remove a directory tree relative to an open parent, never following symlinks:
+    every directory is opened with O_NOFOLLOW from the one above it, so a
+    directory swapped for a symlink is refused instead of being followed.
+    """
+    fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | os.O_CLOEXEC, dir_fd=parent_fd)
+    try:
+        with os.scandir(fd) as entries:
+            children = [(entry.name, entry.is_dir(follow_symlinks=False)) for entry in entries]
+        for child, is_dir in children:
+            if is_dir:
+                _rmtree_at(fd, child)
+            else:
+                os.unlink(child, dir_fd=fd)
+    finally:
+        os.close(fd)
+    os.rmdir(name, dir_fd=parent_fd)
+
+
+def _pattern(args: Dict, nested: bool = True) -> Optional[str]:
+    """The optional 'pattern' glob, relative and inside the path it applies to"""
+    pattern = args.get('pattern')
+    if pattern is not None and (not isinstance(pattern, str) or '..' in pattern or pattern.startswith('/')
+                                or (not nested and os.sep in pattern)):
+        raise HelperError(f"Invalid pattern: {pattern!r}")
+    return pattern
+
+
+def _unlink_matching(parent_fd: int, name: str, pattern: str):
+    """Remove the regular files directly inside a directory whose names match a glob"""
+    fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | os.O_CLOEXEC, dir_fd=parent_fd)
+    try:
+        with os.scandir(fd) as entries:
+            matching = [entry.name for entry in entries
+                        if fnmatch(entry.name, pattern) and entry.is_file(follow_symlinks=False)]
+        for child in matching:
+            try:
+                os.unlink(child, dir_fd=fd)
+            except FileNotFoundError:
+                continue
+    finally:
+        os.close(fd)
+
+
+def op_du(args: Dict) -> Dict[str, int]:
+    """Size several paths in one go: {'paths': [...], 'pattern': optional glob}"""
+    pattern = _pattern(args)
+    return {
+        path: _tree_size(_validate(path, allow_root=True), pattern)
+        for path in _paths(args)
+    }
+
+
+def op_pkg_clean(args: Dict) -> Dict:
+    """Run a package manager's own cache clean: {'manager': 'apt'|'dnf'|'pacman'}"""
+    manager = args.get('manager')
+    command = PACKAGE_CLEAN_COMMANDS.get(manager) if isinstance(manager, str) else None
+    if command is None:
+        raise HelperError(f"Unknown package manager: {args.get('manager')!r}")
+    result = subprocess.run(command, capture_output=True, text=True, timeout=COMMAND_TIMEOUT)
+    return {'returncode': result.returncode, 'stderr': result.stderr[-2000:]}
+
+
+def op_unlink(args: Dict) -> Dict[str, bool]:
+    """
+    Remove files or trees strictly inside an allowed root: {'paths': [...]}, or
+    with a 'pattern' glob only the matching files directly inside each directory
+    """
+    pattern = _pattern(args, nested=False)
+    removed = {}
+    for path in _paths(args):
+        real = _validate(path)
+        name = os.path.basename(real)
+        try:
+            parent_fd = _open_parent(real)
+        except FileNotFoundError:
+            removed[path] = True
+            continue
+        try:
+            st = os.stat(name, dir_fd=parent_fd, follow_symlinks=False)
+            if pattern is not None:
+                _unlink_matching(parent_fd, name, pattern)
+            elif stat.S_ISDIR(st.st_mode):
+                _rmtree_at(parent_fd, name)
+            else:
+                os.unlink(name, dir_fd=parent_fd)
+            removed[path] = True
+        except FileNotFoundError:
+            removed[path] = True
+        except OSError:
+            removed[path] = False
+        finally:
+            os.close(parent_fd)
+    return removed
+
+
+def op_truncate(args: Dict) -> Dict[str, int]:
+    """Truncate regular files to zero, returning the bytes released: {'paths': [...]}"""
+    released = {}
+    for path in _paths(args):
+        real = _validate(path, roots=TRUNCATE_ROOTS)
+        parent_fd = _open_parent(real)
+        try:
+            fd = os.open(os.path.basename(real), os.O_WRONLY | os.O_NOFOLLOW | os.O_CLOEXEC,
+                         dir_fd=parent_fd)
+        finally:
+            os.close(parent_fd)
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                raise HelperError(f"Not a regular file: {path}")
+            os.ftruncate(fd, 0)
+            released[path] = st.st_size
+        finally:
+            os.close(fd)
+    return released
+
+
+OPERATIONS = {
+    'du': op_du,
+    'pkg_clean': op_pkg_clean,
+    'unlink': op_unlink,
+    'truncate': op_truncate,
+}
+
+
+def execute(ops: List[Dict]) -> List[Dict]:
+    """Run a batch of operations back to back"""
+    results = []
+    for op in ops:
+        try:
+            if not isinstance(op, dict) or not isinstance(op.get('args', {}), dict):
+                raise HelperError(f"Malformed operation: {op!r}")
+            handler = OPERATIONS.get(op.get('op')) if isinstance(op.get('op'), str) else None
+            if handler is None:
+                raise HelperError(f"Unknown operation: {op.get('op')!r}")
+            results.append({'ok': True, 'result': handler(op.get('args', {}))})
+        except (HelperError, OSError, subprocess.SubprocessError) as e:
+            results.append({'ok': False, 'error': str(e)})
+        except (TypeError, ValueError, KeyError, AttributeError) as e:
+            # Malformed arguments must fail the operation, not kill the helper
+            results.append({'ok': False, 'error': f"Bad arguments: {e}"})
+    return results
+
+
+def serve():
+    """Answer JSON-line requests ({'id', 'ops'}) on stdin until it is closed"""
+    os.umask(0o022)
+    print(json.dumps({'ready': True}), flush=True)
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+            ops = request.get('ops', [])
+            if not isinstance(ops, list):
+                raise ValueError("'ops' must be a list")
+            response = {'id': request.get('id'), 'results': execute(ops)}
+        except (ValueError, AttributeError) as e:
+            response = {'id': None, 'error': f"Bad request: {e}"}
+        print(json.dumps(response), flush=True)
+
+
+# --- Client side (runs as the user) ---------------------------------------------
+
+def _user_controlled(path: str) -> bool:
+    """
+    Whether the current user could change what runs at `path`: the file, or
+    any directory above it, is writable (a writable directory lets its entries
+    be renamed and replaced). Sticky directories such as /tmp only protect
+    entries the user doesn't own.
+    """
+    if os.access(path, os.W_OK):
+        return True
+    child = path
+    parent = os.path.dirname(child)
+    while parent != child:
+        try:
+            parent_st = os.stat(parent)
+            child_st = os.lstat(child)
+        except OSError:
+            return True
+        if os.access(parent, os.W_OK):
+            sticky = parent_st.st_mode & stat.S_ISVTX
+            if not sticky or child_st.st_uid == os.getuid():
+                return True
+        child, parent = parent, os.path.dirname(parent)
+    return False
+
+
+class PrivilegedHelper:
+    """
+    Client for the helper process.
+
+    The helper is elevated lazily on the first request, so a single polkit
+    authentication covers the whole session. Requests are batches of
+    operations executed back to back; if the app already runs as root they
+    are executed in-process.
+    """
+
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def request(self, ops: List[Dict]) -> List[Dict]:
+        """Execute a batch of operations as root, one result per operation"""
+        if os.geteuid() == 0:
+            return execute(ops)
+
+        with self._lock:
+            try:
+                process = self._ensure_started()
+                self._next_id += 1
+                process.stdin.write(json.dumps({'id': self._next_id, 'ops': ops}) + '\n')
+                process.stdin.flush()
+                response = json.loads(process.stdout.readline() or 'null')
+            except (OSError, ValueError, HelperError) as e:
+                self._stop()
+                return [{'ok': False, 'error': str(e)} for _ in ops]
+
+        if not response or 'results' not in response:
+            error = (response or {}).get('error', 'Privileged helper exited')
+            with self._lock:
+                self._stop()
+            return [{'ok': False, 'error': error} for _ in ops]
+        return response['results']
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self.running:
+            return self._process
+
+        launcher = self._launcher()
+        if launcher is None:
+            raise HelperError("No privilege escalation tool available (pkexec or sudo)")
+
+        # Whatever runs as root must not be replaceable by the user (user or venv installs)
+        interpreter = os.path.realpath(sys.executable)
+        script = os.path.realpath(__file__)
+        for path in (interpreter, script):
+            if _user_controlled(path):
+                raise HelperError(
+                    f"Refusing to elevate: {path} can be modified without root. "
+                    "Install the application system-wide to use root operations."
+                )
+
+        self._process = subprocess.Popen(
+            # -I -S: ignore PYTHON* variables, the user site and .pth files
+            launcher + [interpreter, '-I', '-S', script, '--serve'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1
+        )
+        # Blocks until the user has authenticated (or declined)
+        ready = self._process.stdout.readline()
+        if not ready or not json.loads(ready).get('ready'):
+            self._stop()
+            raise HelperError("Authentication failed or was cancelled")
+        return self._process
+
+    @staticmethod
+    def _launcher() -> Optional[List[str]]:
+        if shutil.which('pkexec'):
+            return ['pkexec']
+        if shutil.which('sudo'):
+            return ['sudo', '-n']  # -n = non-interactive
+        return None
+
+    def _stop(self):
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+            self._process = None
+
+
+_helper: Optional[PrivilegedHelper] = None
+_helper_lock = threading.Lock()
+
+
+def get_privileged_helper() -> PrivilegedHelper:
+    """Session-wide privileged helper client"""
+    global _helper
+    with _helper_lock:
+        if _helper is None:
+            _helper = PrivilegedHelper()
+        return _helper
+
+
+if __name__ == "__main__":
+    if '--serve' in sys.argv[1:]:
+        serve()
@@ -0,0 +1,119 @@
+"""
+Privileged Scan - Sizes of root-owned locations, measured in one elevated batch
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from .privileged_helper import get_privileged_helper
+from .storage import load_json, save_json
+
+
+SizeRequest = Tuple[str, Optional[str]]  # (path, glob pattern or None for the whole tree)
+
+
+class PrivilegedSizeCache:
+    """
+    Measures locations the user can't read (package caches, /var/log,
+    /var/tmp, /var/lib/docker subdirectories) through the privileged helper,
+    and remembers the results.
+
+    Every cached size is stored with the directory's fingerprint
+    (dev, ino, mtime, ctime), which an unprivileged lstat can still read. A
+    later scan reuses the size while the fingerprint matches, so it doesn't
+    need to elevate again; everything that did change is measured in a single
+    helper request. A directory's mtime only reflects its direct entries, so
+    sizes of deeper trees also expire after MAX_AGE. Paths inside directories
+    the user can't search (e.g. container logs) have no fingerprint and are
+    measured every time.
+    """
+
+    CACHE_FILE = "privileged_sizes.json"
+    MAX_AGE = 6 * 3600  # seconds
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sizes(self, requests: List[SizeRequest]) -> Dict[SizeRequest, Optional[int]]:
+        """Size of each (path, pattern); None when it couldn't be measured"""
+        now = time.time()
+        results: Dict[SizeRequest, Optional[int]] = {}
+        fingerprints = {}
+        misses: Dict[Optional[str], List[str]] = {}  # pattern -> paths
+
+        with self._lock:
+            cache = self._load()
+
+        for path, pattern in requests:
+            try:
+                fingerprint = self._fingerprint(path)
+            except PermissionError:
+                fingerprint = None  # Only root can see it: measure, but don't cache
+            except OSError:
+                results[(path, pattern)] = None  # Gone
+                continue
+            fingerprints[(path, pattern)] = fingerprint
+            cached = cache.get(self._key(path, pattern))
+            if (fingerprint is not None and cached and cached['fingerprint'] == fingerprint
+                    and now - cached['measured_at'] < self.MAX_AGE):
+                results[(path, pattern)] = cached['size']
+            else:
+                misses.setdefault(pattern, []).append(path)
+
+        if not misses:
+            return results
+
+        # One helper request for everything that changed, one 'du' per pattern
+        patterns = list(misses)
+        ops = [{'op': 'du', 'args': {'paths': misses[pattern], 'pattern': pattern}}
+               for pattern in patterns]
+        outcomes = get_privileged_helper().request(ops)
+
+        with self._lock:
+            cache = self._load()
+            for pattern, outcome in zip(patterns, outcomes):
+                for path in misses[pattern]:
+                    size = outcome['result'].get(path) if outcome['ok'] else None
+                    results[(path, pattern)] = size
+                    if size is not None and fingerprints[(path, pattern)] is not None:
+                        cache[self._key(path, pattern)] = {
+                            'size': size,
+                            'fingerprint': fingerprints[(path, pattern)],
+                            'measured_at': now
+                        }
+                if not outcome['ok']:
+                    print(f"Privileged scan failed: {outcome['error']}")
+            self._save(cache)
+
+        return results
+
+    @staticmethod
+    def _fingerprint(path: str) -> List[int]:
+        st = os.lstat(path)
+        return [st.st_dev, st.st_ino, st.st_mtime_ns, st.st_ctime_ns]
+
+    @staticmethod
+    def _key(path: str, pattern: Optional[str]) -> str:
+        return json.dumps([path, pattern])
+
+    def _load(self) -> Dict:
+        cache = load_json(self.CACHE_FILE, default={})
+        return cache if isinstance(cache, dict) else {}
+
+    def _save(self, cache: Dict):
+        save_json(self.CACHE_FILE, cache)
+
+
+_cache: Optional[PrivilegedSizeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_privileged_size_cache() -> PrivilegedSizeCache:
+    """Session-wide cache of privileged sizes"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PrivilegedSizeCache()
+        return _cache
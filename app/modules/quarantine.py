@@ -0,0 +1,183 @@
+"""
+Quarantine - Reversible removal by renaming items aside on the same filesystem
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+from .staging_area import StagingArea, directory_on_device
+from .storage import load_json, save_json
+
+
+class Quarantine:
+    """
+    Moves removed items into a per-filesystem quarantine directory instead of
+    deleting them.
+
+    A rename within the filesystem costs no copying, so quarantining is as fast
+    as staging while staying reversible: every entry is indexed with its
+    original path and can be restored. Retention is bounded: entries are
+    purged (handed to the background deleter) when older than a maximum age,
+    when the quarantine grows over a size cap, or when a filesystem holding
+    entries runs low on free space.
+    """
+
+    DIR_NAME = ".echo-cleaner-quarantine"
+    INDEX_FILE = "quarantine.json"
+
+    def __init__(self, staging_area: Optional[StagingArea] = None):
+        self.staging_area = staging_area or StagingArea()
+        self._dirs_by_device: Dict[int, Optional[str]] = {}
+        self.session_paths: List[str] = []  # Original paths quarantined since the last flush
+        self._lock = threading.Lock()
+
+    def entries(self) -> List[Dict]:
+        """Quarantined entries, newest first, dropping any that vanished"""
+        with self._lock:
+            index = self._load()
+            alive = [entry for entry in index if os.path.lexists(entry['quarantined_path'])]
+            if len(alive) != len(index):
+                self._save(alive)
+        return sorted(alive, key=lambda entry: entry['created_at'], reverse=True)
+
+    def quarantine(self, path: str, size: int = 0, category: str = '') -> bool:
+        """Atomically move a path into the quarantine directory of its filesystem"""
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return False
+
+        quarantine_dir = self._dir_for(path, st.st_dev)
+        if not quarantine_dir:
+            return False
+
+        entry_id = uuid.uuid4().hex[:12]
+        target = os.path.join(quarantine_dir, entry_id)
+        try:
+            os.rename(path, target)
+        except OSError as e:
+            print(f"Could not quarantine {path}: {e}")
+            return False
+
+        with self._lock:
+            index = self._load()
+            index.append({
+                'id': entry_id,
+                'original_path': os.path.abspath(path),
+                'quarantined_path': target,
+                'size': size,
+                'category': category,
+                'device': st.st_dev,
+                'created_at': time.time()
+            })
+            self._save(index)
+            self.session_paths.append(path)
+
+        return True
+
+    def restore(self, entry_id: str) -> Tuple[bool, str]:
+        """Move an entry back to its original path"""
+        with self._lock:
+            index = self._load()
+            entry = next((e for e in index if e['id'] == entry_id), None)
+            if entry is None:
+                return False, "Entry not found in quarantine"
+
+            original = entry['original_path']
+            if os.path.lexists(original):
+                return False, f"{original} already exists"
+
+            try:
+                os.makedirs(os.path.dirname(original), exist_ok=True)
+                os.rename(entry['quarantined_path'], original)
+            except OSError as e:
+                return False, f"Could not restore {original}: {e}"
+
+            self._save([e for e in index if e['id'] != entry_id])
+
+        return True, original
+
+    def purge(self, entry_ids: List[str]) -> int:
+        """Hand entries to the background deleter; returns the bytes released"""
+        released = 0
+        with self._lock:
+            index = self._load()
+            remaining = []
+            for entry in index:
+                if entry['id'] in entry_ids and (
+                        self.staging_area.stage(entry['quarantined_path'])
+                        or not os.path.lexists(entry['quarantined_path'])):
+                    released += entry.get('size', 0)
+                else:
+                    remaining.append(entry)
+            self._save(remaining)
+
+        self.staging_area.flush()
+        return released
+
+    def enforce_retention(self, max_age_days: float, max_bytes: int, min_free_percent: float) -> int:
+        """Purge entries by age, total size and free space; returns the bytes released"""
+        entries = sorted(self.entries(), key=lambda entry: entry['created_at'])  # Oldest first
+        now = time.time()
+        to_purge = set()
+
+        if max_age_days > 0:
+            to_purge.update(
+                entry['id'] for entry in entries
+                if now - entry['created_at'] > max_age_days * 86400
+            )
+
+        if max_bytes > 0:
+            total = sum(entry.get('size', 0) for entry in entries if entry['id'] not in to_purge)
+            for entry in entries:
+                if total <= max_bytes:
+                    break
+                if entry['id'] not in to_purge:
+                    to_purge.add(entry['id'])
+                    total -= entry.get('size', 0)
+
+        if min_free_percent > 0:
+            for device_entries in self._by_device(entries).values():
+                try:
+                    stats = os.statvfs(os.path.dirname(device_entries[0]['quarantined_path']))
+                except OSError:
+                    continue
+                wanted = stats.f_blocks * stats.f_frsize * min_free_percent / 100
+                free = stats.f_bavail * stats.f_frsize + sum(
+                    entry.get('size', 0) for entry in device_entries if entry['id'] in to_purge
+                )
+                for entry in device_entries:
+                    if free >= wanted:
+                        break
+                    if entry['id'] not in to_purge:
+                        to_purge.add(entry['id'])
+                        free += entry.get('size', 0)
+
+        return self.purge(sorted(to_purge)) if to_purge else 0
+
+    def flush(self):
+        """Forget the paths quarantined in this session"""
+        self.session_paths.clear()
+
+    @staticmethod
+    def _by_device(entries: List[Dict]) -> Dict[int, List[Dict]]:
+        groups: Dict[int, List[Dict]] = {}
+        for entry in entries:
+            groups.setdefault(entry.get('device'), []).append(entry)
+        return groups
+
+    def _dir_for(self, path: str, device: int) -> Optional[str]:
+        """Find (or create) the quarantine directory on the same filesystem as path"""
+        if device not in self._dirs_by_device:
+            self._dirs_by_device[device] = directory_on_device(
+                path, device, "quarantine", self.DIR_NAME
+            )
+        return self._dirs_by_device[device]
+
+    def _load(self) -> List[Dict]:
+        return load_json(self.INDEX_FILE, default=[]) or []
+
+    def _save(self, index: List[Dict]):
+        save_json(self.INDEX_FILE, index)
@@ -0,0 +1,65 @@
+"""
+Space Meter - Measures actually-freed space per filesystem
+"""
+
+import os
+from typing import Dict, Iterable
+
+
+def find_mount_point(path: str) -> str:
+    """Walk up from path (or its nearest existing ancestor) to the root of its filesystem"""
+    path = os.path.abspath(path)
+    while not os.path.lexists(path) and path != os.path.dirname(path):
+        path = os.path.dirname(path)
+
+    device = os.lstat(path).st_dev
+    while path != os.path.dirname(path):
+        parent = os.path.dirname(path)
+        try:
+            if os.stat(parent).st_dev != device:
+                break
+        except OSError:
+            break
+        path = parent
+    return path
+
+
+class SpaceMeter:
+    """
+    Snapshots free space per filesystem with statvfs.
+
+    Comparing snapshots taken around a clean operation gives the space that was
+    really reclaimed, independently of what the scan estimated or what a
+    command's exit status claims.
+    """
+
+    @staticmethod
+    def snapshot(paths: Iterable[str]) -> Dict[str, int]:
+        """Free bytes of every filesystem holding one of the paths, keyed by mount point"""
+        free = {}
+        seen_devices = set()
+        for path in paths:
+            if not isinstance(path, str) or not path.startswith('/'):
+                continue
+            try:
+                # One lstat per path; the mount point is only resolved once per device
+                device = os.lstat(path).st_dev if os.path.lexists(path) else None
+                if device is not None and device in seen_devices:
+                    continue
+                mount = find_mount_point(path)
+                if device is not None:
+                    seen_devices.add(device)
+                if mount not in free:
+                    stats = os.statvfs(mount)
+                    free[mount] = stats.f_bfree * stats.f_frsize
+            except OSError:
+                continue
+        return free
+
+    @staticmethod
+    def delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+        """Bytes freed per mount point between two snapshots"""
+        return {
+            mount: after[mount] - before[mount]
+            for mount in before if mount in after
+        }
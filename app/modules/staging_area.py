@@ -0,0 +1,185 @@
+"""
+Staging Area - Rename-then-background-delete for instant perceived cleaning
+"""
+
+import fcntl
+import os
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from .deletion_engine import DeletionEngine
+from .io_throttle import IOThrottle
+from .space_meter import find_mount_point
+from .storage import get_data_dir, load_json, load_settings, save_json
+
+
+class StagingArea:
+    """
+    Moves items into hidden per-filesystem staging directories.
+
+    A rename() within the same filesystem is O(1) regardless of the size of the
+    tree, so items disappear from the user's perspective immediately. The actual
+    unlinking is done by a detached, low-priority deleter process that survives
+    closing the UI; staging directories left non-empty are resumed on next start.
+    """
+
+    DIR_NAME = ".echo-cleaner-staging"
+    REGISTRY_FILE = "staging.json"
+    LOCK_NAME = ".lock"
+
+    def __init__(self):
+        self._dirs_by_device: Dict[int, Optional[str]] = {}
+        self.pending: Set[str] = set()
+        self.staged_paths: List[str] = []  # Original paths staged since the last flush
+
+    def stage(self, path: str) -> bool:
+        """Atomically move a path into the staging directory of its filesystem"""
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return False
+
+        staging_dir = self.staging_dir_for(path, st.st_dev)
+        if not staging_dir:
+            return False
+
+        target = os.path.join(
+            staging_dir, f"{int(time.time())}-{uuid.uuid4().hex[:8]}-{os.path.basename(path)}"
+        )
+        try:
+            os.rename(path, target)
+        except OSError as e:
+            print(f"Could not stage {path}: {e}")
+            return False
+
+        self.pending.add(staging_dir)
+        self.staged_paths.append(path)
+        return True
+
+    def staging_dir_for(self, path: str, device: int) -> Optional[str]:
+        """Find (or create) a staging directory on the same filesystem as path"""
+        if device in self._dirs_by_device:
+            return self._dirs_by_device[device]
+
+        staging_dir = directory_on_device(path, device, "staging", self.DIR_NAME)
+        if staging_dir:
+            self._register(staging_dir)
+
+        self._dirs_by_device[device] = staging_dir
+        return staging_dir
+
+    def flush(self, gentle: bool = False):
+        """Start the background deleter for everything staged in this session"""
+        if self.pending:
+            spawn_background_deleter(sorted(self.pending), gentle)
+            self.pending.clear()
+        self.staged_paths.clear()
+
+    def resume_pending(self):
+        """Resume deletion of staging directories left non-empty by a previous session"""
+        leftovers = [
+            staging_dir for staging_dir in load_json(self.REGISTRY_FILE, default=[]) or []
+            if _staged_entries(staging_dir)
+        ]
+        if leftovers:
+            spawn_background_deleter(leftovers, load_settings().get('gentle_io', False))
+
+    def _register(self, staging_dir: str):
+        """Remember staging directories so they can be resumed on next start"""
+        registry = load_json(self.REGISTRY_FILE, default=[]) or []
+        if staging_dir not in registry:
+            registry.append(staging_dir)
+            save_json(self.REGISTRY_FILE, registry)
+
+
+def directory_on_device(path: str, device: int, data_subdir: str, hidden_name: str) -> Optional[str]:
+    """
+    Find (or create) a private directory on the same filesystem as path, so
+    items can be moved into it with a rename: the data directory if it lives
+    on that filesystem, otherwise a hidden per-user directory at its mount point.
+    """
+    candidates = [
+        get_data_dir() / data_subdir,
+        Path(find_mount_point(path)) / f"{hidden_name}-{os.getuid()}",
+    ]
+    for candidate in candidates:
+        try:
+            if not candidate.exists() and candidate.parent.stat().st_dev != device:
+                continue
+            candidate.mkdir(mode=0o700, exist_ok=True)
+            if candidate.stat().st_dev == device:
+                return str(candidate)
+        except OSError:
+            continue
+    return None
+
+
+def _staged_entries(staging_dir: str) -> List[str]:
+    """List staged entries, ignoring the deleter lock file"""
+    try:
+        return [name for name in os.listdir(staging_dir) if name != StagingArea.LOCK_NAME]
+    except OSError:
+        return []
+
+
+def spawn_background_deleter(staging_dirs: List[str], gentle: bool = False):
+    """Launch a detached deleter process that empties the given staging directories"""
+    app_dir = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [app_dir, env.get('PYTHONPATH')]))
+
+    try:
+        subprocess.Popen(
+            [sys.executable, '-m', 'modules.staging_area'] + (['--gentle'] if gentle else [])
+            + list(staging_dirs),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,  # Survive closing the UI
+            close_fds=True
+        )
+    except OSError as e:
+        print(f"Could not start background deleter: {e}")
+
+
+def run_deleter(staging_dirs: List[str], gentle: bool = False):
+    """Empty staging directories at idle CPU and I/O priority"""
+    try:
+        os.nice(19)
+        import psutil
+        psutil.Process().ionice(psutil.IOPRIO_CLASS_IDLE)
+    except (OSError, ImportError, AttributeError):
+        pass
+
+    # Idle I/O priority is ignored by some schedulers; gentle mode paces deletions explicitly
+    settings = dict(load_settings(), gentle_io=gentle)
+    engine = DeletionEngine(max_workers=2, throttle=IOThrottle.from_settings(settings))
+
+    for staging_dir in staging_dirs:
+        try:
+            lock_fd = os.open(os.path.join(staging_dir, StagingArea.LOCK_NAME),
+                              os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError:
+            continue
+
+        try:
+            # Another deleter is already working on this directory
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(lock_fd)
+            continue
+
+        try:
+            for name in _staged_entries(staging_dir):
+                engine.remove(os.path.join(staging_dir, name))
+        finally:
+            os.close(lock_fd)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run_deleter([arg for arg in args if arg != '--gentle'], gentle='--gentle' in args)
@@ -0,0 +1,102 @@
+"""
+Storage - Persistent application state on disk
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+
+APP_DIR_NAME = "echo-cleaner"
+SETTINGS_FILE = "settings.json"
+
+# User preferences; persisted values override these
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    # I/O-gentle deletion for busy hosts
+    'gentle_io': False,
+    'gentle_unlinks_per_sec': 500,
+    'gentle_bytes_per_sec': 64 * 1024 ** 2,
+    'gentle_pressure_threshold': 10.0,  # % of time tasks stalled on I/O (PSI avg10)
+    'gentle_truncate_above': 1024 ** 3,
+    'gentle_truncate_step': 256 * 1024 ** 2,
+    # Reversible cleaning: removed items are moved aside and purged later
+    'quarantine': False,
+    'quarantine_max_age_days': 7,
+    'quarantine_max_bytes': 20 * 1024 ** 3,
+    'quarantine_min_free_percent': 10.0,
+    # Size root-owned caches through the privileged helper while scanning
+    'privileged_scan': False,
+    # Unused tagged Docker images: the newest N per repository are always kept,
+    # as are images matching a protected pattern ('repo', 'repo:tag', globs allowed)
+    'docker_keep_per_repo': 3,
+    'docker_protected_images': [],
+    # Build cache records preselected for pruning: last used longer ago than this,
+    # or beyond the newest `keep_bytes` of cache (0 disables either rule)
+    'docker_build_cache_max_age_hours': 72,
+    'docker_build_cache_keep_bytes': 0,
+    # Caches that refill to this fraction of their cleaned size within the window
+    # are "hot" and deselected by default
+    'regrowth_hot_ratio': 0.5,
+    'regrowth_window_hours': 24.0,
+}
+
+
+def get_data_dir() -> Path:
+    """
+    Get the directory used to persist application state.
+    Follows the XDG Base Directory specification (~/.local/share/echo-cleaner).
+    """
+    base = os.environ.get('XDG_DATA_HOME') or str(Path.home() / ".local" / "share")
+    data_dir = Path(base) / APP_DIR_NAME
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def load_json(name: str, default: Any = None) -> Any:
+    """Load a JSON document from the data directory, returning default if missing or corrupt"""
+    path = get_data_dir() / name
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(name: str, data: Any) -> bool:
+    """
+    Atomically write a JSON document to the data directory.
+    The document is written to a temporary file first and renamed into place,
+    so a crash never leaves a half-written file behind.
+    """
+    data_dir = get_data_dir()
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", dir=str(data_dir))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, data_dir / name)
+        return True
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Error saving {name}: {e}")
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        return False
+
+
+def load_settings() -> Dict[str, Any]:
+    """Load user settings merged over the defaults"""
+    stored = load_json(SETTINGS_FILE, default={})
+    settings = dict(DEFAULT_SETTINGS)
+    if isinstance(stored, dict):
+        settings.update(stored)
+    return settings
+
+
+def save_settings(settings: Dict[str, Any]) -> bool:
+    """Persist user settings"""
+    return save_json(SETTINGS_FILE, settings)
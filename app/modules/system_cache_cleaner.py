@@ -3,18 +3,26 @@ System Cache Cleaner - Cleans user and system caches
 """
 
 import os
+import stat
+import time
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from .base_cleaner import BaseCleaner
 
 
 class SystemCacheCleaner(BaseCleaner):
     """Cleans system and user cache directories"""
     
+    VAR_TMP = "/var/tmp"
+    # /var/tmp survives reboots; entries untouched this long are left over
+    VAR_TMP_MAX_AGE_DAYS = 30
+    # Private temporary directories of running services (systemd PrivateTmp)
+    VAR_TMP_SKIP_PREFIXES = ('systemd-private-',)
+    
     def __init__(self):
         super().__init__(
             name="System Cache",
-            description="User cache files (~/.cache)"
+            description="User cache files (~/.cache) and stale /var/tmp entries"
         )
     
     def scan(self) -> List[Dict]:
@@ -40,8 +48,76 @@ class SystemCacheCleaner(BaseCleaner):
             except PermissionError:
                 pass
         
+        # /var/tmp is shared with other users and services: only offered with privileged scanning
+        if self.privileged_scan:
+            items.extend(self._scan_var_tmp())
+        
         return items
     
+    def _scan_var_tmp(self) -> List[Dict]:
+        """
+        Entries of /var/tmp with nothing inside touched for VAR_TMP_MAX_AGE_DAYS.
+        Entries that can't be walked completely are left alone, since their
+        newest file is unknown. Entries of other users (and root) are sized in
+        one privileged batch.
+        """
+        cutoff = time.time() - self.VAR_TMP_MAX_AGE_DAYS * 86400
+        entries = []
+        try:
+            with os.scandir(self.VAR_TMP) as scanner:
+                for entry in scanner:
+                    if entry.name.startswith(self.VAR_TMP_SKIP_PREFIXES) or entry.is_symlink():
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    newest = self._newest_mtime(entry.path, st)
+                    if newest is not None and newest < cutoff:
+                        entries.append((entry.path, entry.name, st.st_uid != os.getuid()))
+        except OSError:
+            return []
+        
+        privileged_sizes = self.measure_privileged([(path, None) for path, _, foreign in entries if foreign])
+        
+        items = []
+        for path, name, foreign in entries:
+            size = privileged_sizes.get((path, None))
+            if size is None:
+                size = self.get_directory_size(path)
+            if size > 0:
+                items.append({
+                    'path': path,
+                    'name': name,
+                    'size': size,
+                    'type': 'var_tmp',
+                    'requires_root': foreign,
+                    # Shared with other users and services: opt in entry by entry
+                    'default_selected': False
+                })
+        
+        return items
+    
+    @staticmethod
+    def _newest_mtime(path: str, st: os.stat_result) -> Optional[float]:
+        """
+        Newest mtime of anything in the tree at path (its own for a file), or
+        None if part of the tree can't be listed or stat'ed
+        """
+        newest = st.st_mtime
+        if not stat.S_ISDIR(st.st_mode):
+            return newest
+        
+        unreadable = []
+        for dirpath, dirnames, filenames in os.walk(path, onerror=unreadable.append):
+            for name in dirnames + filenames:
+                try:
+                    newest = max(newest, os.lstat(os.path.join(dirpath, name)).st_mtime)
+                except OSError:
+                    return None
+        
+        return None if unreadable else newest
+    
     def clean(self, items: List[Dict]) -> int:
         """Clean the specified cache items"""
         total_cleaned = 0
@@ -50,7 +126,10 @@ class SystemCacheCleaner(BaseCleaner):
             path = item['path']
             size = item['size']
             
-            if self.safe_remove(path):
+            self.notify_item_started(item)
+            removed = self.safe_remove(path)
+            if removed:
                 total_cleaned += size
+            self.notify_item_finished(item, size if removed else 0, removed)
         
         return total_cleaned
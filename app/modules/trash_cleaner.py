@@ -52,7 +52,10 @@ class TrashCleaner(BaseCleaner):
             path = item['path']
             size = item['size']
             
-            if self.safe_remove(path):
+            self.notify_item_started(item)
+            removed = self.safe_remove(path)
+            if removed:
                 total_cleaned += size
+            self.notify_item_finished(item, size if removed else 0, removed)
         
         return total_cleaned
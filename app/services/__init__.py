@@ -2,6 +2,12 @@
 Service Layer Components
 """
 
-from .cleaning_service import CleaningService
-
 __all__ = ['CleaningService']
+
+
+def __getattr__(name):
+    # CleaningService needs Qt; plans, journals and trackers are importable without it
+    if name == 'CleaningService':
+        from .cleaning_service import CleaningService
+        return CleaningService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,121 @@
+"""
+Clean Journal - Append-only, crash-safe record of a cleaning run
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from modules.storage import get_data_dir
+
+
+class CleanJournal:
+    """
+    JSON-lines journal of a clean run.
+
+    The plan is written (and fsync'ed) before anything is deleted, then one
+    record per finished operation. Records are fsync'ed in batches so that
+    millions of tiny deletions don't pay one disk flush each; after a crash at
+    most the last batch is replayed, which is harmless since cleaning an item
+    that is already gone is a no-op. A closed journal is removed; one left
+    behind means the run was interrupted and can be resumed.
+    """
+
+    JOURNAL_DIR = "journal"
+    FSYNC_EVERY = 64  # records
+    FSYNC_INTERVAL = 1.0  # seconds
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()  # Lanes record concurrently
+
+    @classmethod
+    def journal_dir(cls) -> Path:
+        directory = get_data_dir() / cls.JOURNAL_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    @classmethod
+    def create(cls, plan) -> 'CleanJournal':
+        """Start a journal for a plan, durably recording the plan first"""
+        stamp = int(time.time() * 1000)
+        while True:
+            journal = cls(cls.journal_dir() / f"clean-{stamp}.jsonl")
+            try:
+                journal._file = open(journal.path, 'x', encoding='utf-8')
+                break
+            except FileExistsError:
+                stamp += 1  # Another run started in the same millisecond
+        journal._append({'type': 'plan', 'plan': plan.to_dict()})
+        journal.sync()
+        return journal
+
+    def record_done(self, op_id: int, status: str, cleaned: int = 0):
+        """Record a finished operation ('cleaned', 'failed' or 'skipped')"""
+        with self._lock:
+            self._append({'type': 'done', 'op_id': op_id, 'status': status, 'cleaned': cleaned})
+            self._unsynced += 1
+            if (self._unsynced >= self.FSYNC_EVERY
+                    or time.monotonic() - self._last_sync >= self.FSYNC_INTERVAL):
+                self._sync()
+
+    def sync(self):
+        """Flush buffered records to disk"""
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        """Mark the run as finished: the journal is no longer needed"""
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._file.close()
+        self.discard(self.path)
+
+    def _sync(self):
+        if self._file and not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _append(self, record: Dict):
+        self._file.write(json.dumps(record) + '\n')
+
+    @staticmethod
+    def read(path: Path) -> Tuple[Optional[Dict], Set[int]]:
+        """Read the plan and the op_ids already done, tolerating a torn last line"""
+        plan_data, done = None, set()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Partial write at crash time
+                    if record.get('type') == 'plan':
+                        plan_data = record.get('plan')
+                    elif record.get('type') == 'done':
+                        done.add(record.get('op_id'))
+        except OSError:
+            pass
+        return plan_data, done
+
+    @classmethod
+    def find_interrupted(cls) -> List[Path]:
+        """Journals left behind by runs that never finished, newest first"""
+        directory = get_data_dir() / cls.JOURNAL_DIR
+        if not directory.is_dir():
+            return []
+        return sorted(directory.glob("clean-*.jsonl"), reverse=True)
+
+    @staticmethod
+    def discard(path: Path):
+        try:
+            Path(path).unlink()
+        except OSError:
+            pass
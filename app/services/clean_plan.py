@@ -0,0 +1,265 @@
+"""
+Clean Plan - Compiled, reproducible description of a cleaning run
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from .throughput_history import ThroughputHistory
+
+
+@dataclass
+class PlanOperation:
+    """A single item to clean, bound to the cleaner and resource lane that handles it"""
+
+    op_id: int
+    category: str
+    cleaner: str
+    resource: str
+    action: str
+    item: Dict
+
+    @property
+    def size(self) -> int:
+        return self.item.get('size', 0)
+
+    def to_dict(self) -> Dict:
+        return {
+            'op_id': self.op_id,
+            'category': self.category,
+            'cleaner': self.cleaner,
+            'resource': self.resource,
+            'action': self.action,
+            'item': self.item
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlanOperation':
+        return cls(
+            op_id=data['op_id'],
+            category=data['category'],
+            cleaner=data['cleaner'],
+            resource=data['resource'],
+            action=data.get('action', ''),
+            item=data['item']
+        )
+
+
+@dataclass
+class CleanPlan:
+    """
+    Resolved set of cleaning operations.
+
+    Compiling a plan drops items already covered by another selected path,
+    groups operations into lanes by the resource they contend for (device,
+    Docker daemon, privileged helper) and orders them deterministically.
+    Plans can be previewed with dry_run(), estimated from historical
+    throughput, and serialized to a file to be executed again later.
+    """
+
+    VERSION = 1
+
+    operations: List[PlanOperation] = field(default_factory=list)
+    skipped: List[Dict] = field(default_factory=list)
+    # Cleaner name -> bytes freed on top of the item sizes (storage shared only among planned items)
+    shared_reclaimable: Dict[str, int] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    cleaners: Dict[str, object] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, categories: List[Dict]) -> 'CleanPlan':
+        """
+        Compile a plan from category dicts ({'name', 'items', 'cleaner'}).
+        """
+        plan = cls()
+        candidates = []
+
+        for category_idx, category in enumerate(categories):
+            cleaner = category['cleaner']
+            plan.cleaners[cleaner.name] = cleaner
+            for item in category['items']:
+                candidates.append((category_idx, category['name'], cleaner, item))
+
+        kept = plan._resolve_overlaps(candidates)
+
+        # One lane per cleaner: its clean() runs on one shared instance, so it must never run
+        # in two lanes at once (cleaners on the same resource still share a lane)
+        cleaner_items: Dict[str, List[Dict]] = {}
+        for _, _, cleaner, item in kept:
+            cleaner_items.setdefault(cleaner.name, []).append(item)
+        resources = {
+            name: plan.cleaners[name].resource_key(items) for name, items in cleaner_items.items()
+        }
+
+        # Deterministic order: lane, then selection order, then cleaner priority, then path
+        ordered = sorted(
+            (
+                (resources[cleaner.name], category_idx, cleaner.clean_priority(item),
+                 str(item.get('path', '')), category_name, cleaner, item)
+                for category_idx, category_name, cleaner, item in kept
+            ),
+            key=lambda entry: entry[:4]
+        )
+
+        for op_id, (resource, _, _, _, category_name, cleaner, item) in enumerate(ordered):
+            plan.operations.append(PlanOperation(
+                op_id=op_id,
+                category=category_name,
+                cleaner=cleaner.name,
+                resource=resource,
+                action=cleaner.describe_clean(item),
+                item=item
+            ))
+
+        for cleaner_name, cleaner in plan.cleaners.items():
+            items = [op.item for op in plan.operations if op.cleaner == cleaner_name]
+            extra = cleaner.estimate_reclaimable(items) - sum(item.get('size', 0) for item in items)
+            if extra > 0:
+                plan.shared_reclaimable[cleaner_name] = extra
+
+        return plan
+
+    def _resolve_overlaps(self, candidates: List) -> List:
+        """Drop filesystem items that are the same as, or inside, another selected path"""
+        def fs_path(item) -> Optional[str]:
+            path = item.get('path', '')
+            return os.path.normpath(path) if isinstance(path, str) and path.startswith('/') else None
+
+        kept = []
+        kept_paths: Dict[str, str] = {}  # path -> category that owns it
+
+        # Shortest paths first so ancestors are kept over their descendants
+        for candidate in sorted(candidates, key=lambda c: (len(fs_path(c[3]) or ''), c[0])):
+            category_idx, category_name, cleaner, item = candidate
+            path = fs_path(item)
+
+            if path is not None:
+                owner = next(
+                    (kept_path for kept_path in self._ancestors(path) if kept_path in kept_paths),
+                    None
+                )
+                if owner is not None:
+                    self.skipped.append({
+                        'category': category_name,
+                        'path': path,
+                        'reason': f"Already covered by {owner} ({kept_paths[owner]})"
+                    })
+                    continue
+                kept_paths[path] = category_name
+
+            kept.append(candidate)
+
+        return kept
+
+    @staticmethod
+    def _ancestors(path: str) -> List[str]:
+        """The path itself followed by each of its parent directories"""
+        ancestors = [path]
+        while path != os.path.dirname(path):
+            path = os.path.dirname(path)
+            ancestors.append(path)
+        return ancestors
+
+    @property
+    def total_size(self) -> int:
+        """Bytes the plan frees, including storage shared only among its items"""
+        return sum(op.size for op in self.operations) + sum(self.shared_reclaimable.values())
+
+    @property
+    def item_count(self) -> int:
+        return len(self.operations)
+
+    @property
+    def category_names(self) -> List[str]:
+        """Categories in the plan, in first-appearance order"""
+        return list(dict.fromkeys(op.category for op in self.operations))
+
+    def lanes(self) -> Dict[str, List[PlanOperation]]:
+        """
+        Operations grouped by resource lane, each lane in execution order.
+        All operations of a cleaner stay in the lane of its first one, also for
+        plans saved before lanes were keyed per cleaner.
+        """
+        lanes: Dict[str, List[PlanOperation]] = {}
+        cleaner_lanes: Dict[str, str] = {}
+        for op in self.operations:
+            resource = cleaner_lanes.setdefault(op.cleaner, op.resource)
+            lanes.setdefault(resource, []).append(op)
+        return lanes
+
+    def get_cleaner(self, name: str):
+        """Cleaner instance bound to this plan"""
+        if name not in self.cleaners:
+            raise ValueError(f"No cleaner registered for '{name}'")
+        return self.cleaners[name]
+
+    def estimate_duration(self, history: ThroughputHistory) -> float:
+        """Estimated seconds to execute: lanes run concurrently, so the slowest lane wins"""
+        lane_estimates = []
+        for ops in self.lanes().values():
+            seconds = 0.0
+            for cleaner_name in dict.fromkeys(op.cleaner for op in ops):
+                cleaner_ops = [op for op in ops if op.cleaner == cleaner_name]
+                seconds += history.estimate(
+                    cleaner_name, sum(op.size for op in cleaner_ops), len(cleaner_ops)
+                )
+            lane_estimates.append(seconds)
+
+        return max(lane_estimates, default=0.0)
+
+    def dry_run(self) -> List[str]:
+        """Report exactly what would be deleted and which commands would run"""
+        lines = []
+        for resource, ops in self.lanes().items():
+            lines.append(f"[{resource}]")
+            for op in ops:
+                lines.append(f"  {op.op_id:>4}  {op.category}: {op.action}  ({op.size} bytes)")
+
+        for cleaner_name, extra in self.shared_reclaimable.items():
+            lines.append(f"shared  {cleaner_name}: {extra} bytes shared only among planned items")
+
+        for skipped in self.skipped:
+            lines.append(f"skip  {skipped['category']}: {skipped['path']} - {skipped['reason']}")
+
+        return lines
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.VERSION,
+            'created_at': self.created_at,
+            'operations': [op.to_dict() for op in self.operations],
+            'skipped': self.skipped,
+            'shared_reclaimable': self.shared_reclaimable
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, cleaners: List) -> 'CleanPlan':
+        """Rebuild a plan, binding operations to the registered cleaner instances"""
+        if data.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported plan version: {data.get('version')}")
+
+        plan = cls(
+            operations=[PlanOperation.from_dict(op) for op in data.get('operations', [])],
+            skipped=data.get('skipped', []),
+            shared_reclaimable=data.get('shared_reclaimable', {}),
+            created_at=data.get('created_at', time.time()),
+            cleaners={cleaner.name: cleaner for cleaner in cleaners}
+        )
+
+        for op in plan.operations:
+            plan.get_cleaner(op.cleaner)
+
+        return plan
+
+    def save(self, path: str):
+        """Serialize the plan to a JSON file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, cleaners: List) -> 'CleanPlan':
+        """Load a plan serialized with save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f), cleaners)
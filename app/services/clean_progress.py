@@ -0,0 +1,108 @@
+"""
+Clean Progress - Byte-accurate cleaning progress with rate-limited reporting
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class CleanProgress:
+    """
+    Tracks cleaning progress in bytes and items across all selected work.
+
+    Cleaners report item boundaries and incremental freed bytes; snapshots
+    (percentage, current item, MB/s, items/s) are pushed to `emit` at most
+    `max_rate_hz` times per second so the GUI thread isn't flooded when
+    millions of small files are deleted.
+    """
+
+    def __init__(self, total_bytes: int, total_items: int,
+                 emit: Callable[[Dict], None], max_rate_hz: float = 20.0):
+        self.total_bytes = total_bytes
+        self.total_items = total_items
+        self.emit = emit
+        self.min_interval = 1.0 / max_rate_hz
+
+        self.bytes_done = 0
+        self.items_done = 0
+        self.files_removed = 0
+        self.current_item = ""
+
+        self._item_bytes: Dict[int, int] = {}  # bytes already reported per in-flight item
+        self._started_at = time.monotonic()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def item_started(self, item: Dict):
+        """Mark an item as being cleaned"""
+        with self._lock:
+            self._item_bytes[id(item)] = 0
+            self.current_item = item.get('name') or item.get('path', '')
+        self._maybe_emit()
+
+    def bytes_freed(self, size: int, files: int = 0, item: Optional[Dict] = None):
+        """Account bytes freed while an item is still being cleaned"""
+        with self._lock:
+            self.bytes_done += size
+            self.files_removed += files
+            # Attribute to the in-flight item so the total isn't counted twice on finish
+            if item is not None and id(item) in self._item_bytes:
+                self._item_bytes[id(item)] += size
+        self._maybe_emit()
+
+    def item_finished(self, item: Dict, cleaned_size: int = 0, success: bool = True):
+        """Mark an item as done, topping up bytes to its expected size"""
+        with self._lock:
+            reported = self._item_bytes.pop(id(item), 0)
+            self.bytes_done += max(0, item.get('size', 0) - reported)
+            self.items_done += 1
+        self._maybe_emit()
+
+    def finish(self):
+        """Emit the final snapshot regardless of rate limiting"""
+        self._maybe_emit(force=True)
+
+    def snapshot(self) -> Dict:
+        """Current progress state"""
+        with self._lock:
+            elapsed = max(time.monotonic() - self._started_at, 1e-6)
+            bytes_done = min(self.bytes_done, self.total_bytes) if self.total_bytes else self.bytes_done
+
+            if self.total_bytes > 0:
+                fraction = bytes_done / self.total_bytes
+            elif self.total_items > 0:
+                fraction = self.items_done / self.total_items
+            else:
+                fraction = 1.0
+
+            return {
+                'percentage': min(100, int(fraction * 100)),
+                'bytes_done': bytes_done,
+                'bytes_total': self.total_bytes,
+                'items_done': self.items_done,
+                'items_total': self.total_items,
+                'files_removed': self.files_removed,
+                'current_item': self.current_item,
+                'bytes_per_sec': self.bytes_done / elapsed,
+                'items_per_sec': self.items_done / elapsed,
+            }
+
+    @staticmethod
+    def format_message(snapshot: Dict) -> str:
+        """Build a human-readable status line from a snapshot"""
+        message = f"Cleaning {snapshot['current_item']}" if snapshot['current_item'] else "Cleaning..."
+        return (
+            f"{message} • {snapshot['items_done']}/{snapshot['items_total']} items"
+            f" • {snapshot['bytes_per_sec'] / (1024 ** 2):.1f} MB/s"
+            f" • {snapshot['items_per_sec']:.1f} items/s"
+        )
+
+    def _maybe_emit(self, force: bool = False):
+        """Emit a snapshot if the rate limit allows it"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+        self.emit(self.snapshot())
@@ -3,8 +3,23 @@ Cleaning Service - Core Business Logic
 """
 
 from PySide6.QtCore import QObject, Signal, QThread
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
 from typing import Dict, List
+import threading
+import time
 import humanize
+from modules.base_cleaner import CleanCancelled
+from modules.io_throttle import IOThrottle
+from modules.quarantine import Quarantine
+from modules.space_meter import SpaceMeter
+from modules.staging_area import StagingArea
+from modules.storage import get_data_dir, load_settings, save_settings
+from .clean_journal import CleanJournal
+from .clean_plan import CleanPlan
+from .clean_progress import CleanProgress
+from .regrowth_tracker import RegrowthTracker
+from .throughput_history import ThroughputHistory
 
 
 class ScanWorker(QThread):
@@ -14,30 +29,66 @@ class ScanWorker(QThread):
     finished = Signal(dict)  # scan results
     error = Signal(str)  # error message
     
-    def __init__(self, cleaners):
+    def __init__(self, cleaners, regrowth_tracker=None, previous_results=None, touched_paths=None):
         super().__init__()
         self.cleaners = cleaners
+        self.regrowth_tracker = regrowth_tracker
+        # Incremental mode: only cleaners in touched_paths are rescanned
+        self.previous_results = previous_results
+        self.touched_paths = touched_paths
     
     def run(self):
         """Execute scan in background thread"""
         try:
+            incremental = self.previous_results is not None and self.touched_paths is not None
             results = {
                 'total_size': 0,
-                'categories': []
+                'categories': [],
+                'incremental': incremental,
+                'rescanned': []  # Cleaners whose results changed
             }
             
-            total_cleaners = len(self.cleaners)
+            previous = {
+                category['name']: category
+                for category in (self.previous_results or {}).get('categories', [])
+            }
+            to_scan = [
+                cleaner for cleaner in self.cleaners
+                if not incremental or cleaner.name in self.touched_paths
+            ]
             
-            for idx, cleaner in enumerate(self.cleaners):
+            for cleaner in self.cleaners:
+                if cleaner not in to_scan:
+                    # Untouched since the last scan: reuse its results
+                    if cleaner.name in previous:
+                        results['total_size'] += previous[cleaner.name]['size']
+                        results['categories'].append(previous[cleaner.name])
+                    continue
+                
                 # Update progress
-                progress_pct = int((idx / total_cleaners) * 100)
+                progress_pct = int((to_scan.index(cleaner) / len(to_scan)) * 100)
                 self.progress.emit(progress_pct, f"Scanning {cleaner.name}...")
+                results['rescanned'].append(cleaner.name)
+                
+                # Scan cleaner, or only refresh what a clean touched
+                if incremental and cleaner.name in previous:
+                    items = cleaner.rescan(
+                        previous[cleaner.name]['items'], set(self.touched_paths[cleaner.name])
+                    )
+                else:
+                    items = cleaner.scan()
+                
+                # Cheap identity used to revalidate items right before cleaning
+                if items:
+                    cleaner.fingerprint_items(items)
                 
-                # Scan cleaner
-                items = cleaner.scan()
+                # Flag caches that refilled quickly after the last clean
+                if items and self.regrowth_tracker:
+                    self.regrowth_tracker.annotate(cleaner.name, items)
                 
                 if items:
-                    category_size = sum(item.get('size', 0) for item in items)
+                    # Bytes really freed, e.g. counting layers shared only among these images once
+                    category_size = cleaner.estimate_reclaimable(items)
                     results['total_size'] += category_size
                     results['categories'].append({
                         'name': cleaner.name,
@@ -54,15 +105,31 @@ class ScanWorker(QThread):
 
 
 class CleanWorker(QThread):
-    """Worker thread for cleaning"""
+    """Worker thread for executing a clean plan"""
     
     progress = Signal(int, str)  # percentage, status message
+    progress_detail = Signal(dict)  # bytes/items done, current item, throughput
     finished = Signal(dict)  # cleaning results
     error = Signal(str)  # error message
     
-    def __init__(self, selected_categories):
+    def __init__(self, plan, regrowth_tracker=None, staging_area=None, throughput_history=None,
+                 journal=None, settings=None, quarantine=None):
         super().__init__()
-        self.selected_categories = selected_categories
+        self.plan = plan
+        self.regrowth_tracker = regrowth_tracker
+        self.staging_area = staging_area
+        self.throughput_history = throughput_history
+        self.journal = journal
+        self.settings = settings or {}
+        self.quarantine = quarantine
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        # Items may be replaced by revalidation, so operations are found by cleaner and path
+        self._op_ids = {(op.cleaner, op.item.get('path')): op.op_id for op in plan.operations}
+    
+    def cancel(self):
+        """Stop cleaning at the next item boundary"""
+        self.cancel_event.set()
     
     def run(self):
         """Execute cleaning in background thread"""
@@ -71,42 +138,214 @@ class CleanWorker(QThread):
                 'total_cleaned': 0,
                 'items_removed': 0,
                 'categories_cleaned': [],
-                'failed_items': []  # Track items that failed to clean
+                'failed_items': [],  # Track items that failed to clean
+                'skipped_items': [],  # Items that changed or vanished since the scan
+                'measured_freed': 0,  # Free space really gained, from statvfs
+                'freed_by_device': {},  # mount point -> measured bytes
+                'measured_by_category': {},
+                'pending_background_bytes': 0,  # Staged, still being unlinked in the background
+                'quarantined_bytes': 0,  # Moved aside, restorable until purged
+                'cancelled': False,
+                'touched_paths': {}  # cleaner name -> paths of the operations attempted
             }
             
-            total_categories = len(self.selected_categories)
+            # Free space before anything is touched, on every filesystem involved
+            measured_paths = self._measurement_paths()
+            space_before = SpaceMeter.snapshot(measured_paths)
             
-            for idx, category in enumerate(self.selected_categories):
-                # Update progress
-                progress_pct = int((idx / total_categories) * 100)
-                self.progress.emit(progress_pct, f"Cleaning {category['name']}...")
-                
-                # Clean category
-                cleaner = category['cleaner']
-                items_to_clean = category['items']
+            # Progress is measured in bytes and items across all selected work
+            tracker = CleanProgress(
+                total_bytes=self.plan.total_size,
+                total_items=self.plan.item_count,
+                emit=self._emit_progress
+            )
+            
+            # Lanes don't compete for the same resource (Docker daemon, privileged
+            # helper, a given disk), so they are executed concurrently
+            lanes = self.plan.lanes()
+            outcomes = {}
+            
+            with ThreadPoolExecutor(max_workers=max(1, len(lanes))) as pool:
+                futures = [
+                    pool.submit(self._clean_lane, operations, tracker, outcomes)
+                    for operations in lanes.values()
+                ]
+                for future in futures:
+                    future.result()
+            
+            # Aggregate in plan order so results don't depend on scheduling
+            for category_name in self.plan.category_names:
+                outcome = outcomes.get(category_name, {'cleaned': 0, 'items': [], 'errors': []})
+                items_to_clean = outcome['items']
                 
-                # Get size before cleaning for comparison
+                for item in outcome.get('skipped', []):
+                    results['skipped_items'].append({
+                        'category': category_name,
+                        'name': item.get('name', item.get('path', '')),
+                        'reason': item.get('skip_reason', '')
+                    })
                 expected_size = sum(item.get('size', 0) for item in items_to_clean)
                 
-                cleaned_size = cleaner.clean(items_to_clean)
-                
                 # Check if cleaning was successful
-                if cleaned_size > 0:
-                    results['total_cleaned'] += cleaned_size
+                if outcome['cleaned'] > 0:
+                    results['total_cleaned'] += outcome['cleaned']
                     results['items_removed'] += len(items_to_clean)
-                    results['categories_cleaned'].append(category['name'])
-                elif expected_size > 0:
+                    results['categories_cleaned'].append(category_name)
+                    
+                    # Remember what was cleaned to measure regrowth on next scans; an item
+                    # that failed is still full-size, which would look like instant regrowth
+                    if self.regrowth_tracker:
+                        self.regrowth_tracker.record_clean(category_name, outcome.get('succeeded', []))
+                elif expected_size > 0 or outcome['errors']:
                     # Cleaning failed or was incomplete
                     results['failed_items'].append({
-                        'category': category['name'],
-                        'reason': 'Permission denied or command failed'
+                        'category': category_name,
+                        'reason': '; '.join(outcome['errors']) or 'Permission denied or command failed'
                     })
             
-            self.progress.emit(100, "Cleaning complete!")
+            # Compare with what the filesystems report, not only with scan estimates
+            freed = SpaceMeter.delta(space_before, SpaceMeter.snapshot(measured_paths))
+            results['freed_by_device'] = {mount: max(0, delta) for mount, delta in freed.items()}
+            results['measured_freed'] = sum(results['freed_by_device'].values())
+            results['measured_by_category'] = {
+                name: outcome.get('measured', 0) for name, outcome in outcomes.items()
+            }
+            
+            if self.quarantine:
+                quarantined = set(self.quarantine.session_paths)
+                results['quarantined_bytes'] = sum(
+                    op.size for op in self.plan.operations if op.item.get('path') in quarantined
+                )
+                self.quarantine.flush()
+            
+            # Report completion as soon as renames are done; unlinking continues in the background
+            if self.staging_area:
+                staged = set(self.staging_area.staged_paths)
+                results['pending_background_bytes'] = sum(
+                    op.size for op in self.plan.operations if op.item.get('path') in staged
+                )
+                self.staging_area.flush(gentle=self.settings.get('gentle_io', False))
+            
+            results['cancelled'] = self.cancel_event.is_set()
+            for op in self.plan.operations:
+                results['touched_paths'].setdefault(op.cleaner, []).append(op.item.get('path'))
+            
+            # Finished (or deliberately cancelled): nothing left to resume
+            if self.journal:
+                self.journal.close()
+            
+            tracker.finish()
+            self.progress.emit(100, "Cleaning cancelled" if results['cancelled'] else "Cleaning complete!")
             self.finished.emit(results)
             
         except Exception as e:
+            # Keep the journal so the interrupted run can be resumed
+            if self.journal:
+                self.journal.sync()
             self.error.emit(str(e))
+    
+    def _clean_lane(self, operations, tracker, outcomes):
+        """Execute the operations of one lane in order, batching consecutive items per cleaner"""
+        # Lanes are per device, so each gets its own I/O budget in gentle mode
+        throttle = IOThrottle.from_settings(self.settings)
+        
+        for (category_name, cleaner_name), batch in groupby(
+                operations, key=lambda op: (op.category, op.cleaner)):
+            if self.cancel_event.is_set():
+                break
+            
+            cleaner = self.plan.get_cleaner(cleaner_name)
+            items = [op.item for op in batch]
+            cleaned_size, error, skipped, finished = 0, None, [], []
+            
+            # Approximate when another lane frees space on the same filesystem
+            measured_paths = cleaner.measurement_paths(items)
+            space_before = SpaceMeter.snapshot(measured_paths)
+            
+            self._attach(cleaner, tracker, finished)
+            cleaner.deletion_engine.throttle = throttle
+            started = time.monotonic()
+            try:
+                # One stat/inspect per item: skip or re-measure only what changed since the scan
+                items, skipped = cleaner.revalidate(items)
+                for item in skipped:
+                    tracker.item_finished(item, 0, False)
+                    self._journal_item(cleaner, item, 'skipped')
+                
+                if items:
+                    cleaned_size = cleaner.clean(items)
+            except CleanCancelled:
+                # Only what finished before the cancellation counts
+                cleaned_size = sum(size for _, size, _ in finished)
+                items = [item for item, _, _ in finished]
+            except Exception as e:
+                error = str(e)
+            finally:
+                self._detach(cleaner)
+            
+            if self.throughput_history and not error:
+                self.throughput_history.record(
+                    cleaner.name, cleaned_size, len(items), time.monotonic() - started
+                )
+            
+            freed = SpaceMeter.delta(space_before, SpaceMeter.snapshot(measured_paths))
+            
+            with self._lock:
+                outcome = outcomes.setdefault(category_name, {'cleaned': 0, 'items': [], 'errors': []})
+                outcome['cleaned'] += cleaned_size
+                outcome['measured'] = outcome.get('measured', 0) + sum(max(0, d) for d in freed.values())
+                outcome['items'].extend(items)
+                outcome.setdefault('succeeded', []).extend(item for item, _, success in finished if success)
+                outcome.setdefault('skipped', []).extend(skipped)
+                if error:
+                    outcome['errors'].append(error)
+    
+    def _measurement_paths(self) -> List[str]:
+        """Paths covering every filesystem the plan frees space on"""
+        paths = []
+        for cleaner_name in dict.fromkeys(op.cleaner for op in self.plan.operations):
+            items = [op.item for op in self.plan.operations if op.cleaner == cleaner_name]
+            paths.extend(self.plan.get_cleaner(cleaner_name).measurement_paths(items))
+        return paths
+    
+    def _attach(self, cleaner, tracker, finished):
+        """Hook a cleaner's progress callbacks to the tracker and the journal"""
+        def on_item_finished(item, cleaned_size, success):
+            tracker.item_finished(item, cleaned_size, success)
+            finished.append((item, cleaned_size, success))
+            self._journal_item(cleaner, item, 'cleaned' if success else 'failed', cleaned_size)
+        
+        # Directories are renamed away instantly and unlinked by a background deleter
+        cleaner.staging_area = self.staging_area
+        cleaner.quarantine = self.quarantine
+        cleaner.cancel_event = self.cancel_event
+        cleaner.item_started_callback = tracker.item_started
+        cleaner.item_finished_callback = on_item_finished
+        cleaner.bytes_freed_callback = (
+            lambda size, files: tracker.bytes_freed(size, files, item=cleaner.current_item)
+        )
+    
+    @staticmethod
+    def _detach(cleaner):
+        """Remove progress callbacks from a cleaner"""
+        cleaner.staging_area = None
+        cleaner.quarantine = None
+        cleaner.deletion_engine.throttle = None
+        cleaner.cancel_event = None
+        cleaner.item_started_callback = None
+        cleaner.item_finished_callback = None
+        cleaner.bytes_freed_callback = None
+    
+    def _journal_item(self, cleaner, item, status, cleaned_size=0):
+        """Record a finished operation in the journal"""
+        op_id = self._op_ids.get((cleaner.name, item.get('path')))
+        if self.journal and op_id is not None:
+            self.journal.record_done(op_id, status, cleaned_size)
+    
+    def _emit_progress(self, snapshot):
+        """Forward a (rate-limited) progress snapshot to the UI"""
+        self.progress_detail.emit(snapshot)
+        self.progress.emit(snapshot['percentage'], CleanProgress.format_message(snapshot))
 
 
 class CleaningService(QObject):
@@ -123,29 +362,47 @@ class CleaningService(QObject):
     
     clean_started = Signal()
     clean_progress = Signal(int, str)  # percentage, status message
+    clean_progress_detail = Signal(dict)  # byte-accurate progress snapshot
     clean_completed = Signal(dict)  # cleaning results
     clean_failed = Signal(str)  # error message
     
+    LAST_PLAN_FILE = "last_plan.json"
+    
     def __init__(self):
         super().__init__()
         self.cleaners = []
         self.scan_results = None
         self.scan_worker = None
         self.clean_worker = None
+        self.settings = load_settings()
+        self.regrowth_tracker = RegrowthTracker.from_settings(self.settings)
+        self.staging_area = StagingArea()
+        self.throughput_history = ThroughputHistory()
+        self.quarantine = Quarantine(self.staging_area)
     
     def register_cleaner(self, cleaner):
         """Register a cleaning module"""
+        cleaner.privileged_scan = self.settings.get('privileged_scan', False)
         self.cleaners.append(cleaner)
     
-    def start_scan(self):
-        """Start system scan in background thread"""
+    def start_scan(self, touched_paths=None):
+        """
+        Start system scan in background thread.
+        With touched_paths ({cleaner name: [paths]}), only the cleaners a clean
+        touched are refreshed and the other categories reuse the last results.
+        """
         if self.scan_worker and self.scan_worker.isRunning():
             return  # Already scanning
         
+        if self.scan_results is None:
+            touched_paths = None  # Nothing to reuse
+        
         self.scan_started.emit()
         
         # Create and start worker thread
-        self.scan_worker = ScanWorker(self.cleaners)
+        self.scan_worker = ScanWorker(
+            self.cleaners, self.regrowth_tracker, self.scan_results, touched_paths
+        )
         self.scan_worker.progress.connect(self.scan_progress.emit)
         self.scan_worker.finished.connect(self._on_scan_finished)
         self.scan_worker.error.connect(self._on_scan_error)
@@ -160,26 +417,147 @@ class CleaningService(QObject):
         """Handle scan error"""
         self.scan_failed.emit(error_msg)
     
-    def start_clean(self, selected_categories):
+    def compile_plan(self, selected_categories) -> CleanPlan:
+        """Compile selected categories into a clean plan"""
+        return CleanPlan.compile(selected_categories)
+    
+    def load_plan(self, path) -> CleanPlan:
+        """Load a serialized clean plan, bound to the registered cleaners"""
+        return CleanPlan.load(path, self.cleaners)
+    
+    def estimate_duration(self, plan) -> float:
+        """Estimate how long a plan takes, from historical throughput"""
+        return plan.estimate_duration(self.throughput_history)
+    
+    def start_clean(self, plan):
         """Start cleaning process in background thread"""
         if self.clean_worker and self.clean_worker.isRunning():
             return  # Already cleaning
         
-        if not selected_categories:
+        # Accept raw category dicts for convenience
+        if not isinstance(plan, CleanPlan):
+            plan = self.compile_plan(plan or [])
+        
+        if not plan.operations:
             self.clean_failed.emit("No categories selected for cleaning")
             return
         
+        # Keep the last executed plan so the run can be inspected or reproduced
+        try:
+            plan.save(str(get_data_dir() / self.LAST_PLAN_FILE))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not save clean plan: {e}")
+        
         self.clean_started.emit()
         
+        # Durably record the plan before touching anything, so a crash can be resumed
+        try:
+            journal = CleanJournal.create(plan)
+        except OSError as e:
+            print(f"Could not create clean journal: {e}")
+            journal = None
+        
         # Create and start worker thread
-        self.clean_worker = CleanWorker(selected_categories)
+        self.clean_worker = CleanWorker(
+            plan, self.regrowth_tracker, self.staging_area, self.throughput_history, journal,
+            self.settings, self.quarantine if self.settings.get('quarantine') else None
+        )
         self.clean_worker.progress.connect(self.clean_progress.emit)
+        self.clean_worker.progress_detail.connect(self.clean_progress_detail.emit)
         self.clean_worker.finished.connect(self._on_clean_finished)
         self.clean_worker.error.connect(self._on_clean_error)
         self.clean_worker.start()
     
+    def set_gentle_io(self, enabled):
+        """Enable or disable I/O-gentle deletion (also used by the background deleter)"""
+        self.settings['gentle_io'] = bool(enabled)
+        save_settings(self.settings)
+    
+    def set_quarantine_mode(self, enabled):
+        """Enable or disable moving removed items to quarantine instead of deleting them"""
+        self.settings['quarantine'] = bool(enabled)
+        save_settings(self.settings)
+    
+    def set_privileged_scan(self, enabled):
+        """Enable or disable sizing root-owned locations (one authentication per session)"""
+        self.settings['privileged_scan'] = bool(enabled)
+        save_settings(self.settings)
+        for cleaner in self.cleaners:
+            cleaner.privileged_scan = self.settings['privileged_scan']
+    
+    def set_docker_keep_per_repo(self, count):
+        """Set how many of the newest images per repository Docker scans always keep"""
+        self.settings['docker_keep_per_repo'] = max(0, int(count))
+        save_settings(self.settings)
+    
+    def set_docker_protected_images(self, patterns):
+        """Set the image patterns ('repo', 'repo:tag', globs) Docker scans never offer"""
+        self.settings['docker_protected_images'] = [str(pattern) for pattern in patterns if pattern]
+        save_settings(self.settings)
+    
+    def set_build_cache_max_age(self, hours):
+        """Set after how many unused hours build cache records are preselected (0 disables)"""
+        self.settings['docker_build_cache_max_age_hours'] = max(0, int(hours))
+        save_settings(self.settings)
+    
+    def set_build_cache_keep_bytes(self, keep_bytes):
+        """Set how much of the newest build cache is kept (0 disables)"""
+        self.settings['docker_build_cache_keep_bytes'] = max(0, int(keep_bytes))
+        save_settings(self.settings)
+    
+    def get_quarantine_entries(self):
+        """Items currently in quarantine, newest first"""
+        return self.quarantine.entries()
+    
+    def restore_quarantined(self, entry_id):
+        """Restore a quarantined item to its original location; returns (success, message)"""
+        return self.quarantine.restore(entry_id)
+    
+    def enforce_quarantine_retention(self):
+        """Purge quarantined items by age, total size and free space"""
+        return self.quarantine.enforce_retention(
+            self.settings['quarantine_max_age_days'],
+            self.settings['quarantine_max_bytes'],
+            self.settings['quarantine_min_free_percent']
+        )
+    
+    def cancel_clean(self):
+        """Ask the running clean to stop after the items in progress"""
+        if self.clean_worker and self.clean_worker.isRunning():
+            self.clean_worker.cancel()
+    
+    def find_interrupted_clean(self):
+        """
+        Find a clean that was interrupted by a crash.
+        Returns (journal_path, plan of the remaining operations) or None.
+        """
+        for path in CleanJournal.find_interrupted():
+            plan_data, done = CleanJournal.read(path)
+            try:
+                plan = CleanPlan.from_dict(plan_data or {}, self.cleaners)
+            except (ValueError, KeyError):
+                CleanJournal.discard(path)
+                continue
+            
+            plan.operations = [op for op in plan.operations if op.op_id not in done]
+            if plan.operations:
+                return path, plan
+            CleanJournal.discard(path)
+        
+        return None
+    
+    def resume_interrupted_clean(self, journal_path, plan):
+        """Clean what an interrupted run left; items are revalidated, not rescanned"""
+        CleanJournal.discard(journal_path)
+        self.start_clean(plan)
+    
+    def discard_interrupted_clean(self, journal_path):
+        """Forget an interrupted run"""
+        CleanJournal.discard(journal_path)
+    
     def _on_clean_finished(self, results):
         """Handle cleaning completion"""
+        self.enforce_quarantine_retention()
         self.clean_completed.emit(results)
         # Automatically trigger a new scan to show updated state
         # This ensures the dashboard reflects the actual current state
@@ -189,6 +567,10 @@ class CleaningService(QObject):
         """Handle cleaning error"""
         self.clean_failed.emit(error_msg)
     
+    def resume_background_deletions(self):
+        """Resume deleting items staged by a previous session that did not finish"""
+        self.staging_area.resume_pending()
+    
     def get_scan_results(self):
         """Get the last scan results"""
         return self.scan_results
@@ -0,0 +1,102 @@
+"""
+Regrowth Tracker - Detects "hot" caches that refill quickly after cleaning
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+from modules.storage import load_json, save_json
+
+
+class RegrowthTracker:
+    """
+    Records when items were cleaned and how fast they regrew afterwards.
+    
+    An item is considered "hot" when it refilled to at least `threshold`
+    (fraction of its size before cleaning) within `window_hours` of being
+    cleaned. Cleaning hot caches (npm, Gradle, pip on CI runners) only forces
+    a re-download on the next build, so they are flagged and deselected by default.
+    """
+    
+    HISTORY_FILE = "regrowth.json"
+    MAX_SAMPLES = 20
+    
+    def __init__(self, threshold: float, window_hours: float):
+        self.threshold = threshold
+        self.window_hours = window_hours
+        self.history = load_json(self.HISTORY_FILE, default={}) or {}
+    
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> 'RegrowthTracker':
+        """Build a tracker with the user's hot-cache threshold and window"""
+        return cls(
+            threshold=float(settings['regrowth_hot_ratio']),
+            window_hours=float(settings['regrowth_window_hours']),
+        )
+    
+    @staticmethod
+    def item_key(category: str, item: Dict) -> str:
+        """Build a stable key for an item across scans"""
+        return f"{category}|{item.get('path', '')}"
+    
+    def record_clean(self, category: str, items: List[Dict], now: Optional[float] = None):
+        """Record that items were cleaned, remembering their size before cleaning"""
+        now = now if now is not None else time.time()
+        
+        for item in items:
+            size = item.get('size', 0)
+            if size <= 0:
+                continue
+            
+            self.history[self.item_key(category, item)] = {
+                'cleaned_at': now,
+                'size_before': size,
+                'samples': [],
+                'hot': False
+            }
+        
+        self.save()
+    
+    def annotate(self, category: str, items: List[Dict], now: Optional[float] = None) -> List[Dict]:
+        """
+        Annotate scanned items with their regrowth signal.
+        
+        Adds 'regrowth' ({'ratio', 'hours'}) to items that were cleaned before, and
+        'hot' / 'default_selected' to items that refilled within the configured window.
+        """
+        now = now if now is not None else time.time()
+        changed = False
+        
+        for item in items:
+            entry = self.history.get(self.item_key(category, item))
+            if not entry or entry.get('size_before', 0) <= 0:
+                continue
+            
+            hours = (now - entry['cleaned_at']) / 3600
+            ratio = item.get('size', 0) / entry['size_before']
+            
+            samples = entry.setdefault('samples', [])
+            samples.append([now, item.get('size', 0)])
+            del samples[:-self.MAX_SAMPLES]
+            changed = True
+            
+            if hours <= self.window_hours and ratio >= self.threshold:
+                entry['hot'] = True
+            
+            item['regrowth'] = {'ratio': round(ratio, 3), 'hours': round(hours, 1)}
+            if entry.get('hot'):
+                item['hot'] = True
+                item['default_selected'] = False
+        
+        if changed:
+            self.save()
+        
+        return items
+    
+    def is_hot(self, category: str, item: Dict) -> bool:
+        """Check whether an item was flagged as a hot cache"""
+        entry = self.history.get(self.item_key(category, item))
+        return bool(entry and entry.get('hot'))
+    
+    def save(self):
+        """Persist history to disk"""
+        save_json(self.HISTORY_FILE, self.history)
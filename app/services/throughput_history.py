@@ -0,0 +1,54 @@
+"""
+Throughput History - Observed cleaning speed per cleaner, used for estimates
+"""
+
+import threading
+from typing import Dict
+from modules.storage import load_json, save_json
+
+
+class ThroughputHistory:
+    """
+    Keeps an exponentially weighted average of how fast each cleaner frees
+    space (bytes/s) and processes items (s/item), persisted across sessions.
+    Lanes of a clean record concurrently, so updates and saves are serialized.
+    """
+
+    HISTORY_FILE = "throughput.json"
+    DEFAULT_BYTES_PER_SEC = 200 * 1024 ** 2
+    DEFAULT_SECONDS_PER_ITEM = 0.5
+    SMOOTHING = 0.3
+
+    def __init__(self):
+        self.history: Dict[str, Dict] = load_json(self.HISTORY_FILE, default={}) or {}
+        self._lock = threading.Lock()
+
+    def record(self, cleaner_name: str, bytes_cleaned: int, items: int, seconds: float):
+        """Record an observed cleaning run"""
+        if seconds <= 0 or items <= 0:
+            return
+
+        samples = {'seconds_per_item': seconds / items}
+        if bytes_cleaned > 0:
+            samples['bytes_per_sec'] = bytes_cleaned / seconds
+
+        with self._lock:
+            entry = self.history.setdefault(cleaner_name, {})
+            for key, value in samples.items():
+                previous = entry.get(key)
+                entry[key] = value if previous is None else (
+                    self.SMOOTHING * value + (1 - self.SMOOTHING) * previous
+                )
+
+            save_json(self.HISTORY_FILE, self.history)
+
+    def estimate(self, cleaner_name: str, bytes_to_clean: int, items: int) -> float:
+        """Estimate seconds needed to clean the given amount of work"""
+        with self._lock:
+            entry = dict(self.history.get(cleaner_name, {}))
+
+        if bytes_to_clean > 0:
+            bytes_per_sec = entry.get('bytes_per_sec', self.DEFAULT_BYTES_PER_SEC)
+            return bytes_to_clean / bytes_per_sec
+
+        return items * entry.get('seconds_per_item', self.DEFAULT_SECONDS_PER_ITEM)
@@ -3,13 +3,15 @@ Main Window UI Component
 """
 
 import os
+from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
+from humanize import naturalsize, naturaltime
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, 
     QPushButton, QLabel, QListWidget, QListWidgetItem,
     QFrame, QProgressBar, QStackedWidget, QCheckBox, QScrollArea, QApplication,
-    QSizePolicy
+    QSizePolicy, QSpinBox, QLineEdit
 )
 from PySide6.QtCore import Qt, Signal, QEvent
 from PySide6.QtGui import QFont, QPixmap
@@ -23,11 +25,22 @@ class MainWindow(QMainWindow):
     # Signals
     scan_requested = Signal()
     clean_requested = Signal(dict)  # Pass selected items
+    cancel_requested = Signal()  # Stop cleaning at the next item boundary
+    gentle_mode_toggled = Signal(bool)  # I/O-gentle deletion on/off
+    quarantine_mode_toggled = Signal(bool)  # Move to quarantine instead of deleting
+    privileged_scan_toggled = Signal(bool)  # Size root-owned caches while scanning
+    docker_keep_per_repo_changed = Signal(int)  # Newest unused images kept per repository
+    docker_protected_images_changed = Signal(list)  # Image patterns never offered for removal
+    docker_build_cache_max_age_changed = Signal(int)  # Hours unused before build cache is preselected
+    docker_build_cache_keep_changed = Signal(object)  # Bytes of newest build cache kept (beyond 32-bit int)
+    restore_requested = Signal(str)  # Quarantine entry id
     
     def __init__(self):
         super().__init__()
         self.scan_results = None
         self.selected_items = {}
+        # Category -> item index -> (item widget, its subcategory group or None), for in-place patches
+        self.item_widgets = {}
         self.current_category = None  # Track current category for header clean button
         self.subcategory_service = SubcategoryService()
         self.init_ui()
@@ -141,6 +154,7 @@ class MainWindow(QMainWindow):
             ("🐳", "Docker"),
             ("☸️", "Kubernetes"),
             ("📚", "Dev Dependencies"),
+            ("🛡️", "Quarantine"),
             ("ℹ️", "About")
         ]
         
@@ -196,7 +210,11 @@ class MainWindow(QMainWindow):
             self.stacked_widget.addWidget(view)
             self.category_views[category_name] = view
         
-        # About view (index 8)
+        # Quarantine view (index 8)
+        quarantine = self.create_quarantine_view()
+        self.stacked_widget.addWidget(quarantine)
+        
+        # About view (index 9)
         about = self.create_about_view()
         self.stacked_widget.addWidget(about)
         
@@ -327,6 +345,14 @@ class MainWindow(QMainWindow):
         self.status_label.setVisible(False)
         layout.addWidget(self.status_label)
         
+        # Cancel button (visible only while cleaning)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setObjectName("cancelButton")
+        self.cancel_button.setCursor(Qt.PointingHandCursor)
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self.on_cancel_button_clicked)
+        layout.addWidget(self.cancel_button, alignment=Qt.AlignLeft)
+        
         layout.addSpacing(20)
         
         # Clean button (hidden by default, shown after scan)
@@ -350,10 +376,83 @@ class MainWindow(QMainWindow):
         self.selected_summary.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.selected_summary, alignment=Qt.AlignCenter)
         
+        # Throttled deletion for hosts running latency-sensitive services
+        self.gentle_checkbox = QCheckBox("I/O-gentle mode (slower, for busy servers)")
+        self.gentle_checkbox.setObjectName("gentleCheckbox")
+        self.gentle_checkbox.setFont(QFont("Inter", 10))
+        self.gentle_checkbox.setCursor(Qt.PointingHandCursor)
+        self.gentle_checkbox.toggled.connect(self.gentle_mode_toggled.emit)
+        layout.addWidget(self.gentle_checkbox, alignment=Qt.AlignCenter)
+        
+        # Reversible cleaning: items are moved to quarantine and can be restored
+        self.quarantine_checkbox = QCheckBox("Quarantine instead of deleting (restorable)")
+        self.quarantine_checkbox.setObjectName("quarantineCheckbox")
+        self.quarantine_checkbox.setFont(QFont("Inter", 10))
+        self.quarantine_checkbox.setCursor(Qt.PointingHandCursor)
+        self.quarantine_checkbox.toggled.connect(self.quarantine_mode_toggled.emit)
+        layout.addWidget(self.quarantine_checkbox, alignment=Qt.AlignCenter)
+        
+        # Root-owned caches are only sized accurately with elevated privileges
+        self.privileged_scan_checkbox = QCheckBox("Scan root-owned caches (asks for authentication once)")
+        self.privileged_scan_checkbox.setObjectName("privilegedScanCheckbox")
+        self.privileged_scan_checkbox.setFont(QFont("Inter", 10))
+        self.privileged_scan_checkbox.setCursor(Qt.PointingHandCursor)
+        self.privileged_scan_checkbox.toggled.connect(self.privileged_scan_toggled.emit)
+        layout.addWidget(self.privileged_scan_checkbox, alignment=Qt.AlignCenter)
+        
+        # Docker image retention: recent and protected images are never offered for removal
+        self.docker_keep_spinbox = QSpinBox()
+        self.docker_keep_spinbox.setObjectName("dockerKeepSpinbox")
+        self.docker_keep_spinbox.setRange(0, 100)
+        self.docker_keep_spinbox.valueChanged.connect(self.docker_keep_per_repo_changed.emit)
+        layout.addLayout(self.create_option_row("Keep newest Docker images per repository:",
+                                                self.docker_keep_spinbox))
+        
+        self.docker_protected_input = QLineEdit()
+        self.docker_protected_input.setObjectName("dockerProtectedInput")
+        self.docker_protected_input.setPlaceholderText("e.g. postgres, myapp:prod, registry.local/*")
+        self.docker_protected_input.setMinimumWidth(260)
+        self.docker_protected_input.editingFinished.connect(self.on_docker_protected_images_edited)
+        layout.addLayout(self.create_option_row("Protected Docker images:", self.docker_protected_input))
+        
+        # Build cache pruning policy: records unused too long, or beyond the newest N GiB
+        self.build_cache_age_spinbox = QSpinBox()
+        self.build_cache_age_spinbox.setObjectName("buildCacheAgeSpinbox")
+        self.build_cache_age_spinbox.setRange(0, 24 * 365)
+        self.build_cache_age_spinbox.setSuffix(" h")
+        self.build_cache_age_spinbox.setSpecialValueText("Off")
+        self.build_cache_age_spinbox.valueChanged.connect(self.docker_build_cache_max_age_changed.emit)
+        layout.addLayout(self.create_option_row("Prune Docker build cache unused for:",
+                                                self.build_cache_age_spinbox))
+        
+        self.build_cache_keep_spinbox = QSpinBox()
+        self.build_cache_keep_spinbox.setObjectName("buildCacheKeepSpinbox")
+        self.build_cache_keep_spinbox.setRange(0, 1024)
+        self.build_cache_keep_spinbox.setSuffix(" GiB")
+        self.build_cache_keep_spinbox.setSpecialValueText("Off")
+        self.build_cache_keep_spinbox.valueChanged.connect(
+            lambda gib: self.docker_build_cache_keep_changed.emit(gib * 1024 ** 3)
+        )
+        layout.addLayout(self.create_option_row("Keep newest Docker build cache:",
+                                                self.build_cache_keep_spinbox))
+        
         layout.addStretch()
         
         return dashboard
     
+    def create_option_row(self, text, control):
+        """Centered row with a label and the control it describes"""
+        row = QHBoxLayout()
+        row.addStretch()
+        label = QLabel(text)
+        label.setObjectName("optionLabel")
+        label.setFont(QFont("Inter", 10))
+        row.addWidget(label)
+        control.setFont(QFont("Inter", 10))
+        row.addWidget(control)
+        row.addStretch()
+        return row
+    
     def create_stat_card(self, title, value, icon):
         """Create a statistics card"""
         card = QFrame()
@@ -477,6 +576,23 @@ class MainWindow(QMainWindow):
                 color: #86868b;
             }
             
+            #cancelButton {
+                background-color: #e8e8ed;
+                color: #1d1d1f;
+                border: none;
+                border-radius: 8px;
+                padding: 6px 16px;
+            }
+            
+            #cancelButton:hover {
+                background-color: #d2d2d7;
+            }
+            
+            #cancelButton:disabled {
+                background-color: #f5f5f7;
+                color: #86868b;
+            }
+            
             #cleanButton {
                 background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
                     stop:0 #007aff, stop:1 #0051d5);
@@ -861,6 +977,7 @@ class MainWindow(QMainWindow):
             "Docker",
             "Kubernetes",
             "Dev Dependencies",
+            "Quarantine",
             "About"
         ]
         
@@ -876,7 +993,7 @@ class MainWindow(QMainWindow):
                 self.scan_button.setVisible(True)
                 self.header_clean_button.setVisible(False)  # Hide on dashboard
                 self.header_selection_badge.setVisible(False)  # Hide badge on dashboard
-            elif index == 8:  # About page
+            elif index >= 8:  # Quarantine and About pages
                 self.scan_button.setVisible(False)
                 self.header_clean_button.setVisible(False)  # Hide on about
                 self.header_selection_badge.setVisible(False)  # Hide badge on about
@@ -1002,6 +1119,94 @@ class MainWindow(QMainWindow):
         
         return view
     
+    def create_quarantine_view(self):
+        """Create the quarantine view listing restorable items"""
+        view = QFrame()
+        view.setObjectName("categoryView")
+        
+        layout = QVBoxLayout(view)
+        layout.setContentsMargins(0, 20, 0, 0)
+        layout.setSpacing(25)
+        
+        description = QLabel(
+            "Items cleaned in quarantine mode are moved aside on the same disk instead of being "
+            "deleted. Restore them with one click; they are purged automatically when they get old, "
+            "when the quarantine grows too large or when the disk runs low on space."
+        )
+        description.setObjectName("description")
+        description.setWordWrap(True)
+        description.setFont(QFont("Inter", 11))
+        layout.addWidget(description)
+        
+        self.quarantine_summary = QLabel("")
+        self.quarantine_summary.setObjectName("welcomeTitle")
+        self.quarantine_summary.setFont(QFont("Inter", 16, QFont.Medium))
+        layout.addWidget(self.quarantine_summary)
+        
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setFrameShape(QFrame.NoFrame)
+        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        
+        container = QWidget()
+        self.quarantine_layout = QVBoxLayout(container)
+        self.quarantine_layout.setContentsMargins(0, 0, 0, 0)
+        self.quarantine_layout.setSpacing(8)
+        self.quarantine_layout.setAlignment(Qt.AlignTop)
+        
+        scroll_area.setWidget(container)
+        layout.addWidget(scroll_area, 1)
+        
+        self.update_quarantine_view([])
+        
+        return view
+    
+    def update_quarantine_view(self, entries: List[Dict]):
+        """Rebuild the quarantine list"""
+        while self.quarantine_layout.count():
+            child = self.quarantine_layout.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+        
+        total = sum(entry.get('size', 0) for entry in entries)
+        self.quarantine_summary.setText(
+            f"{len(entries)} items • {naturalsize(total, binary=True)}" if entries else "Quarantine is empty"
+        )
+        
+        for entry in entries:
+            row = QFrame()
+            row.setObjectName("itemCheckboxFrame")
+            row_layout = QHBoxLayout(row)
+            row_layout.setContentsMargins(15, 10, 15, 10)
+            
+            label = QLabel(
+                f"<b>{os.path.basename(entry['original_path']) or entry['original_path']}</b>"
+                f"<br><span style='color: #86868b;'>{entry['original_path']} • "
+                f"{naturalsize(entry.get('size', 0), binary=True)} • {entry.get('category', '')} • "
+                f"{naturaltime(datetime.fromtimestamp(entry['created_at']))}</span>"
+            )
+            label.setFont(QFont("Inter", 11))
+            label.setWordWrap(True)
+            row_layout.addWidget(label, 1)
+            
+            restore_button = QPushButton("↩ Restore")
+            restore_button.setObjectName("cancelButton")
+            restore_button.setCursor(Qt.PointingHandCursor)
+            restore_button.clicked.connect(
+                lambda checked=False, entry_id=entry['id']: self.restore_requested.emit(entry_id)
+            )
+            row_layout.addWidget(restore_button)
+            
+            self.quarantine_layout.addWidget(row)
+        
+        self.quarantine_layout.addStretch()
+    
+    def set_quarantine_mode(self, enabled):
+        """Reflect the persisted quarantine setting without emitting a change"""
+        self.quarantine_checkbox.blockSignals(True)
+        self.quarantine_checkbox.setChecked(enabled)
+        self.quarantine_checkbox.blockSignals(False)
+    
     def create_about_view(self):
         """Create about view - elegant and modern"""
         view = QFrame()
@@ -1184,9 +1389,9 @@ class MainWindow(QMainWindow):
             if child.widget():
                 child.widget().deleteLater()
         
-        # Initialize selected items for this category
-        if category_name not in self.selected_items:
-            self.selected_items[category_name] = {}
+        # Reset selection state: indices refer to the items rendered below
+        self.selected_items[category_name] = {}
+        self.item_widgets[category_name] = {}
         
         if not items:
             # Show empty state, hide items container and header
@@ -1225,6 +1430,61 @@ class MainWindow(QMainWindow):
         
         self.update_selection_summary()
     
+    @staticmethod
+    def _item_key(item: Dict):
+        """Identity of an item across scans"""
+        return item.get('type'), item.get('endpoint'), item.get('path')
+    
+    def patch_category_view(self, category_name, items):
+        """
+        Update a category view in place after a clean: widgets of items that are
+        gone are removed, re-measured items show their new size, and every
+        remaining item keeps its selection. Items that weren't shown before
+        need a full render, after which the previous selections are restored.
+        """
+        current = self.selected_items.get(category_name)
+        widgets = self.item_widgets.get(category_name)
+        if not current or not widgets or not items:
+            self.update_category_view(category_name, items)
+            return
+        
+        refreshed = {self._item_key(item): item for item in items}
+        shown = {self._item_key(entry['data']) for entry in current.values()}
+        
+        if not set(refreshed) <= shown:
+            selections = {self._item_key(entry['data']): entry['selected'] for entry in current.values()}
+            self.update_category_view(category_name, items)
+            for idx, entry in self.selected_items.get(category_name, {}).items():
+                selected = selections.get(self._item_key(entry['data']))
+                if selected is not None and selected != entry['selected']:
+                    self.item_widgets[category_name][idx][0].set_selected(selected)
+            return
+        
+        for idx in list(current):
+            item_widget, group_widget = widgets[idx]
+            item = refreshed.get(self._item_key(current[idx]['data']))
+            if item is None:
+                del current[idx]
+                del widgets[idx]
+                if group_widget is None:
+                    self._remove_item_view(item_widget)
+                elif group_widget.remove_item_widget(item_widget) == 0:
+                    self._remove_item_view(group_widget)
+            elif item != current[idx]['data']:
+                current[idx]['data'] = item
+                item_widget.update_item(item)
+        
+        self.update_category_selection_visuals(category_name)
+        self.update_selection_summary()
+    
+    @staticmethod
+    def _remove_item_view(widget):
+        """Take an item (or subcategory group) widget out of its category's list"""
+        parent = widget.parentWidget()
+        if parent is not None and parent.layout() is not None:
+            parent.layout().removeWidget(widget)
+        widget.deleteLater()
+    
     def _render_with_subcategories(self, category_name: str, items: List[Dict], layout):
         """Render items organized by subcategories using new components"""
         grouped_items = self.subcategory_service.group_items_by_subcategory(items)
@@ -1248,9 +1508,10 @@ class MainWindow(QMainWindow):
             for item_idx, item_widget in enumerate(group_widget.item_widgets):
                 global_idx = idx + item_idx
                 self.selected_items[category_name][global_idx] = {
-                    'selected': True,
+                    'selected': item_widget.is_selected(),
                     'data': item_widget.item_data
                 }
+                self.item_widgets[category_name][global_idx] = (item_widget, group_widget)
                 
                 # Connect signal with proper closure to capture global_idx by value
                 def make_callback(cat, gidx):
@@ -1269,9 +1530,10 @@ class MainWindow(QMainWindow):
             
             # Store selection state
             self.selected_items[category_name][idx] = {
-                'selected': True,
+                'selected': item_widget.is_selected(),
                 'data': item_data
             }
+            self.item_widgets[category_name][idx] = (item_widget, None)
             
             # Connect selection change - use a factory function to capture idx by value
             def make_callback(cat, item_idx):
@@ -1427,9 +1689,9 @@ class MainWindow(QMainWindow):
     
     def update_header_selection_badge(self):
         """Update the header selection badge with selected items summary"""
-        # Don't show badge on Dashboard (index 0) or About (index 8)
+        # Don't show badge on Dashboard (index 0), Quarantine (8) or About (9)
         current_index = self.stacked_widget.currentIndex()
-        if current_index == 0 or current_index == 8:
+        if current_index == 0 or current_index >= 8:
             self.header_selection_badge.setVisible(False)
             return
         
@@ -1449,7 +1711,6 @@ class MainWindow(QMainWindow):
         if selected_items == 0:
             self.header_selection_badge.setVisible(False)
         else:
-            from humanize import naturalsize
             size_str = naturalsize(selected_size, binary=True)
             self.header_selection_badge.setText(f"✓ {selected_items} selected • {size_str}")
             self.header_selection_badge.setVisible(True)
@@ -1464,8 +1725,8 @@ class MainWindow(QMainWindow):
         # Only show on category pages (not Dashboard or About)
         current_index = self.stacked_widget.currentIndex()
         
-        # Dashboard = 0, About = 8, Categories = 1-7
-        if current_index == 0 or current_index == 8:
+        # Dashboard = 0, Quarantine = 8, About = 9, Categories = 1-7
+        if current_index == 0 or current_index >= 8:
             self.header_clean_button.setVisible(False)
             return
         
@@ -1518,6 +1779,50 @@ class MainWindow(QMainWindow):
         if selected_for_cleaning:
             self.clean_requested.emit(selected_for_cleaning)
     
+    def on_cancel_button_clicked(self):
+        """Handle cancel button click"""
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.setText("Cancelling...")
+        self.cancel_requested.emit()
+    
+    def set_privileged_scan(self, enabled):
+        """Reflect the persisted privileged scan setting without emitting a change"""
+        self.privileged_scan_checkbox.blockSignals(True)
+        self.privileged_scan_checkbox.setChecked(enabled)
+        self.privileged_scan_checkbox.blockSignals(False)
+    
+    def on_docker_protected_images_edited(self):
+        """Emit the protected image patterns as a list (comma or whitespace separated)"""
+        text = self.docker_protected_input.text().replace(',', ' ')
+        self.docker_protected_images_changed.emit(text.split())
+    
+    def set_docker_image_policy(self, keep_per_repo, protected):
+        """Reflect the persisted Docker image retention settings without emitting a change"""
+        self.docker_keep_spinbox.blockSignals(True)
+        self.docker_keep_spinbox.setValue(keep_per_repo)
+        self.docker_keep_spinbox.blockSignals(False)
+        self.docker_protected_input.setText(', '.join(protected))
+    
+    def set_build_cache_policy(self, max_age_hours, keep_bytes):
+        """Reflect the persisted build cache pruning settings without emitting a change"""
+        for spinbox, value in ((self.build_cache_age_spinbox, int(max_age_hours)),
+                               (self.build_cache_keep_spinbox, round(keep_bytes / 1024 ** 3))):
+            spinbox.blockSignals(True)
+            spinbox.setValue(value)
+            spinbox.blockSignals(False)
+    
+    def set_gentle_mode(self, enabled):
+        """Reflect the persisted I/O-gentle setting without emitting a change"""
+        self.gentle_checkbox.blockSignals(True)
+        self.gentle_checkbox.setChecked(enabled)
+        self.gentle_checkbox.blockSignals(False)
+    
+    def show_cancel_button(self, visible=True):
+        """Show or hide the cancel button shown while cleaning"""
+        self.cancel_button.setText("Cancel")
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(visible)
+    
     def show_clean_button(self, visible=True):
         """Show or hide the clean button on dashboard"""
         self.clean_button.setVisible(visible)
@@ -35,15 +35,19 @@ class SubcategoryHeaderWidget(QFrame):
         layout.addStretch()
         
         # Item count badge
-        count_text = f"{item_count} item" if item_count == 1 else f"{item_count} items"
-        count_label = QLabel(count_text)
-        count_label.setObjectName("subcategoryCount")
-        count_label.setAlignment(Qt.AlignCenter)
+        self.count_label = QLabel()
+        self.count_label.setObjectName("subcategoryCount")
+        self.count_label.setAlignment(Qt.AlignCenter)
         count_font = QFont("Inter", 10, QFont.Medium)
-        count_label.setFont(count_font)
-        count_label.setFixedHeight(24)
-        count_label.setMinimumWidth(65)
-        layout.addWidget(count_label)
+        self.count_label.setFont(count_font)
+        self.count_label.setFixedHeight(24)
+        self.count_label.setMinimumWidth(65)
+        self.set_item_count(item_count)
+        layout.addWidget(self.count_label)
+    
+    def set_item_count(self, item_count: int):
+        """Update the item count badge"""
+        self.count_label.setText(f"{item_count} item" if item_count == 1 else f"{item_count} items")
 
 
 class ItemCheckboxWidget(QFrame):
@@ -71,7 +75,8 @@ class ItemCheckboxWidget(QFrame):
         self.checkbox = QCheckBox()
         self.checkbox.setObjectName(f"checkbox_{self.item_id}")
         self.checkbox.setTristate(False)  # Disable tristate - only checked/unchecked
-        self.checkbox.setChecked(True)  # Selected by default
+        # Selected by default, unless the item is flagged (e.g. a hot cache that regrows quickly)
+        self.checkbox.setChecked(self.item_data.get('default_selected', True))
         self.checkbox.setCursor(Qt.PointingHandCursor)
         # Use toggled signal instead of stateChanged to avoid tristate issues
         self.checkbox.toggled.connect(self._on_toggled)
@@ -91,8 +96,8 @@ class ItemCheckboxWidget(QFrame):
         info_layout.addWidget(name_label)
         
         # Details
-        details_label = self._create_details_label()
-        info_layout.addWidget(details_label)
+        self.details_label = self._create_details_label()
+        info_layout.addWidget(self.details_label)
         
         layout.addLayout(info_layout, 1)
     
@@ -102,6 +107,16 @@ class ItemCheckboxWidget(QFrame):
     
     def _create_details_label(self) -> QLabel:
         """Create the details label with size and path info"""
+        details_label = QLabel(self._details_text())
+        details_label.setObjectName("itemDetails")
+        details_label.setWordWrap(False)
+        details_font = QFont("Inter", 9)
+        details_label.setFont(details_font)
+        
+        return details_label
+    
+    def _details_text(self) -> str:
+        """Size, flags and details (or path) of the item"""
         size = self.item_data.get('size', 0)
         size_str = self._format_size(size)
         path = self.item_data.get('path', '')
@@ -112,18 +127,23 @@ class ItemCheckboxWidget(QFrame):
         parts = [size_str]
         if requires_root:
             parts.append("🔒 Requires admin privileges")
+        if self.item_data.get('hot'):
+            regrowth = self.item_data.get('regrowth', {})
+            parts.append(
+                f"🔥 Hot cache • refilled {int(regrowth.get('ratio', 0) * 100)}% "
+                f"in {regrowth.get('hours', 0)}h • keeping it is recommended"
+            )
         if details_text:
             parts.append(details_text)
         elif path and len(path) < 100:
             parts.append(path)
         
-        details_label = QLabel(" • ".join(parts))
-        details_label.setObjectName("itemDetails")
-        details_label.setWordWrap(False)
-        details_font = QFont("Inter", 9)
-        details_label.setFont(details_font)
-        
-        return details_label
+        return " • ".join(parts)
+    
+    def update_item(self, item_data: Dict):
+        """Show refreshed data for the same item (e.g. re-measured after a clean), keeping the selection"""
+        self.item_data = item_data
+        self.details_label.setText(self._details_text())
     
     def _format_size(self, size_bytes: int) -> str:
         """Format size in bytes to human-readable string"""
@@ -169,8 +189,8 @@ class SubcategoryGroupWidget(QWidget):
         layout.setSpacing(0)
         
         # Add header
-        header = SubcategoryHeaderWidget(self.subcategory_name, len(self.items))
-        layout.addWidget(header)
+        self.header = SubcategoryHeaderWidget(self.subcategory_name, len(self.items))
+        layout.addWidget(self.header)
         
         # Add items
         for idx, item_data in enumerate(self.items):
@@ -196,3 +216,12 @@ class SubcategoryGroupWidget(QWidget):
         """Select or deselect all items in this subcategory"""
         for widget in self.item_widgets:
             widget.set_selected(selected)
+    
+    def remove_item_widget(self, item_widget: ItemCheckboxWidget) -> int:
+        """Remove one item's widget, returning how many items are left"""
+        if item_widget in self.item_widgets:
+            self.item_widgets.remove(item_widget)
+            self.layout().removeWidget(item_widget)
+            item_widget.deleteLater()
+            self.header.set_item_count(len(self.item_widgets))
+        return len(self.item_widgets)
@@ -0,0 +1,3 @@
+"""
+Echo Cleaner test suite
+"""
@@ -0,0 +1,28 @@
+"""
+Shared fixtures
+"""
+
+import shutil
+import tempfile
+
+import pytest
+
+from tests.fake_docker import FakeDockerDaemon
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Keep settings, journals and caches of every test in its own directory"""
+    directory = tmp_path / "data"
+    monkeypatch.setenv('XDG_DATA_HOME', str(directory))
+    return directory
+
+
+@pytest.fixture
+def docker_daemon():
+    """A running fake Engine API (unix socket paths are short-lived and length-limited)"""
+    directory = tempfile.mkdtemp(prefix="fake-docker-")
+    daemon = FakeDockerDaemon(f"{directory}/docker.sock").start()
+    yield daemon
+    daemon.stop()
+    shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,28 @@
+"""
+Fake Cleaner - A cleaner with given items and a fixed resource lane, for tests
+"""
+
+from modules.base_cleaner import BaseCleaner
+
+
+class FakeCleaner(BaseCleaner):
+    """Cleaner whose items are given, bound to a fixed resource lane"""
+
+    def __init__(self, name, resource='disk'):
+        super().__init__(name=name, description=name)
+        self.resource = resource
+
+    def scan(self):
+        return []
+
+    def clean(self, items):
+        return 0
+
+    def resource_key(self, items):
+        return self.resource
+
+
+def category(cleaner, *paths, size=10):
+    """A category dict as CleanPlan.compile() takes it"""
+    return {'name': cleaner.name, 'cleaner': cleaner,
+            'items': [{'path': path, 'size': size} for path in paths]}
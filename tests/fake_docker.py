@@ -0,0 +1,187 @@
+"""
+Fake Docker Engine API - A small HTTP/1.1 server on a unix socket for tests
+"""
+
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+Response = Tuple[int, Union[bytes, Dict, List, None]]
+
+
+def default_df() -> Dict:
+    """A /system/df document with one object of each kind worth cleaning, and one in use"""
+    return {
+        'Images': [
+            {'Id': 'sha256:' + 'a' * 64, 'RepoTags': None, 'Size': 5000, 'SharedSize': 0,
+             'Created': 1700000000, 'Containers': 0},
+            {'Id': 'sha256:' + 'b' * 64, 'RepoTags': ['nginx:latest'], 'Size': 1000, 'SharedSize': 0,
+             'Created': 1700000000, 'Containers': 1},
+        ],
+        'Containers': [
+            {'Id': 'c' * 64, 'Names': ['/old'], 'ImageID': 'sha256:' + 'b' * 64,
+             'State': 'exited', 'Status': 'Exited (0) 2 days ago', 'SizeRw': 4096},
+            {'Id': 'd' * 64, 'Names': ['/web'], 'ImageID': 'sha256:' + 'b' * 64,
+             'State': 'running', 'Status': 'Up 2 hours', 'SizeRw': 1},
+        ],
+        'Volumes': [
+            {'Name': 'unused', 'UsageData': {'Size': 777, 'RefCount': 0}},
+            {'Name': 'mounted', 'UsageData': {'Size': 5, 'RefCount': 1}},
+        ],
+        'BuildCache': [
+            {'ID': 'cache1', 'Type': 'regular', 'Size': 100, 'InUse': False,
+             'LastUsedAt': '2020-01-01T00:00:00Z'},
+            {'ID': 'cache2', 'Type': 'regular', 'Size': 23, 'InUse': True,
+             'LastUsedAt': '2020-01-01T00:00:00Z'},
+        ],
+    }
+
+
+class FakeDockerDaemon:
+    """
+    Serves a /system/df document (and the listings derived from it) and records
+    every request as (method, path, query).
+
+    `responses` maps (method, path) to a (status, body) tuple, or to a callable
+    taking the parsed query and returning one, overriding the built-in routes.
+    With `close_after_reply` every connection is dropped after one response
+    without announcing it, like a daemon closing idle keep-alive connections.
+    """
+
+    DF_SECTIONS = {'container': 'Containers', 'image': 'Images', 'volume': 'Volumes',
+                   'build-cache': 'BuildCache'}
+
+    def __init__(self, socket_path: str, df: Optional[Dict] = None):
+        self.socket_path = str(socket_path)
+        self.df = df if df is not None else default_df()
+        self.inspect: Dict[str, Dict] = {}  # Container ID -> inspect document
+        self.responses: Dict[Tuple[str, str], Union[Response, Callable[[Dict], Response]]] = {}
+        self.requests: List[Tuple[str, str, Dict]] = []
+        self.connections = 0
+        self.disconnects = threading.Semaphore(0)  # Released whenever a connection is closed
+        self.close_after_reply = False
+        self._stopped = threading.Event()
+        self._server: Optional[socketserver.UnixStreamServer] = None
+
+    def start(self) -> 'FakeDockerDaemon':
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                daemon.connections += 1
+                super().setup()
+
+            def finish(self):
+                super().finish()
+                daemon.disconnects.release()
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                daemon._handle(self, 'GET')
+
+            def do_POST(self):
+                daemon._handle(self, 'POST')
+
+            def do_DELETE(self):
+                daemon._handle(self, 'DELETE')
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+            def handle_error(self, request, client_address):
+                pass  # Clients hanging up on the event stream
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = Server(self.socket_path, Handler)
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __enter__(self) -> 'FakeDockerDaemon':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def paths(self, method: Optional[str] = None) -> List[str]:
+        """Paths requested so far (optionally only for one method)"""
+        return [path for request_method, path, _ in self.requests if method in (None, request_method)]
+
+    # --- Routing ----------------------------------------------------------------
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str):
+        url = urlsplit(handler.path)
+        path = unquote(url.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.requests.append((method, path, query))
+
+        if method == 'GET' and path == '/events':
+            return self._stream_events(handler)
+
+        override = self.responses.get((method, path))
+        if override is not None:
+            status, body = override(query) if callable(override) else override
+        else:
+            status, body = self._route(method, path, query)
+
+        data = body if isinstance(body, bytes) else (b'' if body is None else json.dumps(body).encode())
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+        handler.wfile.flush()
+        if self.close_after_reply:
+            handler.close_connection = True
+
+    def _route(self, method: str, path: str, query: Dict) -> Response:
+        if method == 'GET':
+            if path == '/_ping':
+                return 200, b'OK'
+            if path == '/system/df':
+                section = self.DF_SECTIONS.get(query.get('type', ''))
+                return 200, {section: self.df.get(section)} if section else self.df
+            if path == '/containers/json':
+                return 200, self.df.get('Containers') or []
+            if path == '/images/json':
+                return 200, self.df.get('Images') or []
+            if path.startswith('/containers/') and path.endswith('/json'):
+                details = self.inspect.get(path[len('/containers/'):-len('/json')])
+                return (200, details) if details is not None else (404, {'message': 'No such container'})
+            if path == '/info':
+                return 200, {'DockerRootDir': '/var/lib/docker'}
+        elif method == 'DELETE':
+            if path.startswith('/images/'):
+                return 200, [{'Deleted': path[len('/images/'):]}]
+            if path.startswith(('/containers/', '/volumes/')):
+                return 204, None
+        elif method == 'POST' and path == '/build/prune':
+            return 200, {'CachesDeleted': [], 'SpaceReclaimed': 0}
+        return 404, {'message': 'page not found'}
+
+    def _stream_events(self, handler: BaseHTTPRequestHandler):
+        """Hold an event stream open, sending nothing, until the server stops"""
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.end_headers()
+        handler.wfile.flush()
+        self._stopped.wait()
+        handler.close_connection = True
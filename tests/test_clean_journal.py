@@ -0,0 +1,87 @@
+"""
+Tests for the clean journal and resuming interrupted runs
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services.clean_journal import CleanJournal
+from services.clean_plan import CleanPlan
+from tests.fake_cleaner import FakeCleaner, category
+
+
+def find_interrupted_clean(cleaners):
+    """CleaningService.find_interrupted_clean() for the given cleaners (the service needs Qt)"""
+    pytest.importorskip('PySide6')
+    from services.cleaning_service import CleaningService
+    return CleaningService.find_interrupted_clean(SimpleNamespace(cleaners=cleaners))
+
+
+def interrupted_run(cleaner, done_ops):
+    """Journal of a run that crashed after finishing `done_ops`"""
+    plan = CleanPlan.compile([category(cleaner, '/a/1', '/a/2', '/a/3')])
+    journal = CleanJournal.create(plan)
+    for op_id in done_ops:
+        journal.record_done(op_id, 'cleaned', 10)
+    journal.sync()
+    return journal
+
+
+def test_journal_records_the_plan_and_finished_operations():
+    journal = interrupted_run(FakeCleaner("A"), [0, 2])
+
+    plan_data, done = CleanJournal.read(journal.path)
+
+    assert [op['item']['path'] for op in plan_data['operations']] == ['/a/1', '/a/2', '/a/3']
+    assert done == {0, 2}
+    assert CleanJournal.find_interrupted() == [journal.path]
+
+
+def test_torn_last_record_is_ignored():
+    journal = interrupted_run(FakeCleaner("A"), [0])
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "done", "op_')
+
+    _, done = CleanJournal.read(journal.path)
+
+    assert done == {0}
+
+
+def test_closed_journal_is_not_resumed():
+    journal = interrupted_run(FakeCleaner("A"), [0])
+
+    journal.close()
+
+    assert not journal.path.exists()
+    assert CleanJournal.find_interrupted() == []
+
+
+def test_resume_plans_only_the_remaining_operations():
+    cleaner = FakeCleaner("A")
+    journal = interrupted_run(cleaner, [1])
+
+    path, plan = find_interrupted_clean([cleaner])
+
+    assert path == journal.path
+    assert [op.item['path'] for op in plan.operations] == ['/a/1', '/a/3']
+    assert plan.get_cleaner("A") is cleaner
+
+
+def test_finished_or_unreadable_journals_are_discarded():
+    cleaner = FakeCleaner("A")
+    finished = interrupted_run(cleaner, [0, 1, 2])
+    orphaned = interrupted_run(FakeCleaner("Removed"), [])
+
+    assert find_interrupted_clean([cleaner]) is None
+    assert not finished.path.exists()
+    assert not orphaned.path.exists()
+
+
+def test_runs_started_together_get_their_own_journals():
+    first = interrupted_run(FakeCleaner("A"), [0])
+    second = interrupted_run(FakeCleaner("B"), [])
+
+    assert first.path != second.path
+    assert CleanJournal.read(first.path)[1] == {0}
+    assert CleanJournal.read(second.path)[1] == set()
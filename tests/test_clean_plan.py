@@ -0,0 +1,65 @@
+"""
+Tests for clean plans: compilation, lanes and serialization
+"""
+
+import pytest
+
+from services.clean_plan import CleanPlan
+from tests.fake_cleaner import FakeCleaner, category
+
+
+def test_items_covered_by_another_selection_are_skipped():
+    caches, logs = FakeCleaner("Caches"), FakeCleaner("Logs")
+
+    plan = CleanPlan.compile([
+        category(caches, '/home/u/.cache', '/home/u/.cache/pip'),
+        category(logs, '/home/u/.cache/app/log.1'),
+    ])
+
+    assert [op.item['path'] for op in plan.operations] == ['/home/u/.cache']
+    assert [skipped['path'] for skipped in plan.skipped] == ['/home/u/.cache/pip', '/home/u/.cache/app/log.1']
+    assert plan.total_size == 10
+
+
+def test_lanes_group_operations_by_resource():
+    disk_a, disk_b, docker = FakeCleaner("A"), FakeCleaner("B"), FakeCleaner("Docker", 'docker')
+
+    plan = CleanPlan.compile([
+        category(docker, 'image1'),
+        category(disk_a, '/a/1', '/a/2'),
+        category(disk_b, '/b/1'),
+    ])
+
+    lanes = plan.lanes()
+    assert sorted(lanes) == ['disk', 'docker']
+    assert [op.item['path'] for op in lanes['disk']] == ['/a/1', '/a/2', '/b/1']
+    assert [op.op_id for op in plan.operations] == list(range(4))
+
+
+def test_plan_round_trips_through_a_file(tmp_path):
+    cleaners = [FakeCleaner("A"), FakeCleaner("Docker", 'docker')]
+    plan = CleanPlan.compile([category(cleaners[0], '/a/1', '/a/2'), category(cleaners[1], 'image1')])
+    path = tmp_path / "plan.json"
+
+    plan.save(str(path))
+    loaded = CleanPlan.load(str(path), cleaners)
+
+    assert loaded.to_dict() == plan.to_dict()
+    assert loaded.get_cleaner('Docker') is cleaners[1]
+    assert loaded.dry_run() == plan.dry_run()
+
+
+def test_plan_needs_its_cleaners():
+    plan = CleanPlan.compile([category(FakeCleaner("A"), '/a/1')])
+
+    with pytest.raises(ValueError):
+        CleanPlan.from_dict(plan.to_dict(), [FakeCleaner("B")])
+
+
+def test_unknown_plan_version_is_rejected():
+    cleaner = FakeCleaner("A")
+    data = CleanPlan.compile([category(cleaner, '/a/1')]).to_dict()
+    data['version'] = CleanPlan.VERSION + 1
+
+    with pytest.raises(ValueError):
+        CleanPlan.from_dict(data, [cleaner])
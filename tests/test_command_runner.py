@@ -0,0 +1,28 @@
+"""
+Tests for the asynchronous command runner
+"""
+
+import sys
+
+from modules.command_runner import CommandRunner
+
+
+def test_lines_are_streamed():
+    lines = []
+
+    result = CommandRunner().run([sys.executable, '-c', 'print("a"); print("b")'], on_line=lines.append)
+
+    assert result.returncode == 0
+    assert lines == ['a', 'b']
+
+
+def test_over_long_streamed_line_fails_the_command():
+    runner = CommandRunner()
+    runner.LINE_LIMIT = 1024
+    lines = []
+
+    result = runner.run([sys.executable, '-c', 'print("x" * 4096); print("after")'], on_line=lines.append)
+
+    assert result.returncode == -1
+    assert result.stderr.startswith("Could not read output")
+    assert lines == []
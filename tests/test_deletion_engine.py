@@ -0,0 +1,92 @@
+"""
+Tests for the deletion engine
+"""
+
+import os
+import stat
+
+from modules.deletion_engine import DeletionEngine
+
+
+def make_tree(root, files=20, size=100):
+    """A tree two levels deep with `files` files in every directory"""
+    for branch in ('a', 'b', 'c'):
+        for leaf in ('x', 'y'):
+            directory = root / branch / leaf
+            directory.mkdir(parents=True)
+            for index in range(files):
+                (directory / f"f{index}").write_bytes(b'0' * size)
+    return 3 * 2 * files, 3 * 2 * files * size
+
+
+def test_removes_a_tree_and_counts_what_it_freed(tmp_path):
+    root = tmp_path / "tree"
+    file_count, byte_count = make_tree(root)
+    progress = []
+    engine = DeletionEngine(max_workers=4, progress_callback=lambda freed, files: progress.append((freed, files)))
+
+    result = engine.remove(str(root))
+
+    assert result.removed
+    assert not result.errors
+    assert not root.exists()
+    assert result.files_removed == file_count
+    assert result.bytes_freed == byte_count
+    assert result.dirs_removed == 1 + 3 + 3 * 2
+    assert sum(freed for freed, _ in progress) == byte_count
+
+
+def test_removes_a_single_file(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(b'0' * 10)
+
+    result = DeletionEngine().remove(str(path))
+
+    assert result.removed
+    assert result.bytes_freed == 10
+    assert not path.exists()
+
+
+def test_symlinks_are_removed_not_followed(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "keep").write_text("data")
+    root = tmp_path / "tree"
+    root.mkdir()
+    (root / "link").symlink_to(outside, target_is_directory=True)
+
+    result = DeletionEngine().remove(str(root))
+
+    assert result.removed
+    assert (outside / "keep").read_text() == "data"
+
+
+def test_read_only_directories_are_made_writable(tmp_path):
+    root = tmp_path / "modcache"
+    locked = root / "pkg@v1"
+    locked.mkdir(parents=True)
+    (locked / "go.mod").write_text("module pkg")
+    locked.chmod(stat.S_IRUSR | stat.S_IXUSR)
+
+    try:
+        result = DeletionEngine().remove(str(root))
+    finally:
+        if locked.exists():
+            locked.chmod(stat.S_IRWXU)
+
+    assert result.removed
+    assert not root.exists()
+
+
+def test_missing_path_is_not_an_error(tmp_path):
+    result = DeletionEngine().remove(str(tmp_path / "gone"))
+
+    assert not result.removed
+    assert not result.errors
+
+
+def test_filesystem_root_is_refused():
+    result = DeletionEngine().remove(os.sep)
+
+    assert not result.removed
+    assert result.errors
@@ -0,0 +1,71 @@
+"""
+Tests for the Engine API client: connection pool, retries and error mapping
+"""
+
+import pytest
+
+from modules.docker_api import DockerAPI, DockerAPIError
+
+
+def test_connections_are_reused(docker_daemon):
+    api = DockerAPI(docker_daemon.socket_path)
+
+    for _ in range(3):
+        assert api.request('GET', '/_ping') == 'OK'
+
+    assert docker_daemon.connections == 1
+
+
+def test_connection_closed_while_idle_is_replaced(docker_daemon):
+    docker_daemon.close_after_reply = True
+    api = DockerAPI(docker_daemon.socket_path)
+
+    assert api.request('GET', '/_ping') == 'OK'
+    assert docker_daemon.disconnects.acquire(timeout=5)
+    # The pooled connection was dropped by the daemon: the request is retried once on a fresh one
+    assert api.system_df()['Images']
+
+    # The first attempt hit the closed connection and never reached the daemon
+    assert docker_daemon.paths() == ['/_ping', '/system/df']
+    assert docker_daemon.connections == 2
+
+
+def test_daemon_errors_are_not_retried(docker_daemon):
+    docker_daemon.responses[('DELETE', '/volumes/busy')] = (409, {'message': 'volume is in use'})
+    api = DockerAPI(docker_daemon.socket_path)
+
+    with pytest.raises(DockerAPIError) as error:
+        api.remove_volume('busy')
+
+    assert error.value.status == 409
+    assert 'volume is in use' in str(error.value)
+    assert docker_daemon.paths('DELETE') == ['/volumes/busy']
+
+
+def test_unreachable_socket_raises_without_status(tmp_path):
+    api = DockerAPI(str(tmp_path / "missing.sock"))
+
+    assert not api.usable
+    with pytest.raises(DockerAPIError) as error:
+        api.request('GET', '/_ping')
+
+    assert error.value.status == 0
+
+
+def test_filters_are_sent_as_json(docker_daemon):
+    api = DockerAPI(docker_daemon.socket_path)
+
+    api.containers(size=True, filters={'id': ['abc']})
+
+    _, path, query = docker_daemon.requests[-1]
+    assert path == '/containers/json'
+    assert query == {'all': '1', 'size': '1', 'filters': '{"id": ["abc"]}'}
+
+
+def test_system_df_section(docker_daemon):
+    api = DockerAPI(docker_daemon.socket_path)
+
+    document = api.system_df('volume')
+
+    assert list(document) == ['Volumes']
+    assert docker_daemon.requests[-1][2] == {'type': 'volume'}
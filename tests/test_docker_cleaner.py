@@ -0,0 +1,135 @@
+"""
+Tests for the Docker cleaner against a fake Engine API
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from modules.docker_cleaner import DockerCleaner
+
+
+@pytest.fixture
+def cleaner(docker_daemon):
+    cleaner = DockerCleaner(docker_daemon.socket_path)
+    yield cleaner
+    cleaner.inventory.stop()
+    cleaner.api.close()
+
+
+def no_cli(command, *args, **kwargs):
+    raise AssertionError(f"Unexpected CLI fallback: {command}")
+
+
+def completed(returncode=0, stdout='', stderr=''):
+    return SimpleNamespace(returncode=returncode, stdout=stdout, stderr=stderr)
+
+
+# --- Removal ------------------------------------------------------------------
+
+def test_image_in_use_is_removed_with_force(docker_daemon, cleaner, monkeypatch):
+    image_id = 'sha256:' + 'a' * 64
+    docker_daemon.responses[('DELETE', f'/images/{image_id}')] = lambda query: (
+        (409, {'message': 'conflict: image is being used by stopped container'})
+        if query['force'] == '0' else (200, [{'Deleted': image_id}])
+    )
+    monkeypatch.setattr(cleaner, 'run_command', no_cli)
+
+    assert cleaner._remove({'type': 'docker_image', 'path': image_id}) == (True, '')
+
+    forces = [query['force'] for method, _, query in docker_daemon.requests if method == 'DELETE']
+    assert forces == ['0', '1']
+
+
+def test_daemon_refusal_is_reported_without_cli_fallback(docker_daemon, cleaner, monkeypatch):
+    docker_daemon.responses[('DELETE', '/volumes/busy')] = (409, {'message': 'volume is in use'})
+    monkeypatch.setattr(cleaner, 'run_command', no_cli)
+
+    success, error = cleaner._remove({'type': 'docker_volume', 'path': 'busy'})
+
+    assert not success
+    assert 'volume is in use' in error
+
+
+# --- Inventory ----------------------------------------------------------------
+
+def test_system_df_is_parsed_into_items(docker_daemon, cleaner, tmp_path):
+    log_path = tmp_path / "old-json.log"
+    log_path.write_bytes(b'x' * 300)
+    docker_daemon.inspect['c' * 64] = {'LogPath': str(log_path), 'HostConfig': {'LogConfig': {'Type': 'json-file'}}}
+    docker_daemon.inspect['d' * 64] = {'LogPath': '', 'HostConfig': {'LogConfig': {'Type': 'journald'}}}
+
+    inventory = cleaner._inventory_api()
+
+    def paths(subcategory):
+        return [item['path'] for item in inventory[subcategory]]
+
+    assert paths('Dangling Images') == ['sha256:' + 'a' * 64]
+    assert paths('Stopped Containers') == ['c' * 64]
+    assert inventory['Stopped Containers'][0]['size'] == 4096
+    assert paths('Unused Volumes') == ['unused']
+    assert inventory['Unused Volumes'][0]['size'] == 777
+    assert paths('Build Cache') == ['cache1']  # cache2 is in use
+    assert paths('Container Logs') == [str(log_path)]
+    assert inventory['Container Logs'][0]['size'] == 300
+    # Everything came from one /system/df document (plus one inspect per new container)
+    assert docker_daemon.paths().count('/system/df') == 1
+
+
+def test_rescan_reuses_container_log_paths(docker_daemon, cleaner):
+    docker_daemon.inspect['c' * 64] = {'LogPath': '', 'HostConfig': {'LogConfig': {'Type': 'json-file'}}}
+    docker_daemon.inspect['d' * 64] = {'LogPath': '', 'HostConfig': {'LogConfig': {'Type': 'json-file'}}}
+
+    cleaner._inventory_api()
+    cleaner._inventory_api()
+
+    inspects = [path for path in docker_daemon.paths() if path.startswith('/containers/') and path != '/containers/json']
+    assert len(inspects) == 2
+
+
+# --- Multi-ID CLI removals ----------------------------------------------------
+
+@pytest.fixture
+def cli_cleaner(tmp_path):
+    cleaner = DockerCleaner(str(tmp_path / "missing.sock"))
+    yield cleaner
+    cleaner.api.close()
+
+
+def test_multi_id_success(cli_cleaner, monkeypatch):
+    commands = []
+    monkeypatch.setattr(cli_cleaner, 'run_command', lambda command, *a, **k: commands.append(command) or completed())
+
+    assert cli_cleaner._run_multi_id(['docker', 'rm'], ['one', 'two']) == {}
+    assert commands == [['docker', 'rm', 'one', 'two']]
+
+
+def test_multi_id_errors_are_mapped_to_the_objects_named(cli_cleaner, monkeypatch):
+    first, second = 'sha256:' + '1' * 64, 'sha256:' + '2' * 64
+    stderr = ("Error response from daemon: conflict: unable to delete 222222222222 "
+              "(must be forced) - image is being used by stopped container abc\n")
+    monkeypatch.setattr(cli_cleaner, 'run_command', lambda *a, **k: completed(1, stderr=stderr))
+
+    errors = cli_cleaner._run_multi_id(['docker', 'rmi'], [first, second])
+
+    assert list(errors) == [second]
+    assert 'must be forced' in errors[second]
+
+
+def test_multi_id_names_must_match_whole_words(cli_cleaner, monkeypatch):
+    stderr = "Error response from daemon: get cache-old: no such volume\n"
+    monkeypatch.setattr(cli_cleaner, 'run_command', lambda *a, **k: completed(1, stderr=stderr))
+
+    errors = cli_cleaner._run_multi_id(['docker', 'volume', 'rm'], ['cache', 'cache-old'])
+
+    assert list(errors) == ['cache-old']
+
+
+def test_multi_id_failure_naming_nothing_fails_every_object(cli_cleaner, monkeypatch):
+    stderr = "Cannot connect to the Docker daemon. Is the docker daemon running?\n"
+    monkeypatch.setattr(cli_cleaner, 'run_command', lambda *a, **k: completed(1, stderr=stderr))
+
+    errors = cli_cleaner._run_multi_id(['docker', 'rm'], ['one', 'two'])
+
+    assert set(errors) == {'one', 'two'}
+    assert all('Cannot connect' in error for error in errors.values())
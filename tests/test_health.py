@@ -0,0 +1,38 @@
+"""
+Tests for learned command timeouts
+"""
+
+from modules.health import AdaptiveTimeout, HealthMonitor, command_key, learns_timeout
+
+
+def test_camel_case_tasks_are_subcommands():
+    assert command_key(['gradle', 'cleanBuildCache']) == 'gradle cleanBuildCache'
+    assert not learns_timeout(['gradle', 'cleanBuildCache'])
+
+
+def test_read_only_commands_learn_and_mutating_ones_do_not():
+    assert learns_timeout(['docker', 'ps', '-a', '--format', '{{.ID}}'])
+    assert not learns_timeout(['docker', 'image', 'prune', '-f'])
+    assert not learns_timeout(['npm', 'cache', 'clean', '--force'])
+    assert not learns_timeout(['docker', 'rmi', 'a', 'b', 'c'])
+
+
+def test_learned_timeout_follows_latency_within_its_bounds():
+    timeout = AdaptiveTimeout(initial=60.0, minimum=5.0, maximum=120.0)
+
+    for _ in range(AdaptiveTimeout.MIN_SAMPLES):
+        timeout.observe(1.0)
+
+    assert timeout.timeout == 5.0
+    for _ in range(10):
+        timeout.observe(0, timed_out=True)
+    assert timeout.timeout == 120.0
+
+
+def test_learned_timeout_is_capped_by_the_callers_fixed_timeout():
+    monitor = HealthMonitor()
+
+    for _ in range(10):
+        monitor.observe('docker ps', 0, timed_out=True, maximum=600.0)
+
+    assert monitor.timeout_for('docker ps', 600.0) == 600.0
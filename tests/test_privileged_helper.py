@@ -0,0 +1,70 @@
+"""
+Tests for the privileged helper's request validation
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from modules.privileged_helper import HelperError, _validate, execute
+
+
+@pytest.mark.parametrize('path', [
+    '/var/cache/apt/archives',
+    '/var/log/syslog.1',
+    '/var/lib/docker/containers/abc/abc-json.log',
+])
+def test_paths_inside_allowed_roots_are_accepted(path):
+    assert _validate(path) == path
+
+
+@pytest.mark.parametrize('path', [
+    'var/log/syslog',  # Relative
+    '/var/log/../../etc/shadow',  # Not normalized
+    '/var/log/',  # Not normalized
+    '/etc/shadow',  # Outside every root
+    '/var/logs/x',  # Prefix of a root, not inside it
+    '/var/log',  # The root itself
+    None,
+    ['/var/log/syslog'],
+])
+def test_other_paths_are_rejected(path):
+    with pytest.raises(HelperError):
+        _validate(path)
+
+
+def test_root_itself_only_when_allowed():
+    assert _validate('/var/cache', allow_root=True) == '/var/cache'
+
+
+def test_truncation_roots_are_narrower():
+    assert _validate('/var/log/syslog', roots=('/var/log',)) == '/var/log/syslog'
+    with pytest.raises(HelperError):
+        _validate('/var/cache/file', roots=('/var/log',))
+
+
+@pytest.mark.skipif(not os.access('/var/tmp', os.W_OK), reason="/var/tmp is not writable")
+def test_symlinked_parent_cannot_redirect_outside_the_roots():
+    directory = tempfile.mkdtemp(dir='/var/tmp')
+    try:
+        os.symlink('/etc', os.path.join(directory, 'link'))
+        with pytest.raises(HelperError):
+            _validate(os.path.join(directory, 'link', 'shadow'))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_malformed_operations_fail_without_stopping_the_batch():
+    results = execute([
+        {'op': 'unlink', 'args': {'paths': '/var/log/syslog'}},
+        {'op': 'du', 'args': {'paths': ['/etc']}},
+        {'op': 'chmod', 'args': {}},
+        'unlink',
+        {'op': 'du', 'args': {'paths': [], 'pattern': '../*'}},
+        {'op': 'du', 'args': {'paths': []}},
+    ])
+
+    assert [result['ok'] for result in results] == [False, False, False, False, False, True]
+    assert results[-1]['result'] == {}